@@ -1,18 +1,13 @@
 import tkinter as tk
 from tkinter import messagebox
-import threading
-from typing import Self
-import cv2
 import logging
+import queue
+import threading
+from typing import Optional
 from PIL import Image, ImageTk
 from detector.core.obj_detector import YOLONDetector
 from detector.config.settings import Settings
-from detector.utils.camera import Camera
-from detector.utils.geocoding import Geocoder
-from detector.utils.id_generator import IDGenerator
-from detector.api.client import APIClient
-from detector.core.roi_handler import ROIHandler
-from detector.core.frame_processor import FrameProcessor
+from detector.utils.frame_sink import FrameSlot
 
 # Set up logging
 logging.basicConfig(
@@ -21,158 +16,190 @@ logging.basicConfig(
     handlers=[logging.StreamHandler()]
 )
 
-# Global variables
-detector = None
-detection_thread = None
-is_running = False
-roi = None  # Store the ROI coordinates (x, y, width, height)
-drawing = False  # Flag to check if the user is currently drawing the ROI
-start_point = None  # Starting point of the ROI (click)
-end_point = None  # Ending point of the ROI (release)
-
-def start_detection():
-    """Function to start the object detection in a separate thread."""
-    global detector, is_running
-    if not is_running:
-        config = Settings()
-
-        # Initialize the detector with the configuration
-        detector = YOLONDetector(
-            model_path=config.model_path,
-            api_url=config.api_url,
-            api_key=config.api_key
-        )
-        
-        logging.info("Starting the object detection loop...")
-        YOLONDetector.run(Self)  # Start detection loop
-        is_running = True
-        update_status("Detection is running...")
-
-def stop_detection():
-    """Stop the object detection."""
-    global detector, is_running
-    if is_running:
+CANVAS_WIDTH = 640
+CANVAS_HEIGHT = 480
+REFRESH_MS = 33  # Display rate (about 30 fps); frames published in between are dropped by the slot
+
+
+class DetectionApp:
+    """
+    Tk front end for the detector.
+
+    The detector runs headless on a background thread and publishes its annotated frames into a
+    single-slot FrameSlot, already scaled to the canvas. The Tk main loop never blocks: it polls
+    the slot with after() and pastes the newest frame into one PhotoImage shown by one canvas
+    item, so the render cost per frame stays the same however long the app runs.
+    """
+
+    def __init__(self, root: tk.Tk, settings: Optional[Settings] = None):
+        self.root = root
+        self.settings = settings or Settings()
+        self.settings.headless = True  # Frames go to the canvas, not to a HighGUI window
+        self.preview = FrameSlot(CANVAS_WIDTH, CANVAS_HEIGHT)
+        self.detector: Optional[YOLONDetector] = None
+        self.detection_thread: Optional[threading.Thread] = None
+        self.stop_requested = threading.Event()
+        self.messages = queue.SimpleQueue()  # (kind, text) from the detection thread
+        self.roi: Optional[tuple] = None  # (x, y, w, h) in frame pixels
+        self.drag_start: Optional[tuple] = None  # Canvas point where the ROI drag started
+        self.photo: Optional[ImageTk.PhotoImage] = None
+
+        root.title("Object Detection Application")
+        root.geometry("800x600")
+
+        # Canvas with one image item and one ROI rubber band, both updated in place
+        self.video_canvas = tk.Canvas(root, width=CANVAS_WIDTH, height=CANVAS_HEIGHT, background='black')
+        self.video_canvas.pack(pady=20)
+        self.image_item = self.video_canvas.create_image(0, 0, anchor=tk.NW)
+        self.roi_item = self.video_canvas.create_rectangle(0, 0, 0, 0, outline="green", width=2, state=tk.HIDDEN)
+
+        # Buttons to control the detection
+        tk.Button(root, text="Start Detection", command=self.start_detection).pack(side=tk.LEFT, padx=10)
+        tk.Button(root, text="Stop Detection", command=self.stop_detection).pack(side=tk.LEFT, padx=10)
+        tk.Button(root, text="Clear ROI", command=self.clear_roi).pack(side=tk.LEFT, padx=10)
+
+        # Label to display the status
+        self.status_label = tk.Label(root, text="Detection not started", font=("Arial", 14))
+        self.status_label.pack(pady=20)
+
+        # Mouse events for drawing the ROI
+        self.video_canvas.bind("<ButtonPress-1>", self.on_mouse_click)
+        self.video_canvas.bind("<B1-Motion>", self.on_mouse_move)
+        self.video_canvas.bind("<ButtonRelease-1>", self.on_mouse_release)
+
+        root.protocol("WM_DELETE_WINDOW", self.on_close)
+        root.after(REFRESH_MS, self.refresh)
+
+    def is_running(self) -> bool:
+        return self.detection_thread is not None and self.detection_thread.is_alive()
+
+    def start_detection(self):
+        """Start the object detection on a background thread."""
+        if self.is_running():
+            self.show_error("Detection is already running.")
+            return
+        self.update_status("Starting camera feed...")
+        self.stop_requested.clear()
+        self.detection_thread = threading.Thread(target=self.run_detection, name="detection", daemon=True)
+        self.detection_thread.start()
+
+    def run_detection(self):
+        """Detection thread: loads the model, opens the camera and runs the detection loop."""
+        try:
+            detector = YOLONDetector(
+                model_path=self.settings.model_path,
+                api_url=self.settings.api_url,
+                api_key=self.settings.api_key,
+                settings=self.settings
+            )
+            detector.preview = self.preview
+            if self.roi is not None:
+                detector.request_roi(self.roi)
+            self.detector = detector
+            if self.stop_requested.is_set():
+                detector.stop()  # Stopped while loading: run() only cleans up
+            logging.info("Starting the object detection loop...")
+            self.messages.put(('status', "Detection is running..."))
+            detector.run()
+            self.messages.put(('status', "Detection stopped."))
+        except Exception as e:
+            logging.exception("Detection failed")
+            self.messages.put(('error', f"Error during detection: {str(e)}"))
+        finally:
+            self.detector = None
+
+    def stop_detection(self):
+        """Stop the object detection; the loop exits after its current frame."""
+        if not self.is_running():
+            self.update_status("Detection is not running.")
+            return
         logging.info("Stopping the detection...")
-        YOLONDetector.cap.release()  # Stop the camera capture
-        cv2.destroyAllWindows()  # Close any OpenCV windows
-        is_running = False
-        update_status("Detection stopped.")
-    else:
-        update_status("Detection is not running.")
-
-def update_status(status: str):
-    """Update the status label in the GUI."""
-    status_label.config(text=status)
-
-def show_error(message: str):
-    """Display an error message in the GUI."""
-    messagebox.showerror("Error", message)
-
-def run_detection_in_thread():
-    """Run the detection in a separate thread to keep the GUI responsive."""
-    try:
-        start_detection()
-    except Exception as e:
-        show_error(f"Error during detection: {str(e)}")
-        stop_detection()
-
-def open_camera_feed():
-    """Start the camera feed in the GUI window."""
-    global detector, is_running, roi, drawing, start_point, end_point
-    try:
-        if not is_running:
-            update_status("Starting camera feed...")
-            threading.Thread(target=run_detection_in_thread, daemon=True).start()
-        
-        while is_running:
-            # Capture frame from the camera
-            ret, frame = YOLONDetector.cap.read()
-            if not ret:
-                break
-            
-            # Process the frame
-            processed_frame = FrameProcessor.process_frame(frame)
-
-            # Draw ROI if it exists
-            if roi is not None:
-                x, y, w, h = roi
-                cv2.rectangle(processed_frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-
-            # Convert the frame to RGB (Tkinter uses RGB)
-            rgb_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(rgb_frame)
-            img_tk = ImageTk.PhotoImage(img)
-            
-            # Update the canvas with the new frame
-            video_canvas.create_image(0, 0, anchor=tk.NW, image=img_tk)
-            video_canvas.image = img_tk
-
-    except Exception as e:
-        show_error(f"Error with camera feed: {str(e)}")
-        stop_detection()
-
-def start_button_click():
-    """Handle the start button click event."""
-    if not is_running:
-        open_camera_feed()
-    else:
-        show_error("Detection is already running.")
-
-def stop_button_click():
-    """Handle the stop button click event."""
-    stop_detection()
-
-def on_mouse_click(event):
-    """Handle mouse click to start drawing the ROI."""
-    global start_point, drawing
-    start_point = (event.x, event.y)
-    drawing = True
-
-def on_mouse_move(event):
-    """Handle mouse move to update the ROI while dragging."""
-    global end_point, drawing
-    if drawing:
-        end_point = (event.x, event.y)
-        video_canvas.delete("ROI")  # Remove previous ROI rectangle
-        video_canvas.create_rectangle(start_point[0], start_point[1], end_point[0], end_point[1], outline="green", width=2, tags="ROI")
-
-def on_mouse_release(event):
-    """Handle mouse release to finalize the ROI."""
-    global roi, drawing, start_point, end_point
-    if drawing:
-        drawing = False
-        end_point = (event.x, event.y)
-        roi = (start_point[0], start_point[1], abs(end_point[0] - start_point[0]), abs(end_point[1] - start_point[1]))
-        video_canvas.delete("ROI")  # Remove temporary ROI rectangle
-        video_canvas.create_rectangle(start_point[0], start_point[1], end_point[0], end_point[1], outline="green", width=2, tags="ROI")
-        update_status(f"ROI set: {roi}")
-
-# Create the main window
-root = tk.Tk()
-root.title("Object Detection Application")
-
-# Set up the window size
-root.geometry("800x600")
-
-# Create a canvas to display the video feed
-video_canvas = tk.Canvas(root, width=640, height=480)
-video_canvas.pack(pady=20)
-
-# Create buttons to control the detection
-start_button = tk.Button(root, text="Start Detection", command=start_button_click)
-start_button.pack(side=tk.LEFT, padx=10)
-
-stop_button = tk.Button(root, text="Stop Detection", command=stop_button_click)
-stop_button.pack(side=tk.LEFT, padx=10)
-
-# Create a label to display the status
-status_label = tk.Label(root, text="Detection not started", font=("Arial", 14))
-status_label.pack(pady=20)
-
-# Bind mouse events for drawing ROI
-video_canvas.bind("<ButtonPress-1>", on_mouse_click)
-video_canvas.bind("<B1-Motion>", on_mouse_move)
-video_canvas.bind("<ButtonRelease-1>", on_mouse_release)
-
-# Start the main loop for the application
-root.mainloop()
+        self.stop_requested.set()
+        detector = self.detector
+        if detector is not None:
+            detector.stop()
+        self.update_status("Stopping detection...")
+
+    def clear_roi(self):
+        self.roi = None
+        self.video_canvas.itemconfigure(self.roi_item, state=tk.HIDDEN)
+        if self.detector is not None:
+            self.detector.request_roi(None)
+        self.update_status("ROI cleared")
+
+    def refresh(self):
+        """Tk timer: shows the newest published frame, if any, and reschedules itself."""
+        while not self.messages.empty():
+            kind, text = self.messages.get()
+            if kind == 'error':
+                self.update_status("Detection stopped.")
+                self.show_error(text)
+            else:
+                self.update_status(text)
+        frame = self.preview.take()
+        if frame is not None:
+            self.show_frame(frame)
+        self.root.after(REFRESH_MS, self.refresh)
+
+    def show_frame(self, frame):
+        """Pastes a BGR frame (already at display size) into the canvas image."""
+        height, width = frame.shape[:2]
+        image = Image.frombuffer('RGB', (width, height), frame, 'raw', 'BGR', 0, 1)
+        if self.photo is None or (self.photo.width(), self.photo.height()) != (width, height):
+            # Only when the frame size changes
+            self.photo = ImageTk.PhotoImage('RGB', (width, height))
+            self.video_canvas.itemconfigure(self.image_item, image=self.photo)
+        self.photo.paste(image)
+
+    def update_status(self, status: str):
+        """Update the status label in the GUI."""
+        self.status_label.config(text=status)
+
+    def show_error(self, message: str):
+        """Display an error message in the GUI."""
+        messagebox.showerror("Error", message)
+
+    def on_mouse_click(self, event):
+        """Handle mouse click to start drawing the ROI."""
+        self.drag_start = (event.x, event.y)
+        self.video_canvas.coords(self.roi_item, event.x, event.y, event.x, event.y)
+        self.video_canvas.itemconfigure(self.roi_item, state=tk.NORMAL)
+
+    def on_mouse_move(self, event):
+        """Handle mouse move to update the ROI while dragging."""
+        if self.drag_start is not None:
+            self.video_canvas.coords(self.roi_item, *self.drag_start, event.x, event.y)
+
+    def on_mouse_release(self, event):
+        """Handle mouse release to finalize the ROI, converted from canvas to frame pixels."""
+        if self.drag_start is None:
+            return
+        (x1, y1), (x2, y2) = self.drag_start, (event.x, event.y)
+        self.drag_start = None
+        self.video_canvas.itemconfigure(self.roi_item, state=tk.HIDDEN)  # The overlay draws the ROI from now on
+        scale = self.preview.scale
+        x, y = int(min(x1, x2) / scale), int(min(y1, y2) / scale)
+        w, h = int(abs(x2 - x1) / scale), int(abs(y2 - y1) / scale)
+        if w == 0 or h == 0:
+            return
+        self.roi = (x, y, w, h)
+        if self.detector is not None:
+            self.detector.request_roi(self.roi)
+        self.update_status(f"ROI set: {self.roi}")
+
+    def on_close(self):
+        self.stop_detection()
+        if self.detection_thread is not None:
+            self.detection_thread.join(timeout=5.0)
+        self.root.destroy()
+
+
+def main():
+    root = tk.Tk()
+    DetectionApp(root)
+    # Start the main loop for the application
+    root.mainloop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+# Micro-benchmarks for the detection pipeline. Run from the `master` directory, e.g.:
+#   python -m benchmarks.bench_inference_size
@@ -0,0 +1,119 @@
+"""
+Latency and accuracy parity of the inference backends on CPU: ultralytics/PyTorch, ONNX Runtime
+and OpenVINO, each in FP32 and with dynamic INT8 quantization for the exported backends.
+
+Parity is measured against the ultralytics backend on the same weights: the share of its
+detections matched by the backend (same class, IoU >= 0.5), the mean IoU of those matches and
+the largest confidence difference.
+
+Usage: python -m benchmarks.bench_backends [--model yolov8n.pt] [--runs 20] [--threads 0]
+Without the weights file, a randomly initialised `yolov8n.yaml` model is saved to a temporary
+directory and used for every backend; its confidences are tiny, so --conf defaults to 1e-4.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import cv2
+import numpy as np
+import ultralytics
+from benchmarks.common import latency_stats
+from detector.core.backends import load_backend
+from detector.core.detections import result_to_array
+from detector.core.obj_detector import inference_size_for
+from detector.core.tracker import iou_matrix
+
+BACKENDS = [('ultralytics', False), ('onnxruntime', False), ('onnxruntime', True), ('openvino', False),
+            ('openvino', True)]
+# (x, y, w, h) crops of the sample images, as ROIs of different sizes
+CROPS = [(0, 0, None, None), (50, 100, 600, 400), (200, 200, 320, 240)]
+
+
+def sample_images():
+    assets = os.path.join(os.path.dirname(ultralytics.__file__), 'assets')
+    images = [cv2.imread(os.path.join(assets, name)) for name in ('bus.jpg', 'zidane.jpg')]
+    crops = []
+    for image in images:
+        for x, y, w, h in CROPS:
+            crops.append(image[y:y + h if h else None, x:x + w if w else None])
+    return crops
+
+
+def parity(reference: np.ndarray, candidate: np.ndarray):
+    """
+    :return: (recall of the reference detections, mean IoU of matches, max confidence difference)
+    """
+    if len(reference) == 0:
+        return (1.0 if len(candidate) == 0 else 0.0), 1.0, 0.0
+    if len(candidate) == 0:
+        return 0.0, 0.0, 0.0
+    iou = iou_matrix(reference[:, :4], candidate[:, :4])
+    iou[reference[:, None, 5] != candidate[None, :, 5]] = 0.0
+    best = iou.argmax(axis=1)
+    matched = iou[np.arange(len(reference)), best] >= 0.5
+    if not matched.any():
+        return 0.0, 0.0, 0.0
+    conf_diff = np.abs(reference[matched, 4] - candidate[best[matched], 4]).max()
+    return float(matched.mean()), float(iou[np.arange(len(reference)), best][matched].mean()), float(conf_diff)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='yolov8n.pt')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=0, help="Intra-op threads (0 keeps the library default)")
+    parser.add_argument('--max-size', type=int, default=640)
+    parser.add_argument('--conf', type=float)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        # Exports are written next to the weights, so work on a copy
+        model_path = os.path.join(tmpdir, os.path.basename(args.model))
+        if os.path.exists(args.model):
+            shutil.copy(args.model, model_path)
+            conf = args.conf if args.conf is not None else 0.25
+        else:
+            from ultralytics import YOLO
+            model_path = os.path.join(tmpdir, 'yolov8n-random.pt')
+            YOLO(args.model.replace('.pt', '.yaml')).save(model_path)
+            conf = args.conf if args.conf is not None else 1e-4
+
+        images = sample_images()
+        sizes = [inference_size_for(image.shape[1], image.shape[0], args.max_size) for image in images]
+        print(f"{len(images)} images, {args.runs} runs each, conf={conf}, threads={args.threads or 'default'}")
+        print(f"{'backend':<18} {'load s':>7} {'p50 ms':>8} {'p95 ms':>8} {'recall':>7} {'IoU':>6} {'max dconf':>10}")
+
+        reference = None
+        for backend, int8 in BACKENDS:
+            label = backend + (' int8' if int8 else '')
+            start = time.perf_counter()
+            try:
+                model = load_backend(model_path, backend, args.threads, int8)
+            except ImportError as e:
+                print(f"{label:<18} skipped ({e})")
+                continue
+            model.warmup(args.max_size)
+            load_time = time.perf_counter() - start
+
+            timings, outputs = [], []
+            for image, imgsz in zip(images, sizes):
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+                    results = model(image, imgsz=imgsz, conf=conf)
+                    timings.append(time.perf_counter() - start)
+                outputs.append(result_to_array(results[0]))
+            if reference is None:
+                reference = outputs
+
+            scores = np.array([parity(ref, out) for ref, out in zip(reference, outputs)])
+            stats = latency_stats(timings)
+            print(f"{label:<18} {load_time:>7.1f} {stats['p50']:>8.1f} {stats['p95']:>8.1f} "
+                  f"{scores[:, 0].mean():>7.3f} {scores[:, 1].mean():>6.3f} {scores[:, 2].max():>10.4f}")
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
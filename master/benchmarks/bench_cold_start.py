@@ -0,0 +1,169 @@
+"""
+Cold start of the detector: package import times and time-to-first-detection.
+
+Every measurement runs in a fresh interpreter. The import table shows how long each module
+takes to import and which heavy dependencies it pulls in. Time-to-first-detection covers the
+detector import, model load, warm-up, detector set-up and the first frame, with and without
+the warm-up (MODEL_WARMUP), next to the steady-state frame latency; "2nd load" is the cost of
+another detector in the same process asking for the model (served from the model cache).
+
+Usage: python -m benchmarks.bench_cold_start [--model yolov8n.pt] [--backend ultralytics]
+                                             [--runs 3] [--output cold_start.json]
+Without the weights file, a randomly initialised `yolov8n.yaml` model is saved to a temporary
+directory and used instead (same latency, different detections).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+IMPORT_MODULES = ['detector', 'detector.config.settings', 'detector.utils.id_generator', 'detector.api.models',
+                  'detector.api.client', 'detector.core.obj_detector']
+HEAVY_MODULES = ['cv2', 'torch', 'ultralytics', 'onnxruntime', 'openvino', 'requests', 'pydantic']
+RESOLUTION = (1280, 720)
+ROI = (320, 180, 640, 360)
+STEADY_FRAMES = 20
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module, runs):
+    samples, loaded = [], []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result['seconds'])
+        loaded = result['loaded']
+    return {'module': module, 'seconds': statistics.median(samples), 'loaded': loaded}
+
+
+def first_detection(clip, model_path, backend, warmup):
+    """
+    Child process: times each start-up phase up to the first detected frame.
+    """
+    start = time.perf_counter()
+    from detector.core.obj_detector import YOLONDetector
+    imported = time.perf_counter()
+
+    import contextlib
+    import io
+    from detector.config.settings import Settings
+    settings = Settings()
+    settings.sources = [clip]
+    settings.source_loop = True
+    settings.capture_threaded = False
+    settings.motion_gate_enabled = False
+    settings.tracker_enabled = False
+    settings.static_location = (52.37, 4.89)
+    settings.roi = ROI
+    settings.api_url = 'http://127.0.0.1:9/notifications'
+    settings.outbox_path = os.path.join(os.path.dirname(clip), f"outbox_{os.getpid()}.db")
+    settings.headless = True
+    settings.model_backend = backend
+    settings.model_warmup = warmup
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        loaded_at = time.perf_counter()
+        model = YOLONDetector.load_model(model_path, settings)
+        loaded = time.perf_counter()
+        detector = YOLONDetector(model_path, settings=settings, model=model)
+        ready = time.perf_counter()
+        detector.detect(detector.read_frame())
+        first = time.perf_counter()
+
+        steady = []
+        for _ in range(STEADY_FRAMES):
+            frame_start = time.perf_counter()
+            detector.detect(detector.read_frame())
+            steady.append(time.perf_counter() - frame_start)
+
+        second_start = time.perf_counter()
+        YOLONDetector.load_model(model_path, settings)
+        second_load = time.perf_counter() - second_start
+        detector.close()
+
+    return {
+        'import': imported - start,
+        'model_load': loaded - loaded_at,
+        'detector_init': ready - loaded,
+        'first_frame': first - ready,
+        'time_to_first_detection': first - start,
+        'steady_frame': statistics.median(steady),
+        'second_model_load': second_load
+    }
+
+
+def measure_first_detection(clip, model_path, backend, warmup, runs):
+    samples = []
+    for _ in range(runs):
+        command = [sys.executable, '-m', 'benchmarks.bench_cold_start', '--child', clip, '--model', model_path,
+                   '--backend', backend] + ([] if warmup else ['--no-warmup'])
+        start = time.perf_counter()
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result['process'] = time.perf_counter() - start
+        samples.append(result)
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='yolov8n.pt')
+    parser.add_argument('--backend', default='ultralytics')
+    parser.add_argument('--runs', type=int, default=3, help="Fresh processes per measurement (median reported)")
+    parser.add_argument('--output', help="Save the results as JSON")
+    parser.add_argument('--child', metavar='CLIP', help=argparse.SUPPRESS)
+    parser.add_argument('--no-warmup', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(first_detection(args.child, args.model, args.backend, not args.no_warmup)))
+        return
+
+    print("Import times (fresh interpreter, median):")
+    imports = [measure_import(module, args.runs) for module in IMPORT_MODULES]
+    for result in imports:
+        print(f"    {result['module']:<30} {result['seconds'] * 1000:8.1f} ms   loads: "
+              f"{', '.join(result['loaded']) or '-'}")
+
+    from benchmarks.bench_stages import write_clip
+    with tempfile.TemporaryDirectory() as tmpdir:
+        model_path = args.model
+        if not os.path.exists(model_path):
+            from ultralytics import YOLO
+            model_path = os.path.join(tmpdir, 'yolov8n-random.pt')
+            YOLO(args.model.replace('.pt', '.yaml')).save(model_path)
+        clip = os.path.join(tmpdir, 'clip.avi')
+        write_clip(clip, *RESOLUTION)
+
+        print(f"\nTime to first detection ({args.backend}, {RESOLUTION[0]}x{RESOLUTION[1]}, ROI {ROI[2]}x{ROI[3]}):")
+        print(f"    {'warm-up':<8} {'import':>8} {'load':>8} {'init':>8} {'1st frame':>10} {'steady':>8} "
+              f"{'TTFD':>8} {'process':>8} {'2nd load':>9}  (ms)")
+        startup = {}
+        for warmup in (False, True):
+            result = measure_first_detection(clip, model_path, args.backend, warmup, args.runs)
+            startup['warmup' if warmup else 'no_warmup'] = result
+            print(f"    {'on' if warmup else 'off':<8} {result['import'] * 1000:8.0f} {result['model_load'] * 1000:8.0f} "
+                  f"{result['detector_init'] * 1000:8.0f} {result['first_frame'] * 1000:10.1f} "
+                  f"{result['steady_frame'] * 1000:8.1f} {result['time_to_first_detection'] * 1000:8.0f} "
+                  f"{result['process'] * 1000:8.0f} {result['second_model_load'] * 1000:9.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'imports': imports, 'startup': startup, 'backend': args.backend}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Event store: append cost per analysed frame and count queries over months of history, with
+the per-minute rollups and time index against a full scan of the segment files.
+
+Writes `--days` of synthetic history (one analysed frame per `--interval` seconds per camera,
+0 to 3 detections each) to a temporary directory. Events take 38 bytes each on disk, plus the
+preallocated active segment.
+
+Usage: python -m benchmarks.bench_event_store [--days 30] [--cameras 2] [--interval 2]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import numpy as np
+from benchmarks.common import latency_stats
+from detector.core.detections import DETECTION_DTYPE
+from detector.utils.event_store import EventStore
+
+START = 1_700_000_000.0
+CLASSES = np.array([0, 0, 0, 2])  # Mostly persons, some cars
+
+
+def write_history(store, days, cameras, interval, rng):
+    detections = np.zeros(3, dtype=DETECTION_DTYPE)
+    detections['x2'] = detections['y2'] = 100
+    detections['confidence'] = 0.8
+    timings = []
+    for t in np.arange(START, START + days * 86400, interval):
+        for camera in range(cameras):
+            count = rng.integers(0, 4)
+            if count == 0:
+                continue
+            frame = detections[:count]
+            frame['class_id'] = CLASSES[rng.integers(0, len(CLASSES), count)]
+            zone_ids = rng.integers(-1, 2, count)
+            start = time.perf_counter()
+            store.append(t, f"camera_{camera + 1}", frame, zone_ids, ('doorway', 'parking'))
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def full_scan(store, start, end, camera, class_id):
+    """Baseline: read every segment and filter all events."""
+    total = 0
+    for segment in store.segments:
+        events = np.load(segment.path, mmap_mode='r')[:segment.count]
+        mask = (events['timestamp'] >= start) & (events['timestamp'] < end)
+        mask &= (events['camera'] == store.cameras.index(camera)) & (events['class_id'] == class_id)
+        total += int(np.count_nonzero(mask))
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=float, default=30)
+    parser.add_argument('--cameras', type=int, default=2)
+    parser.add_argument('--interval', type=float, default=2.0, help="Seconds between analysed frames per camera")
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'events')
+        store = EventStore(path)
+        store.set_class_names({0: 'person', 2: 'car'})
+        start = time.perf_counter()
+        timings = write_history(store, args.days, args.cameras, args.interval, rng)
+        elapsed = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        stats = latency_stats(timings)
+        print(f"{len(store)} events over {args.days:g} days in {len(store.segments)} segments, "
+              f"{size / 2 ** 20:.0f} MiB on disk (written in {elapsed:.0f}s)")
+        print(f"append per frame: mean {stats['mean'] * 1000:.1f} us, p99 {stats['p99'] * 1000:.1f} us")
+
+        end_of_history = START + args.days * 86400
+        spans = {'1 hour': 3600, '1 day': 86400, '7 days': 7 * 86400, f"{args.days:g} days": args.days * 86400}
+        for label, span in spans.items():
+            if span > args.days * 86400:
+                continue
+            # Arbitrary (not minute-aligned) ranges; the full scan is only timed on the first few
+            starts = rng.uniform(START, end_of_history - span + 1, args.queries)
+            counts = {}
+            for name, query, runs in (
+                    ('rollups + index', lambda t: store.count(t, t + span, 'camera_1', 'person'), args.queries),
+                    ('full scan', lambda t: full_scan(store, t, t + span, 'camera_1', 0), 5)):
+                query_timings = []
+                counts[name] = []
+                for t in starts[:runs]:
+                    query_start = time.perf_counter()
+                    counts[name].append(query(t))
+                    query_timings.append(time.perf_counter() - query_start)
+                stats = latency_stats(query_timings)
+                print(f"    count persons on camera_1 over {label:<8} {name:<16} p50 {stats['p50']:8.2f} ms  "
+                      f"p95 {stats['p95']:8.2f} ms")
+            if counts['rollups + index'][:5] != counts['full scan']:
+                print("    MISMATCH between the store and the full scan")
+        with contextlib.redirect_stdout(io.StringIO()):
+            store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Per-frame allocations and overlay time of the display path, before and after the
+copy-free pipeline (buffer pool + in-place overlay).
+
+"before" replays the original path: read into a fresh array, frame.copy() in
+detect_objects, frame.copy() and overlay copy in process_frame, then cv2.addWeighted.
+"after" reads into a pooled buffer with cap.read(image=...) and darkens straight into
+FrameProcessor's reused output buffer.
+
+Usage: python -m benchmarks.bench_frame_pipeline [--width 1280 --height 720 --frames 200]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from detector.core.frame_processor import FrameProcessor
+from detector.core.roi_handler import ROIHandler
+from detector.utils.frame_pool import FramePool
+from detector.utils.geocoding import Geocoder
+
+
+def write_video(path, width, height, frames):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (width, height))
+    rng = np.random.default_rng(0)
+    for _ in range(frames):
+        writer.write(rng.integers(0, 255, (height, width, 3), dtype=np.uint8))
+    writer.release()
+
+
+def original_overlay(frame):
+    display_frame = frame.copy()  # detect_objects
+    display_frame = display_frame.copy()  # process_frame
+    overlay = display_frame.copy()
+    cv2.rectangle(overlay, (0, 0), (frame.shape[1], frame.shape[0]), (0, 0, 0), -1)
+    return cv2.addWeighted(overlay, 0.4, display_frame, 0.6, 0)
+
+
+def run(path, frames, pooled):
+    processor = FrameProcessor(ROIHandler(), Geocoder(static_location=(0.0, 0.0)))
+    cap = cv2.VideoCapture(path)
+    pool = None
+    overlay_time = 0.0
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    for _ in range(frames):
+        if pooled:
+            if pool is None:
+                ret, frame = cap.read()
+                pool = FramePool(frame.shape, size=2)
+            slot = pool.acquire()
+            ret, frame = cap.read(pool.buffer(slot))
+        else:
+            ret, frame = cap.read()
+        if not ret:
+            break
+        start = time.perf_counter()
+        if pooled:
+            processor.process_frame(frame)
+            pool.release(slot)
+        else:
+            original_overlay(frame)
+        overlay_time += time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    cap.release()
+    frame_bytes = frame.nbytes if frame is not None else 1
+    return overlay_time / frames * 1000, (peak - start_bytes) / frame_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'bench.avi')
+        write_video(path, args.width, args.height, args.frames + 1)
+
+        print(f"{args.width}x{args.height}, {args.frames} frames")
+        print(f"{'path':>8} {'overlay ms/frame':>17} {'peak traced (frames)':>21}")
+        for name, pooled in (('before', False), ('after', True)):
+            overlay_ms, peak_frames = run(path, args.frames, pooled)
+            print(f"{name:>8} {overlay_ms:>17.2f} {peak_frames:>21.1f}")
+
+    frame = np.zeros((args.height, args.width, 3), dtype=np.uint8)
+    processor = FrameProcessor(ROIHandler(), Geocoder(static_location=(0.0, 0.0)))
+    processor.process_frame(frame)  # Allocate the reused buffer up front
+    tracemalloc.start()
+    for name, fn in (('before', original_overlay), ('after', processor.process_frame)):
+        allocated = 0
+        for _ in range(50):
+            before = tracemalloc.get_traced_memory()[0]
+            result = fn(frame)
+            allocated += max(0, tracemalloc.get_traced_memory()[0] - before)
+            del result
+        print(f"{name:>8} overlay allocations: {allocated / 50 / frame.nbytes:.1f} frame-sized arrays per frame")
+    tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    main()
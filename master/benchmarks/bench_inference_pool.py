@@ -0,0 +1,75 @@
+"""
+Multi-camera throughput with inference in the main process (one batched forward pass per
+round) against a pool of inference worker processes fed through shared memory.
+
+Each configuration runs MultiSourceDetector headless over looping synthetic clips for a fixed
+time and reports the frames per second processed over all cameras. Worker processes only pay
+off with spare cores: the pool runs one inference per core at a time, while the main process
+keeps capture, overlay and notifications off their GIL.
+
+Usage: python -m benchmarks.bench_inference_pool [--cameras 4] [--workers 0,2,4] [--seconds 20]
+                                                 [--model yolov8n.pt]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from benchmarks.bench_stages import make_settings, write_clip
+from benchmarks.common import NotificationServer
+from detector.core.multi_detector import MultiSourceDetector
+
+
+def run_config(clips, workers, model_path, seconds, server, tmpdir):
+    settings = make_settings(clips[0], (160, 90, 960, 540), server.url, os.path.join(tmpdir, f"outbox_{workers}.db"))
+    settings.capture_threaded = True
+    settings.headless = True
+    settings.inference_workers = workers
+    with contextlib.redirect_stdout(io.StringIO()):
+        detector = MultiSourceDetector(model_path, server.url, sources=clips, settings=settings)
+        # Let every camera deliver its first frame and every worker finish its warm-up pass
+        for _ in range(3):
+            detector.step()
+        detector.frames_processed = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            for camera, frame in detector.step() or []:
+                camera.emit(frame)
+        elapsed = time.perf_counter() - start
+        frames = detector.frames_processed
+        for camera in detector.detectors:
+            camera.close()
+        if detector.outbox is not None:
+            detector.replayer.stop()
+            detector.outbox.close()
+        if detector.pool is not None:
+            detector.pool.close()
+    return frames / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cameras', type=int, default=4)
+    parser.add_argument('--workers', type=lambda v: [int(w) for w in v.split(',')], default=[0, 2, 4],
+                        help="Worker counts to compare (0 is in-process batched inference)")
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--model', default='yolov8n.pt')
+    args = parser.parse_args()
+    model_path = args.model if os.path.exists(args.model) else args.model.replace('.pt', '.yaml')
+
+    print(f"{args.cameras} cameras (1280x720, 960x540 ROI), {os.cpu_count()} CPU cores, model {model_path}")
+    with tempfile.TemporaryDirectory() as tmpdir, NotificationServer() as server:
+        clips = []
+        for i in range(args.cameras):
+            clip = os.path.join(tmpdir, f"camera_{i}.avi")
+            write_clip(clip, 1280, 720)
+            clips.append(clip)
+        for workers in args.workers:
+            fps = run_config(clips, workers, model_path, args.seconds, server, tmpdir)
+            label = f"{workers} inference workers" if workers else "in-process batched"
+            print(f"    {label:<24} {fps:7.1f} frames/s ({fps / args.cameras:.1f} per camera)")
+
+
+if __name__ == '__main__':
+    main()
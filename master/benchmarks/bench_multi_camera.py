@@ -0,0 +1,126 @@
+"""
+Multi-camera throughput: N independent detectors (one YOLONDetector process per camera, each
+with its own copy of the model, as N separate deployments would run) against one
+MultiSourceDetector that batches the ROI crops of all cameras into a single forward pass.
+
+Every configuration runs headless over looping synthetic clips, paced to `--source-fps` like
+live cameras (unpaced clips would be decoded as fast as possible, and the capture threads
+would compete with inference for the cores), for a fixed time and reports the frames per
+second processed over all cameras, per camera and per CPU core.
+
+Usage: python -m benchmarks.bench_multi_camera [--cameras 1,2,4] [--seconds 20] [--source-fps 15]
+                                               [--model yolov8n.pt]
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import tempfile
+import time
+from benchmarks.bench_stages import make_settings, write_clip
+from benchmarks.common import NotificationServer
+from detector.core.multi_detector import MultiSourceDetector
+from detector.core.obj_detector import YOLONDetector
+
+ROI = (160, 90, 960, 540)
+WARMUP_FRAMES = 3
+
+
+def close_multi(detector):
+    for camera in detector.detectors:
+        camera.close()
+    if detector.outbox is not None:
+        detector.replayer.stop()
+        detector.outbox.close()
+
+
+def run_independent(clip, model_path, seconds, url, outbox_path, start_barrier, results):
+    """
+    Process body of one independent detector: the single-camera loop of YOLONDetector.run().
+    """
+    settings = make_settings(clip, ROI, url, outbox_path)
+    settings.capture_threaded = True
+    settings.headless = True
+    with contextlib.redirect_stdout(io.StringIO()):
+        detector = YOLONDetector(model_path, url, settings=settings)
+        for _ in range(WARMUP_FRAMES):
+            detector.detect(detector.read_frame())
+        start_barrier.wait()
+        frames = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            frame = detector.read_frame()
+            if frame is not None:
+                detector.detect(frame)
+                detector.emit(frame)
+                frames += 1
+        elapsed = time.perf_counter() - start
+        detector.close()
+    results.put(frames / elapsed)
+
+
+def independent_fps(clips, model_path, seconds, server, tmpdir):
+    context = multiprocessing.get_context('spawn')
+    start_barrier = context.Barrier(len(clips))
+    results = context.Queue()
+    processes = [context.Process(target=run_independent,
+                                 args=(clip, model_path, seconds, server.url,
+                                       os.path.join(tmpdir, f"outbox_independent_{i}.db"), start_barrier, results))
+                 for i, clip in enumerate(clips)]
+    for process in processes:
+        process.start()
+    fps = sum(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    return fps
+
+
+def multi_fps(clips, model_path, seconds, server, tmpdir):
+    settings = make_settings(clips[0], ROI, server.url, os.path.join(tmpdir, f"outbox_multi_{len(clips)}.db"))
+    settings.capture_threaded = True
+    settings.headless = True
+    settings.inference_workers = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        detector = MultiSourceDetector(model_path, server.url, sources=clips, settings=settings)
+        for _ in range(WARMUP_FRAMES):
+            detector.step()
+        detector.frames_processed = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            for camera, frame in detector.step() or []:
+                camera.emit(frame)
+        elapsed = time.perf_counter() - start
+        frames = detector.frames_processed
+        close_multi(detector)
+    return frames / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cameras', type=lambda v: [int(c) for c in v.split(',')], default=[1, 2, 4],
+                        help="Camera counts to compare")
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--source-fps', type=float, default=15, help="Frame rate each camera delivers")
+    parser.add_argument('--model', default='yolov8n.pt')
+    args = parser.parse_args()
+    model_path = args.model if os.path.exists(args.model) else args.model.replace('.pt', '.yaml')
+    cores = os.cpu_count() or 1
+
+    print(f"1280x720 cameras at {args.source_fps:g} fps, 960x540 ROI, {cores} CPU cores, model {model_path}")
+    with tempfile.TemporaryDirectory() as tmpdir, NotificationServer() as server:
+        clips = []
+        for i in range(max(args.cameras)):
+            clip = os.path.join(tmpdir, f"camera_{i}.avi")
+            write_clip(clip, 1280, 720)
+            clips.append(f"{clip}#fps={args.source_fps:g}")
+        for cameras in args.cameras:
+            print(f"{cameras} camera(s):")
+            for label, run in (('independent detectors', independent_fps), ('MultiSourceDetector', multi_fps)):
+                fps = run(clips[:cameras], model_path, args.seconds, server, tmpdir)
+                print(f"    {label:<24} {fps:7.1f} frames/s ({fps / cameras:.1f} per camera, "
+                      f"{fps / cores:.1f} per core)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Notification serialization throughput: the former path (nested dictionaries per detection,
+json.dumps() once for the outbox and again for the POST body) against NotificationRecord
+(flat __slots__ record, rendered once and shared by the outbox and the API client).
+
+Also times bulk bodies (a JSON array and NDJSON) and the pydantic validation of debug mode.
+
+Usage: python -m benchmarks.bench_serialization [--notifications 100000] [--batch 50]
+"""
+import argparse
+import json
+import time
+import numpy as np
+from detector.api.records import NotificationRecord, to_json_array, to_ndjson, validate_notification
+from detector.core.tracker import TRACK_DTYPE
+
+NAMES = {0: 'person', 2: 'car'}
+ROI = (100, 80, 960, 540)
+LOCATION = (52.520008, 13.404954)
+TIMESTAMP = '2026-01-02 03:04:05.678'
+
+
+def make_tracks(count, rng):
+    tracks = np.empty(count, dtype=TRACK_DTYPE)
+    tracks['x1'], tracks['y1'] = rng.integers(0, 900, count), rng.integers(0, 500, count)
+    tracks['x2'], tracks['y2'] = tracks['x1'] + 60, tracks['y1'] + 160
+    tracks['confidence'] = rng.uniform(0.25, 1.0, count)
+    tracks['class_id'] = rng.choice([0, 2], count)
+    tracks['track_id'] = np.arange(count)
+    return tracks
+
+
+def dict_notifications(rows):
+    notifications = []
+    for i, row in enumerate(rows):
+        x1, y1, x2, y2, conf, cls = row[:6]
+        notifications.append({
+            "id": str(i),
+            "timestamp": TIMESTAMP,
+            "detection": {"object": NAMES[cls], "confidence": conf, "bbox": [x1, y1, x2, y2], "track_id": row[6]},
+            "location": {"roi": ROI, "camera_id": 'camera_1', "coordinates": LOCATION, "zone": 'doorway'}
+        })
+    return notifications
+
+
+def record_notifications(rows):
+    return [NotificationRecord(str(i), TIMESTAMP, NAMES[row[5]], row[4], row[:4], ROI, 'camera_1', LOCATION,
+                               'doorway', row[6]) for i, row in enumerate(rows)]
+
+
+def rate(count, run, repeat=3):
+    best = min(timed(run) for _ in range(repeat))
+    return count / best
+
+
+def timed(run):
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--notifications', type=int, default=100000)
+    parser.add_argument('--batch', type=int, default=50, help="Notifications per bulk POST")
+    args = parser.parse_args()
+
+    rows = make_tracks(args.notifications, np.random.default_rng(0)).tolist()
+    n = args.notifications
+
+    def dict_path():
+        for data in dict_notifications(rows):
+            json.dumps(data)  # Outbox
+            json.dumps(data)  # POST body
+
+    def record_path():
+        for record in record_notifications(rows):
+            record.to_json()  # Outbox
+            record.to_json()  # POST body (cached)
+
+    print(f"{n} notifications, per-notification POSTs with the outbox enabled:")
+    dict_rate, record_rate = rate(n, dict_path), rate(n, record_path)
+    print(f"    dict + json.dumps        {dict_rate:10.0f} notifications/s")
+    print(f"    NotificationRecord       {record_rate:10.0f} notifications/s  ({record_rate / dict_rate:.1f}x)")
+
+    dicts, records = dict_notifications(rows), record_notifications(rows)
+    batches = range(0, n, args.batch)
+    print(f"Bulk bodies of {args.batch} (records not serialized yet):")
+    print(f"    json.dumps(list of dicts) {rate(n, lambda: [json.dumps(dicts[i:i + args.batch]) for i in batches]):9.0f}"
+          f" notifications/s")
+    for name, encode in (('JSON array of records', to_json_array), ('NDJSON of records', to_ndjson)):
+        fresh = record_notifications(rows)
+        elapsed = timed(lambda: [encode(fresh[i:i + args.batch]) for i in batches])
+        print(f"    {name:<25} {n / elapsed:9.0f} notifications/s")
+
+    sample = records[:min(n, 10000)]
+    print(f"Debug-mode validation (pydantic): {rate(len(sample), lambda: [validate_notification(r) for r in sample]):.0f}"
+          f" notifications/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+Per-stage latency of the detection pipeline on synthetic footage:
+capture -> ROI crop -> inference -> post-processing -> notification -> overlay.
+
+Every configuration (resolution x ROI size x detections per frame) runs a YOLONDetector on a
+generated MJPG clip with a deterministic stub model (or the real model with --real-model)
+and a local stand-in for the notification API. The report has p50/p95/p99 latency per stage
+and end-to-end FPS. Save the results with --output and pass them to --compare on a later
+commit to spot regressions.
+
+Usage: python -m benchmarks.bench_stages [--frames 100] [--real-model] [--output stages.json]
+                                         [--compare baseline.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+import cv2
+import numpy as np
+from benchmarks.common import NotificationServer, StubModel, latency_stats, load_model
+from detector.config.settings import Settings
+from detector.core.obj_detector import YOLONDetector, results_to_detections
+
+STAGES = ('capture', 'crop', 'inference', 'postprocess', 'notify', 'overlay', 'total')
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+ROI_FRACTIONS = [0.25, 0.5, 1.0]  # ROI side as a fraction of the frame side
+DETECTION_COUNTS = [0, 5, 50]
+CLIP_FRAMES = 30  # The clip loops, so this only bounds the set-up time
+WARMUP_FRAMES = 5
+
+
+def write_clip(path, width, height):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (width, height))
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for i in range(CLIP_FRAMES):
+        frame = background.copy()
+        x = (i * 17) % max(1, width - 80)
+        frame[height // 3:height // 3 + 160, x:x + 80] = 255  # Moving object
+        writer.write(frame)
+    writer.release()
+
+
+def make_settings(clip, roi, server_url, outbox_path):
+    settings = Settings()
+    settings.sources = [clip]
+    settings.source_loop = True
+    settings.capture_threaded = False  # Time the decode on the measured thread
+    settings.motion_gate_enabled = False
+    settings.tracker_enabled = False
+    settings.static_location = (52.37, 4.89)
+    settings.roi = roi
+    settings.api_url = server_url
+    settings.outbox_path = outbox_path
+    return settings
+
+
+def run_config(clip, width, height, roi_fraction, model, frames, notify_every, server, tmpdir):
+    roi_w, roi_h = int(width * roi_fraction), int(height * roi_fraction)
+    roi = ((width - roi_w) // 2, (height - roi_h) // 2, roi_w, roi_h)
+    outbox_path = os.path.join(tmpdir, f"outbox_{time.monotonic_ns()}.db")
+    settings = make_settings(clip, roi, server.url, outbox_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        detector = YOLONDetector(api_url=server.url, settings=settings, model=model)
+
+    timings = {stage: [] for stage in STAGES}
+    for i in range(frames + WARMUP_FRAMES):
+        t0 = time.perf_counter()
+        frame = detector.read_frame()
+        t1 = time.perf_counter()
+        roi_frame = detector.crop_roi(frame)
+        imgsz = detector.inference_size(roi_frame)
+        t2 = time.perf_counter()
+        results = detector.predict(roi_frame, imgsz)
+        t3 = time.perf_counter()
+        detections = results_to_detections(results, detector.target_class_ids, detector.confidence_threshold,
+                                           roi[:2])
+        zone_ids = detector.roi_handler.assign_zones(detections, detector.confidence_threshold)
+        detector.detections = detections
+        t4 = time.perf_counter()
+        if len(detections) and i % notify_every == 0:
+            detector.send_notifications(detections, roi, zone_ids)
+        t5 = time.perf_counter()
+        detector.render(frame)
+        t6 = time.perf_counter()
+        if i >= WARMUP_FRAMES:
+            for stage, duration in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4, t6 - t5, t6 - t0)):
+                timings[stage].append(duration)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        detector.close()
+    notifications = detector.notifier.stats()
+    return {
+        'resolution': f"{width}x{height}",
+        'roi_fraction': roi_fraction,
+        'detections': int(len(detections)),
+        'fps': frames / sum(timings['total']),
+        'stages': {stage: latency_stats(values) for stage, values in timings.items()},
+        'notifications': {key: notifications[key] for key in ('submitted', 'sent', 'failed', 'dropped')},
+        'delivery_latency_ms': {'mean': notifications['avg_latency'] * 1000,
+                                'max': notifications['max_latency'] * 1000}
+    }
+
+
+def config_key(result):
+    return result['model'], result['resolution'], result['roi_fraction'], result['detections']
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_result(result, baseline=None):
+    label = f"{result['model']} {result['resolution']} roi={result['roi_fraction']:.2f} det={result['detections']}"
+    change = ''
+    if baseline is not None:
+        change = f"  ({(result['fps'] / baseline['fps'] - 1) * 100:+.1f}% vs baseline)"
+    print(f"{label}: {result['fps']:.1f} FPS{change}")
+    for stage in STAGES:
+        stats = result['stages'][stage]
+        line = f"    {stage:<12} p50 {stats['p50']:8.2f}  p95 {stats['p95']:8.2f}  p99 {stats['p99']:8.2f} ms"
+        if baseline is not None:
+            base = baseline['stages'][stage]['p50']
+            line += f"  p50 {(stats['p50'] - base):+8.2f} ms" if base else ''
+        print(line)
+
+
+def parse_resolutions(value):
+    return [tuple(int(v) for v in item.split('x')) for item in value.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=100, help="Measured frames per configuration")
+    parser.add_argument('--resolutions', type=parse_resolutions, default=RESOLUTIONS, metavar='WxH,...')
+    parser.add_argument('--roi-fractions', type=lambda v: [float(f) for f in v.split(',')], default=ROI_FRACTIONS)
+    parser.add_argument('--detections', type=lambda v: [int(d) for d in v.split(',')], default=DETECTION_COUNTS)
+    parser.add_argument('--notify-every', type=int, default=10, help="Send the frame's detections every Nth frame")
+    parser.add_argument('--real-model', nargs='?', const='yolov8n.pt', metavar='PATH',
+                        help="Also run the real model on CPU (default weights: yolov8n.pt)")
+    parser.add_argument('--output', help="Save the results as JSON")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    models = [('stub', count, StubModel(count)) for count in args.detections]
+    if args.real_model:
+        models.append((args.real_model, None, load_model(args.real_model)))
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {config_key(result): result for result in json.load(f)['results']}
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir, NotificationServer() as server:
+        for width, height in args.resolutions:
+            clip = os.path.join(tmpdir, f"clip_{width}x{height}.avi")
+            write_clip(clip, width, height)
+            for roi_fraction in args.roi_fractions:
+                for name, _, model in models:
+                    result = run_config(clip, width, height, roi_fraction, model, args.frames,
+                                        max(1, args.notify_every), server, tmpdir)
+                    result['model'] = name
+                    results.append(result)
+                    print_result(result, baseline.get(config_key(result)))
+
+    if args.output:
+        report = {
+            'meta': {
+                'commit': git_commit(),
+                'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'platform': platform.platform(),
+                'python': platform.python_version(),
+                'opencv': cv2.__version__,
+                'cpu_count': os.cpu_count(),
+                'frames': args.frames
+            },
+            'results': results
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Cost of several polygon zones per camera: one inference on the union bounding box of the
+zones plus mask-based zone assignment, against one inference per zone crop.
+
+Usage: python -m benchmarks.bench_zones [--model yolov8n.pt] [--frames 20] [--detections 50]
+"""
+import argparse
+import time
+import numpy as np
+from benchmarks.common import latency_stats, load_model
+from detector.core.detections import DETECTION_DTYPE
+from detector.core.obj_detector import crop_roi, inference_size_for
+from detector.core.roi_handler import ROIHandler, Zone
+
+FRAME_SIZE = (1280, 720)
+# Doorway, loading bay and fence line of a 720p view
+ZONES = [
+    Zone('doorway', ((140, 160), (360, 160), (360, 560), (140, 560))),
+    Zone('loading_bay', ((520, 300), (980, 300), (1060, 620), (460, 620)), min_confidence=0.6),
+    Zone('fence', ((200, 620), (1180, 600), (1180, 660), (200, 690)), min_overlap=0.3)
+]
+
+
+def random_detections(count, rng):
+    detections = np.empty(count, dtype=DETECTION_DTYPE)
+    x1 = rng.integers(0, FRAME_SIZE[0] - 100, count)
+    y1 = rng.integers(0, FRAME_SIZE[1] - 200, count)
+    detections['x1'], detections['y1'] = x1, y1
+    detections['x2'], detections['y2'] = x1 + rng.integers(20, 100, count), y1 + rng.integers(40, 200, count)
+    detections['confidence'] = rng.uniform(0.3, 1.0, count)
+    detections['class_id'] = 0
+    return detections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='yolov8n.pt')
+    parser.add_argument('--frames', type=int, default=20)
+    parser.add_argument('--detections', type=int, default=50, help="Detections per frame for the assignment timing")
+    parser.add_argument('--max-size', type=int, default=640)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (FRAME_SIZE[1], FRAME_SIZE[0], 3), dtype=np.uint8)
+    handler = ROIHandler()
+    start = time.perf_counter()
+    handler.set_zones(ZONES, verbose=False)
+    print(f"{len(ZONES)} zones, ROI {handler.get_roi()}, masks built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    detections = random_detections(args.detections, rng)
+    timings = []
+    for _ in range(1000):
+        start = time.perf_counter()
+        handler.assign_zones(detections, 0.5)
+        timings.append(time.perf_counter() - start)
+    print(f"Zone assignment of {args.detections} detections: p50 {latency_stats(timings)['p50'] * 1000:.1f} us")
+
+    model = load_model(args.model)
+    roi = handler.get_roi()
+    union_crop = crop_roi(frame, roi)
+    zone_crops = [crop_roi(frame, tuple(int(v) for v in np.concatenate(
+        [np.min(zone.points, axis=0), np.ptp(zone.points, axis=0)]))) for zone in ZONES]
+
+    def union_pass():
+        model(union_crop, imgsz=inference_size_for(roi[2], roi[3], args.max_size), conf=0.25, verbose=False)
+
+    def per_zone_pass():
+        for crop in zone_crops:
+            model(crop, imgsz=inference_size_for(crop.shape[1], crop.shape[0], args.max_size), conf=0.25,
+                  verbose=False)
+
+    for name, run in (('union crop (1 pass)', union_pass), (f'per-zone crops ({len(ZONES)} passes)', per_zone_pass)):
+        run()  # Warm-up
+        timings = []
+        for _ in range(args.frames):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        stats = latency_stats(timings)
+        print(f"{name:<26} p50 {stats['p50']:7.1f} ms  p95 {stats['p95']:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
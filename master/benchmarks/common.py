@@ -0,0 +1,103 @@
+"""
+Shared helpers for the benchmarks: a deterministic stub model, a local stand-in for the
+notification API and latency statistics.
+"""
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Tuple
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+
+PERCENTILES = (50, 95, 99)
+
+
+def load_model(model_path: str = 'yolov8n.pt'):
+    """
+    Loads a YOLO model; without the weights file the untrained `.yaml` architecture of the
+    same size is used (same latency, different detections).
+    """
+    from ultralytics import YOLO
+    if not os.path.exists(model_path) and model_path.endswith('.pt'):
+        model_path = model_path[:-3] + '.yaml'
+    return YOLO(model_path)
+
+
+class StubModel:
+    """
+    Deterministic stand-in for a YOLO model: every crop yields the same `detections` 'person'
+    boxes laid out on a grid, wrapped in real ultralytics Results so post-processing runs
+    the production code path.
+    """
+    names = {0: 'person', 1: 'bicycle', 2: 'car'}
+
+    def __init__(self, detections: int = 5):
+        self.detections = detections
+        self._boxes: Dict[Tuple[int, int], torch.Tensor] = {}
+
+    def _boxes_for(self, height: int, width: int) -> torch.Tensor:
+        key = (height, width)
+        if key not in self._boxes:
+            columns = max(1, int(np.ceil(np.sqrt(self.detections))))
+            cell_w, cell_h = width / columns, height / columns
+            rows = []
+            for i in range(self.detections):
+                x, y = (i % columns) * cell_w, (i // columns) * cell_h
+                rows.append([x + 1, y + 1, x + cell_w * 0.8, y + cell_h * 0.8, 0.9, 0.0])
+            self._boxes[key] = torch.tensor(rows, dtype=torch.float32).reshape(-1, 6)
+        return self._boxes[key]
+
+    def __call__(self, crops, **kwargs):
+        crops = crops if isinstance(crops, list) else [crops]
+        return [Results(crop, 'stub', self.names, boxes=self._boxes_for(*crop.shape[:2])) for crop in crops]
+
+
+class NotificationServer:
+    """
+    Local HTTP server accepting notification POSTs (single and bulk) with a 200 response.
+    """
+
+    def __init__(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                payload = json.loads(body)
+                with server.lock:
+                    server.received += len(payload) if isinstance(payload, list) else 1
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.lock = threading.Lock()
+        self.received = 0
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/notifications"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def latency_stats(timings_s: Iterable[float]) -> Dict[str, float]:
+    """
+    :param timings_s: Durations in seconds.
+    :return: Mean and percentile latencies in milliseconds.
+    """
+    values = np.asarray(list(timings_s), dtype=np.float64) * 1000
+    if values.size == 0:
+        return {'mean': 0.0, **{f"p{p}": 0.0 for p in PERCENTILES}}
+    stats = {'mean': float(values.mean())}
+    stats.update({f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))})
+    return stats
@@ -19,13 +19,29 @@ detector = YOLONDetector(model_path='yolov8n.pt')
 detector.run()
 """
 
-# Ensure correct relative imports
-from .core.obj_detector import YOLONDetector
-from .core.roi_handler import ROIHandler
-from .core.frame_processor import FrameProcessor
-from .utils.camera import Camera
-from .utils.geocoding import Geocoder
-from .utils.id_generator import IDGenerator
-from .api.client import APIClient
+# Public names are imported on first access, so lightweight modules (settings, API models,
+# ID generation) can be used without loading OpenCV or the model runtime
+from typing import TYPE_CHECKING
+from .utils.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .core.obj_detector import YOLONDetector
+    from .core.roi_handler import ROIHandler
+    from .core.frame_processor import FrameProcessor
+    from .utils.camera import Camera
+    from .utils.geocoding import Geocoder
+    from .utils.id_generator import IDGenerator
+    from .api.client import APIClient
+
+_EXPORTS = {
+    "YOLONDetector": "detector.core.obj_detector",
+    "ROIHandler": "detector.core.roi_handler",
+    "FrameProcessor": "detector.core.frame_processor",
+    "Camera": "detector.utils.camera",
+    "Geocoder": "detector.utils.geocoding",
+    "IDGenerator": "detector.utils.id_generator",
+    "APIClient": "detector.api.client"
+}
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = ["YOLONDetector","ROIHandler","FrameProcessor", "Camera", "Geocoder", "IDGenerator", "APIClient"]
@@ -1,9 +1,33 @@
 # Initialize the API package for notifications and related services.
+from typing import TYPE_CHECKING
+from detector.utils.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .client import APIClient
+    from .dispatcher import NotificationDispatcher
+    from .outbox import NotificationOutbox, OutboxReplayer
+    from .models import Detection, Location, Notification
+    from .records import NotificationRecord
+
+_EXPORTS = {
+    "APIClient": "detector.api.client",
+    "NotificationDispatcher": "detector.api.dispatcher",
+    "NotificationOutbox": "detector.api.outbox",
+    "OutboxReplayer": "detector.api.outbox",
+    "Detection": "detector.api.models",
+    "Location": "detector.api.models",
+    "Notification": "detector.api.models",
+    "NotificationRecord": "detector.api.records"
+}
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
-from .client import APIClient
-from .models import Detection, Location, Notification
 __all__ = [
     "APIClient",
-    "ROIHandler",
-    "FrameProcessor"
+    "NotificationDispatcher",
+    "NotificationOutbox",
+    "OutboxReplayer",
+    "Detection",
+    "Location",
+    "Notification",
+    "NotificationRecord"
 ]
\ No newline at end of file
@@ -1,40 +1,126 @@
+import hashlib
 import requests
-import json
-from typing import Dict, Optional
+import time
+from requests.adapters import HTTPAdapter
+from typing import List, Optional, Tuple
+from detector.api.records import NotificationData, notification_key, to_json, to_json_array, to_ndjson
 
 class APIClient:
-    def __init__(self, api_url: str, api_key: str):
+    def __init__(self, api_url: str, api_key: str, timeout: Tuple[float, float] = (3.05, 10.0),
+                 pool_size: int = 4, bulk_url: Optional[str] = None, bulk_format: str = 'json', metrics=None):
         """
         Initializes the API client with the provided API URL and API key.
         :param api_url: The URL of the API to send notifications to.
         :param api_key: The API key used for authentication.
+        :param timeout: (connect, read) timeouts in seconds for every request.
+        :param pool_size: Number of keep-alive connections kept in the session pool.
+        :param bulk_url: URL accepting a JSON array of notifications (default is `<api_url>/bulk`).
+        :param bulk_format: Body of bulk POSTs: 'json' (an array) or 'ndjson' (one notification per line).
+        :param metrics: PipelineMetrics recording POST latency and failures (optional).
         """
         self.api_url = api_url
         self.api_key = api_key
+        self.bulk_url = bulk_url or f"{api_url.rstrip('/')}/bulk"
+        self.timeout = timeout
+        if bulk_format not in ('json', 'ndjson'):
+            raise ValueError(f"Unknown bulk format '{bulk_format}', expected 'json' or 'ndjson'")
+        self.bulk_format = bulk_format
+        self.metrics = metrics
         self.headers = {
             'Content-Type': 'application/json',
             'Authorization': f'Bearer {self.api_key}'
         }
 
-    def send_notification(self, data: Dict) -> bool:
+        # Reuse TCP/TLS connections across notifications instead of reconnecting on every POST
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _post(self, url: str, body: str, idempotency_key: str, content_type: Optional[str] = None) -> Tuple[bool, bool]:
         """
-        Sends a notification to the API with the provided data.
-        :param data: A dictionary containing the notification data.
-        :return: True if the notification was successfully sent, False otherwise.
+        Posts a JSON body to the API.
+        :param idempotency_key: Sent as the Idempotency-Key header; it is the same for every retry of the body.
+        :return: A tuple (success, retryable). Network errors, timeouts, 429 and 5xx responses are retryable.
         """
+        start = time.perf_counter()
         try:
-            # Send a POST request to the API with the notification data
-            response = requests.post(self.api_url, headers=self.headers, data=json.dumps(data))
-
-            # Check if the response status code indicates success (200 OK)
-            if response.status_code == 200:
-                print(f"Notification sent successfully: {data}")
-                return True
-            else:
-                print(f"Failed to send notification. Status code: {response.status_code}")
-                print(f"Response: {response.text}")
-                return False
+            headers = {'Idempotency-Key': idempotency_key}
+            if content_type:
+                headers['Content-Type'] = content_type
+            response = self.session.post(url, data=body, headers=headers, timeout=self.timeout)
+
+            # Check if the response status code indicates success (2xx)
+            if 200 <= response.status_code < 300:
+                self._record(start, 'success')
+                return True, False
+            self._record(start, 'error', f"http_{response.status_code}")
+            print(f"Failed to send notification. Status code: {response.status_code}")
+            print(f"Response: {response.text}")
+            return False, response.status_code == 429 or response.status_code >= 500
         except requests.exceptions.RequestException as e:
+            self._record(start, 'error', type(e).__name__)
             # Handle any request exceptions (e.g., network issues, timeout)
             print(f"Error sending notification: {str(e)}")
-            return False
+            return False, True
+
+    def _record(self, start: float, outcome: str, failure: Optional[str] = None):
+        if self.metrics is None:
+            return
+        self.metrics.send_seconds.labels(outcome).observe(time.perf_counter() - start)
+        if failure is not None:
+            self.metrics.send_failures.labels(failure).inc()
+
+    def deliver(self, notifications: List[NotificationData]) -> Tuple[bool, bool]:
+        """
+        Sends one notification, or several in a single bulk POST.
+
+        The Idempotency-Key of a single notification is its ID, so retries and outbox replays of
+        a delivered notification can be recognized by the API. A bulk POST is keyed by a digest
+        of its notification IDs (the IDs in the body remain the keys of the individual items).
+        :param notifications: List of NotificationRecords or notification dictionaries.
+        :return: A tuple (success, retryable).
+        """
+        if len(notifications) == 1:
+            return self._post(self.api_url, to_json(notifications[0]), notification_key(notifications[0]))
+        key = batch_key(notifications)
+        if self.bulk_format == 'ndjson':
+            return self._post(self.bulk_url, to_ndjson(notifications), key, 'application/x-ndjson')
+        return self._post(self.bulk_url, to_json_array(notifications), key)
+
+    def send_notification(self, data: NotificationData) -> bool:
+        """
+        Sends a notification to the API with the provided data.
+        :param data: A NotificationRecord or a dictionary containing the notification data.
+        :return: True if the notification was successfully sent, False otherwise.
+        """
+        success, _ = self.deliver([data])
+        if success:
+            print(f"Notification sent successfully: {data}")
+        return success
+
+    def send_batch(self, notifications: List[NotificationData]) -> bool:
+        """
+        Sends several notifications in one POST to the bulk endpoint.
+        :param notifications: List of NotificationRecords or notification dictionaries.
+        :return: True if the batch was successfully sent, False otherwise.
+        """
+        success, _ = self.deliver(notifications)
+        return success
+
+    def close(self):
+        """
+        Closes the pooled connections.
+        """
+        self.session.close()
+
+
+def batch_key(notifications: List[NotificationData]) -> str:
+    """
+    :return: Idempotency key of a bulk POST: a digest of the notification IDs, in order.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for data in notifications:
+        digest.update(notification_key(data).encode() + b'\n')
+    return digest.hexdigest()
@@ -0,0 +1,225 @@
+import queue
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from detector.api.client import APIClient
+from detector.api.outbox import NotificationOutbox
+from detector.api.records import NotificationData
+
+
+class NotificationDispatcher:
+    """
+    Sends notifications from a pool of worker threads so the detection loop never waits on
+    the network. Notifications are queued by submit(); workers optionally group several
+    of them into one bulk POST and retry failed deliveries with exponential backoff and jitter.
+    Notifications the API rejects (non-retryable errors) are not retried; with an outbox they
+    are moved to its dead-letter table instead of being left there for replay.
+    """
+
+    def __init__(self, api_client: APIClient, workers: int = 2, queue_size: int = 1000,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 batch_size: int = 1, batch_wait_ms: float = 50, outbox: Optional[NotificationOutbox] = None,
+                 metrics=None):
+        """
+        :param api_client: Client used to deliver notifications.
+        :param workers: Number of sender threads.
+        :param queue_size: Maximum number of pending notifications; submit() drops new ones when full.
+        :param max_retries: Retries per delivery after the first attempt for retryable failures.
+        :param backoff_base: Base delay in seconds for exponential backoff.
+        :param backoff_max: Upper bound for a single backoff delay in seconds.
+        :param batch_size: Maximum notifications per POST (1 disables batching).
+        :param batch_wait_ms: How long a worker waits to fill a batch once it has one notification.
+        :param outbox: Durable outbox every notification is written to before it is queued; it is
+                       acknowledged there once delivered, so undelivered ones survive for replay.
+        :param metrics: PipelineMetrics recording capture-to-delivery latency (optional).
+        """
+        self.api_client = api_client
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait_ms / 1000.0
+        self.outbox = outbox
+        self.metrics = metrics
+
+        # Items are (enqueued_at, notification, captured_at)
+        self._queue: "queue.Queue[Tuple[float, NotificationData, Optional[float]]]" = queue.Queue(maxsize=queue_size)
+        self._threads: List[threading.Thread] = []
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+        # Delivery statistics
+        self.submitted = 0
+        self.sent = 0
+        self.failed = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.retries = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def start(self):
+        """
+        Starts the worker threads.
+        """
+        if self._threads:
+            return
+        self._stop_event.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"notification-sender-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, data: NotificationData, captured_at: Optional[float] = None) -> bool:
+        """
+        Queues a notification for delivery without blocking.
+        :param data: A NotificationRecord or a dictionary containing the notification data.
+        :param captured_at: Capture time (time.time()) of the frame the notification is about.
+        :return: True if the notification was queued, False if the queue is full and it was dropped
+                 (it is still kept in the outbox, if one is configured).
+        """
+        if self.outbox is not None:
+            self.outbox.append(data)
+        try:
+            self._queue.put_nowait((time.monotonic(), data, captured_at))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            if self.outbox is not None:
+                print("Notification queue full, leaving notification in the outbox for replay")
+            else:
+                print("Notification queue full, dropping notification")
+            return False
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def _next_batch(self) -> List[Tuple[float, NotificationData, Optional[float]]]:
+        try:
+            batch = [self._queue.get(timeout=0.2)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spreads retries from many senders instead of hammering a recovering API in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _worker(self):
+        while not self._stop_event.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self._handle_batch(batch)
+            except Exception as e:
+                # Keep the worker alive; with an outbox the batch is replayed later
+                with self._lock:
+                    self.failed += len(batch)
+                print(f"Error delivering {len(batch)} notification(s): {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _handle_batch(self, batch: List[Tuple[float, NotificationData, Optional[float]]]):
+        """
+        Delivers a batch and records the outcome in the outbox, the counters and the metrics.
+        """
+        notifications = [data for _, data, _ in batch]
+        success, retryable = self._deliver(notifications)
+        if success or retryable or len(batch) == 1:
+            results = [(success, retryable)] * len(batch)
+        else:
+            # One rejected notification fails the whole bulk POST: resend them one by one to find it
+            results = [self._deliver([data]) for data in notifications]
+        delivered = [item for item, (ok, _) in zip(batch, results) if ok]
+        rejected = [item[1] for item, (ok, again) in zip(batch, results) if not ok and not again]
+        if self.outbox is not None:
+            if delivered:
+                self.outbox.ack([NotificationOutbox.key(data) for _, data, _ in delivered])
+            if rejected:
+                self.outbox.reject([NotificationOutbox.key(data) for data in rejected])
+        elif rejected:
+            print(f"Dropping {len(rejected)} notification(s) rejected by the API")
+        if delivered and self.metrics is not None:
+            delivered_at = time.time()
+            for _, _, captured_at in delivered:
+                if captured_at is not None:
+                    self.metrics.capture_to_notification_seconds.labels().observe(delivered_at - captured_at)
+        # Counted last, so a batch that raises above is only counted once, as failed
+        now = time.monotonic()
+        with self._lock:
+            self.sent += len(delivered)
+            self.failed += len(batch) - len(delivered)
+            self.rejected += len(rejected)
+            for enqueued_at, _, _ in delivered:
+                latency = now - enqueued_at
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+
+    def _deliver(self, notifications: List[NotificationData]) -> Tuple[bool, bool]:
+        """
+        Delivers notifications, retrying retryable failures.
+        :return: A tuple (success, retryable) of the last attempt.
+        """
+        for attempt in range(self.max_retries + 1):
+            success, retryable = self.api_client.deliver(notifications)
+            if success:
+                return True, False
+            if not retryable or attempt == self.max_retries:
+                break
+            with self._lock:
+                self.retries += 1
+            if self._stop_event.wait(self._backoff(attempt)):
+                break
+        print(f"Giving up on {len(notifications)} notification(s)")
+        return False, retryable
+
+    def queue_depth(self) -> int:
+        """
+        :return: Number of notifications waiting to be sent.
+        """
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        :return: Dictionary with queue depth, delivery counters and latency (seconds from submit to delivery).
+        """
+        with self._lock:
+            return {
+                'queue_depth': self.queue_depth(),
+                'submitted': self.submitted,
+                'sent': self.sent,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'dropped': self.dropped,
+                'retries': self.retries,
+                'avg_latency': self.total_latency / self.sent if self.sent else 0.0,
+                'max_latency': self.max_latency
+            }
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """
+        Stops the workers after draining the queue (bounded by `timeout`).
+        :param timeout: Seconds to wait for pending notifications to be delivered.
+        """
+        if not self._threads:
+            return
+        deadline = time.monotonic() + (timeout or 0)
+        while not self._queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=max(0.1, deadline - time.monotonic()))
+        self._threads = []
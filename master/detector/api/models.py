@@ -8,6 +8,7 @@ class Detection(BaseModel):
     object: str  # e.g., 'person'
     confidence: float  # Confidence score for the detection
     bbox: List[int]  # Bounding box [x1, y1, x2, y2]
+    track_id: Optional[int] = None  # Tracker ID, only sent when tracking is enabled
 
 class Location(BaseModel):
     """
@@ -16,6 +17,14 @@ class Location(BaseModel):
     roi: Tuple[int, int, int, int]  # (x, y, width, height)
     camera_id: str  # Camera ID, e.g., "camera_1"
     coordinates: Optional[Tuple[float, float]] = None  # Latitude, Longitude (Optional)
+    zone: Optional[str] = None  # Name of the detection zone the object was found in
+
+class Media(BaseModel):
+    """
+    Represents local files recorded for the detection, written shortly after the notification is sent.
+    """
+    snapshot: Optional[str] = None  # JPEG of the frame with the detections drawn
+    clip: Optional[str] = None  # Video from the pre-roll before to the post-roll after the detection
 
 class Notification(BaseModel):
     """
@@ -25,3 +34,4 @@ class Notification(BaseModel):
     timestamp: str  # Timestamp of when the detection was made
     detection: Detection  # Detection details
     location: Location  # Location details
+    media: Optional[Media] = None  # Snapshot and clip, if media recording is enabled
@@ -0,0 +1,346 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+from detector.api.client import APIClient
+from detector.api.records import NotificationData, notification_key, to_json
+
+
+class NotificationOutbox:
+    """
+    Append-only local store for notifications that have not been acknowledged by the API yet.
+
+    Backed by SQLite in WAL mode. append() and ack() only touch in-memory lists; a writer
+    thread commits them together every `flush_interval_ms` (group commit), so the detection
+    loop never waits on disk. With the default synchronous=NORMAL, WAL commits are not
+    fsync'ed individually.
+
+    Notifications the API rejects as invalid (non-retryable errors) are moved to a separate
+    dead-letter table by reject(), so they are kept for inspection but never replayed again.
+    That table is capped at `max_dead_letters` rows, the oldest rejections being evicted first.
+    """
+
+    def __init__(self, path: str = 'notifications_outbox.db', max_entries: int = 100000,
+                 flush_interval_ms: float = 200, synchronous: str = 'NORMAL', compact_every: int = 1000,
+                 max_dead_letters: int = 10000):
+        """
+        :param path: SQLite database file.
+        :param max_entries: Upper bound on stored notifications; the oldest ones are evicted beyond it.
+        :param max_dead_letters: Upper bound on rejected notifications kept in the dead-letter table.
+        :param flush_interval_ms: Group commit interval for buffered appends and acks.
+        :param synchronous: SQLite synchronous mode ('OFF', 'NORMAL' or 'FULL').
+        :param compact_every: Checkpoint the WAL and reclaim free pages after this many acks.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_dead_letters = max_dead_letters
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.compact_every = compact_every
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.execute("PRAGMA journal_size_limit=8388608")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "nid TEXT NOT NULL UNIQUE, "
+            "created REAL NOT NULL, "
+            "payload TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS dead_letter ("
+            "nid TEXT PRIMARY KEY, "
+            "created REAL NOT NULL, "
+            "rejected REAL NOT NULL, "
+            "payload TEXT NOT NULL)"
+        )
+        self._count = self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+        self._dead_letter_count = self._conn.execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
+        self._db_lock = threading.Lock()
+
+        self._lock = threading.Lock()
+        self._pending_inserts: Dict[str, Tuple[str, float, str]] = {}
+        self._pending_acks: List[str] = []
+        self._pending_rejects: List[Tuple[float, str]] = []  # (rejected, nid) of stored entries
+        self._pending_dead_letters: List[Tuple[str, float, float, str]] = []  # Rejected before being stored
+        self._acks_since_compaction = 0
+        self.evicted = 0
+        self.dead_lettered = 0
+        self.dead_letters_evicted = 0
+
+        self._stop_event = threading.Event()
+        self._writer = threading.Thread(target=self._writer_loop, name="outbox-writer", daemon=True)
+        self._writer.start()
+
+    @staticmethod
+    def key(data: NotificationData) -> str:
+        """
+        :return: The outbox key of a notification (its `id`).
+        """
+        return notification_key(data)
+
+    def append(self, data: NotificationData) -> str:
+        """
+        Buffers a notification for the next group commit.
+        :param data: A NotificationRecord or a dictionary containing the notification data.
+        :return: The key under which the notification is stored.
+        """
+        if isinstance(data, dict) and 'id' not in data:
+            data['id'] = uuid.uuid4().hex
+        nid = self.key(data)
+        payload = to_json(data)  # Records keep it, so the API client does not serialize again
+        with self._lock:
+            self._pending_inserts[nid] = (nid, time.time(), payload)
+        return nid
+
+    def ack(self, nids: List[str]):
+        """
+        Marks notifications as delivered so they are removed on the next commit.
+        :param nids: Keys returned by append().
+        """
+        with self._lock:
+            for nid in nids:
+                # Delivered before it ever reached the disk: drop it from the buffer instead
+                if self._pending_inserts.pop(nid, None) is None:
+                    self._pending_acks.append(nid)
+
+    def reject(self, nids: List[str]):
+        """
+        Moves notifications the API refused to the dead-letter table on the next commit, so
+        they no longer hold up the replay of newer ones.
+        :param nids: Keys returned by append().
+        """
+        now = time.time()
+        with self._lock:
+            for nid in nids:
+                entry = self._pending_inserts.pop(nid, None)
+                if entry is None:
+                    self._pending_rejects.append((now, nid))
+                else:
+                    self._pending_dead_letters.append((nid, entry[1], now, entry[2]))
+        print(f"Moved {len(nids)} notification(s) rejected by the API to the dead-letter table")
+
+    def flush(self):
+        """
+        Commits buffered appends and acks in a single transaction.
+        """
+        # Holding the database lock across the swap keeps commits in the order appends and acks arrived
+        with self._db_lock:
+            with self._lock:
+                inserts = list(self._pending_inserts.values())
+                acks = self._pending_acks
+                rejects = self._pending_rejects
+                dead_letters = self._pending_dead_letters
+                self._pending_inserts = {}
+                self._pending_acks = []
+                self._pending_rejects = []
+                self._pending_dead_letters = []
+            if not inserts and not acks and not rejects and not dead_letters:
+                return
+
+            self._conn.execute("BEGIN")
+            try:
+                count = self._count
+                dead_letter_count = self._dead_letter_count
+                if inserts:
+                    count += self._conn.executemany(
+                        "INSERT OR IGNORE INTO outbox (nid, created, payload) VALUES (?, ?, ?)", inserts).rowcount
+                if dead_letters:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO dead_letter (nid, created, rejected, payload) VALUES (?, ?, ?, ?)",
+                        dead_letters)
+                if rejects:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO dead_letter (nid, created, rejected, payload) "
+                        "SELECT nid, created, ?, payload FROM outbox WHERE nid = ?", rejects)
+                    count -= self._conn.executemany(
+                        "DELETE FROM outbox WHERE nid = ?", [(nid,) for _, nid in rejects]).rowcount
+                if acks:
+                    count -= self._conn.executemany(
+                        "DELETE FROM outbox WHERE nid = ?", [(nid,) for nid in acks]).rowcount
+                evicted = max(0, count - self.max_entries)
+                if evicted:
+                    self._conn.execute(
+                        "DELETE FROM outbox WHERE seq IN (SELECT seq FROM outbox ORDER BY seq LIMIT ?)", (evicted,))
+                dead_letters_evicted = 0
+                if rejects or dead_letters:
+                    # INSERT OR REPLACE does not tell new rows from replaced ones: count again
+                    dead_letter_count = self._conn.execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
+                    dead_letters_evicted = max(0, dead_letter_count - self.max_dead_letters)
+                    if dead_letters_evicted:
+                        self._conn.execute(
+                            "DELETE FROM dead_letter WHERE rowid IN "
+                            "(SELECT rowid FROM dead_letter ORDER BY rejected, rowid LIMIT ?)", (dead_letters_evicted,))
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._count = count - evicted
+            self._dead_letter_count = dead_letter_count - dead_letters_evicted
+        self.dead_lettered += len(rejects) + len(dead_letters)
+
+        if evicted:
+            self.evicted += evicted
+            print(f"Outbox full, evicted {evicted} oldest notification(s)")
+        if dead_letters_evicted:
+            self.dead_letters_evicted += dead_letters_evicted
+            print(f"Dead-letter table full, evicted {dead_letters_evicted} oldest rejected notification(s)")
+        self._acks_since_compaction += len(acks) + len(rejects) + dead_letters_evicted
+        if self._acks_since_compaction >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """
+        Folds the WAL back into the database and returns pages freed by acknowledged entries.
+        """
+        with self._db_lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("PRAGMA incremental_vacuum")
+        self._acks_since_compaction = 0
+
+    def pending(self, limit: int = 100, older_than: Optional[float] = None) -> List[Tuple[str, Dict]]:
+        """
+        Returns unacknowledged notifications in the order they were appended.
+        :param limit: Maximum number of entries returned.
+        :param older_than: Only return entries created before this time.time() value.
+        :return: List of (key, notification) pairs.
+        """
+        self.flush()
+        query = "SELECT nid, payload FROM outbox"
+        params: list = []
+        if older_than is not None:
+            query += " WHERE created < ?"
+            params.append(older_than)
+        query += " ORDER BY seq LIMIT ?"
+        params.append(limit)
+        with self._db_lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [(nid, json.loads(payload)) for nid, payload in rows]
+
+    def dead_letters(self, limit: int = 100) -> List[Tuple[str, Dict]]:
+        """
+        Returns notifications moved aside by reject(), oldest rejection first.
+        :param limit: Maximum number of entries returned.
+        :return: List of (key, notification) pairs.
+        """
+        self.flush()
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT nid, payload FROM dead_letter ORDER BY rejected, rowid LIMIT ?", (limit,)).fetchall()
+        return [(nid, json.loads(payload)) for nid, payload in rows]
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._count
+
+    def _writer_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Error writing notification outbox: {str(e)}")
+
+    def close(self):
+        """
+        Flushes buffered entries and closes the database.
+        """
+        self._stop_event.set()
+        self._writer.join(timeout=2.0)
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+
+class OutboxReplayer:
+    """
+    Background thread that re-sends notifications left in the outbox, oldest first.
+
+    Only entries older than `min_age` are replayed, which leaves time for the dispatcher to
+    deliver (and ack) fresh notifications itself. A retryable failure means the API is still
+    unhealthy: the pass stops and the next one is delayed with exponential backoff. Entries the
+    API rejects (non-retryable errors) are moved to the dead-letter table and the pass goes on.
+    """
+
+    def __init__(self, outbox: NotificationOutbox, api_client: APIClient, interval: float = 5.0,
+                 min_age: float = 60.0, batch_size: int = 50, max_interval: float = 300.0):
+        """
+        :param outbox: Outbox to drain.
+        :param api_client: Client used to deliver notifications.
+        :param interval: Seconds between replay passes while the API is healthy.
+        :param min_age: Minimum age in seconds of an entry before it is replayed.
+        :param batch_size: Entries read (and sent in one bulk POST if > 1) per request.
+        :param max_interval: Upper bound for the backoff between passes while the API is down.
+        """
+        self.outbox = outbox
+        self.api_client = api_client
+        self.interval = interval
+        self.min_age = min_age
+        self.batch_size = max(1, batch_size)
+        self.max_interval = max_interval
+        self.replayed = 0
+        self.rejected = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="outbox-replayer", daemon=True)
+            self._thread.start()
+
+    def replay_once(self) -> bool:
+        """
+        Sends pending entries until the outbox has none old enough or a delivery fails with a
+        retryable error.
+        :return: False if a delivery failed with a retryable error, True otherwise.
+        """
+        while not self._stop_event.is_set():
+            entries = self.outbox.pending(self.batch_size, older_than=time.time() - self.min_age)
+            if not entries:
+                return True
+            success, retryable = self.api_client.deliver([data for _, data in entries])
+            if success:
+                self._acknowledge(entries)
+            elif retryable:
+                return False
+            elif len(entries) == 1:
+                self._reject(entries)
+            else:
+                # One rejected notification fails the whole bulk POST: resend them one by one to find it
+                for entry in entries:
+                    success, retryable = self.api_client.deliver([entry[1]])
+                    if success:
+                        self._acknowledge([entry])
+                    elif retryable:
+                        return False
+                    else:
+                        self._reject([entry])
+        return True
+
+    def _acknowledge(self, entries: List[Tuple[str, Dict]]):
+        self.outbox.ack([nid for nid, _ in entries])
+        self.replayed += len(entries)
+
+    def _reject(self, entries: List[Tuple[str, Dict]]):
+        self.outbox.reject([nid for nid, _ in entries])
+        self.rejected += len(entries)
+
+    def _run(self):
+        delay = self.interval
+        while not self._stop_event.wait(delay):
+            try:
+                healthy = self.replay_once()
+            except sqlite3.Error as e:
+                print(f"Error reading notification outbox: {str(e)}")
+                healthy = False
+            delay = self.interval if healthy else min(self.max_interval, delay * 2)
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
@@ -0,0 +1,134 @@
+import json
+from json.encoder import encode_basestring_ascii
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+# Wire schema of one notification, filled in one pass by NotificationRecord.to_json(). Strings are
+# escaped with the json module's C encoder; floats use repr(), as json.dumps() does.
+_NOTIFICATION_JSON = ('{"id":%s,"timestamp":%s,"detection":{"object":%s,"confidence":%r,"bbox":[%d,%d,%d,%d]%s},'
+                      '"location":{"roi":%s,"camera_id":%s,"coordinates":%s,"zone":%s}%s}')
+
+
+def _json_string(value: Optional[str]) -> str:
+    return 'null' if value is None else encode_basestring_ascii(value)
+
+
+class NotificationRecord:
+    """
+    One notification as it travels from the detection loop to the outbox and the API: a flat
+    record with __slots__ instead of the nested dictionaries of the wire schema (see
+    detector.api.models.Notification).
+
+    to_json() renders the wire schema in one pass and keeps the result, so the outbox and the
+    API client share a single serialization. Records are not modified once submitted.
+    """
+    __slots__ = ('id', 'timestamp', 'object', 'confidence', 'bbox', 'track_id', 'roi', 'camera_id',
+                 'coordinates', 'zone', 'snapshot', 'clip', '_json')
+
+    def __init__(self, id: str, timestamp: str, object: str, confidence: float, bbox: Sequence[int],
+                 roi: Optional[Sequence[int]], camera_id: str, coordinates: Optional[Tuple[float, float]] = None,
+                 zone: Optional[str] = None, track_id: Optional[int] = None, snapshot: Optional[str] = None,
+                 clip: Optional[str] = None):
+        """
+        :param bbox: (x1, y1, x2, y2) in frame pixels.
+        :param roi: (x, y, width, height) the detection was made in.
+        :param track_id: Tracker ID; only part of the payload when set.
+        :param snapshot: Local path of the alert snapshot; `media` is only part of the payload with a snapshot or clip.
+        :param clip: Local path of the alert clip.
+        """
+        self.id = id
+        self.timestamp = timestamp
+        self.object = object
+        self.confidence = confidence
+        self.bbox = bbox
+        self.track_id = track_id
+        self.roi = roi
+        self.camera_id = camera_id
+        self.coordinates = coordinates
+        self.zone = zone
+        self.snapshot = snapshot
+        self.clip = clip
+        self._json: Optional[str] = None
+
+    def __repr__(self) -> str:
+        return f"NotificationRecord({self.to_json()})"
+
+    def to_json(self) -> str:
+        """
+        :return: The notification in the wire schema as compact JSON.
+        """
+        if self._json is None:
+            x1, y1, x2, y2 = self.bbox
+            self._json = _NOTIFICATION_JSON % (
+                _json_string(self.id), _json_string(self.timestamp), _json_string(self.object),
+                float(self.confidence), x1, y1, x2, y2,
+                '' if self.track_id is None else ',"track_id":%d' % self.track_id,
+                'null' if self.roi is None else '[%d,%d,%d,%d]' % tuple(self.roi),
+                _json_string(self.camera_id),
+                'null' if self.coordinates is None else '[%r,%r]' % tuple(float(v) for v in self.coordinates),
+                _json_string(self.zone),
+                '' if self.snapshot is None and self.clip is None else
+                ',"media":{"snapshot":%s,"clip":%s}' % (_json_string(self.snapshot), _json_string(self.clip)))
+        return self._json
+
+    def to_dict(self) -> Dict:
+        """
+        :return: The notification in the wire schema as nested dictionaries.
+        """
+        detection = {"object": self.object, "confidence": float(self.confidence), "bbox": [int(v) for v in self.bbox]}
+        if self.track_id is not None:
+            detection["track_id"] = int(self.track_id)
+        data = {
+            "id": self.id,
+            "timestamp": self.timestamp,
+            "detection": detection,
+            "location": {
+                "roi": None if self.roi is None else [int(v) for v in self.roi],
+                "camera_id": self.camera_id,
+                "coordinates": None if self.coordinates is None else [float(v) for v in self.coordinates],
+                "zone": self.zone
+            }
+        }
+        if self.snapshot is not None or self.clip is not None:
+            data["media"] = {"snapshot": self.snapshot, "clip": self.clip}
+        return data
+
+
+NotificationData = Union[NotificationRecord, Dict]
+
+
+def notification_key(data: NotificationData) -> str:
+    """
+    :return: The unique ID of a notification, record or dictionary.
+    """
+    return str(data.id if isinstance(data, NotificationRecord) else data['id'])
+
+
+def to_json(data: NotificationData) -> str:
+    """
+    Serializes a notification; dictionaries (e.g. replayed from the outbox) go through json.dumps().
+    """
+    return data.to_json() if isinstance(data, NotificationRecord) else json.dumps(data, separators=(',', ':'))
+
+
+def to_json_array(notifications: Iterable[NotificationData]) -> str:
+    """
+    :return: A JSON array of notifications for a bulk POST, joined from the serialized records.
+    """
+    return '[' + ','.join(to_json(data) for data in notifications) + ']'
+
+
+def to_ndjson(notifications: Iterable[NotificationData]) -> str:
+    """
+    :return: Newline-delimited JSON, one notification per line.
+    """
+    return ''.join(to_json(data) + '\n' for data in notifications)
+
+
+def validate_notification(data: NotificationData):
+    """
+    Parses the serialized notification with the pydantic wire models (debug mode only: it
+    about doubles the cost of a notification).
+    :raises pydantic.ValidationError: If the payload does not match the schema.
+    """
+    from detector.api.models import Notification as NotificationModel
+    return NotificationModel.model_validate_json(to_json(data))
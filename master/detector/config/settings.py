@@ -1,21 +1,194 @@
+import json
 import os
 
+from typing import Dict, List, Optional, Tuple
+
+def _env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes')
+
+def parse_roi(value: Optional[str]) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Parses an ROI given as "x,y,w,h" in frame pixels.
+    :return: (x, y, w, h), or None for an empty value.
+    """
+    if not value or not value.strip():
+        return None
+    parts = [int(v) for v in value.split(',')]
+    if len(parts) != 4 or parts[2] <= 0 or parts[3] <= 0:
+        raise ValueError(f"Invalid ROI '{value}', expected x,y,w,h with a positive width and height")
+    return tuple(parts)
+
+def parse_zones(value: Optional[str]) -> List[Dict]:
+    """
+    Parses detection zones given as JSON, inline or in a file, e.g.
+    [{"name": "doorway", "points": [[100, 80], [400, 80], [400, 600], [100, 600]],
+      "min_confidence": 0.6, "min_overlap": 0.3}]
+    `min_confidence` and `min_overlap` are optional.
+    :return: List of zone dicts with the keys of roi_handler.Zone (empty for an empty value).
+    """
+    if not value or not value.strip():
+        return []
+    text = value
+    if not value.lstrip().startswith('['):
+        with open(value) as f:
+            text = f.read()
+    zones = []
+    for item in json.loads(text):
+        unknown = set(item) - {'name', 'points', 'min_confidence', 'min_overlap'}
+        if unknown or 'name' not in item or len(item.get('points', [])) < 3:
+            raise ValueError(f"Invalid zone {item}, expected a name and at least 3 points")
+        zones.append({
+            'name': str(item['name']),
+            'points': tuple((int(x), int(y)) for x, y in item['points']),
+            'min_confidence': item.get('min_confidence'),
+            'min_overlap': item.get('min_overlap')
+        })
+    return zones
+
 class Settings:
     def __init__(self):
         # General configuration values
         self.api_url = os.getenv('API_URL', 'http://your-mongodb-api-url/notifications')
         self.api_key = os.getenv('API_KEY', 'your-api-key')
+        self.api_bulk_url = os.getenv('API_BULK_URL')  # Defaults to <API_URL>/bulk
+        self.api_bulk_format = os.getenv('API_BULK_FORMAT', 'json').lower()  # json (array) or ndjson
+        self.api_connect_timeout = float(os.getenv('API_CONNECT_TIMEOUT', 3.05))  # in seconds
+        self.api_read_timeout = float(os.getenv('API_READ_TIMEOUT', 10))  # in seconds
+
+        # Notification dispatcher settings
+        self.notify_workers = int(os.getenv('NOTIFY_WORKERS', 2))
+        self.notify_queue_size = int(os.getenv('NOTIFY_QUEUE_SIZE', 1000))
+        self.notify_max_retries = int(os.getenv('NOTIFY_MAX_RETRIES', 3))
+        self.notify_backoff_base = float(os.getenv('NOTIFY_BACKOFF_BASE', 0.5))  # in seconds
+        self.notify_backoff_max = float(os.getenv('NOTIFY_BACKOFF_MAX', 30))  # in seconds
+        self.notify_batch_size = int(os.getenv('NOTIFY_BATCH_SIZE', 1))  # 1 disables bulk POSTs
+        self.notify_batch_wait_ms = float(os.getenv('NOTIFY_BATCH_WAIT_MS', 50))
+        # Debug mode: check every notification against the pydantic wire models before it is queued
+        self.notify_validate = _env_flag('NOTIFY_VALIDATE', False)
+
+        # Durable notification outbox (SQLite WAL) and replay of undelivered notifications
+        self.outbox_enabled = _env_flag('OUTBOX_ENABLED', True)
+        self.outbox_path = os.getenv('OUTBOX_PATH', 'notifications_outbox.db')
+        self.outbox_max_entries = int(os.getenv('OUTBOX_MAX_ENTRIES', 100000))
+        self.outbox_max_dead_letters = int(os.getenv('OUTBOX_MAX_DEAD_LETTERS', 10000))  # Rejected notifications kept
+        self.outbox_flush_interval_ms = float(os.getenv('OUTBOX_FLUSH_INTERVAL_MS', 200))
+        self.outbox_synchronous = os.getenv('OUTBOX_SYNCHRONOUS', 'NORMAL')  # OFF, NORMAL or FULL
+        self.outbox_replay_interval = float(os.getenv('OUTBOX_REPLAY_INTERVAL', 5))  # in seconds
+        self.outbox_replay_min_age = float(os.getenv('OUTBOX_REPLAY_MIN_AGE', 60))  # in seconds
+
+        # Local detection history (memory-mapped segment files with per-minute rollups)
+        self.event_store_enabled = _env_flag('EVENT_STORE_ENABLED', False)
+        self.event_store_path = os.getenv('EVENT_STORE_PATH', 'events')
+        self.event_store_segment_records = int(os.getenv('EVENT_STORE_SEGMENT_RECORDS', 1 << 20))
+        self.event_store_segment_hours = float(os.getenv('EVENT_STORE_SEGMENT_HOURS', 24))
+        self.event_store_retention_days = float(os.getenv('EVENT_STORE_RETENTION_DAYS', 0))  # 0 keeps everything
+
+        # Alert media: JPEG snapshot and pre/post-roll clip per notified frame, encoded in the background
+        self.media_enabled = _env_flag('MEDIA_ENABLED', False)
+        self.media_dir = os.getenv('MEDIA_DIR', 'media')
+        self.media_pre_roll = float(os.getenv('MEDIA_PRE_ROLL', 3))  # in seconds
+        self.media_post_roll = float(os.getenv('MEDIA_POST_ROLL', 3))  # in seconds
+        self.media_clip_fps = float(os.getenv('MEDIA_CLIP_FPS', 10))
+        self.media_clip_width = int(os.getenv('MEDIA_CLIP_WIDTH', 640))
+        self.media_clip_format = os.getenv('MEDIA_CLIP_FORMAT', 'mp4')  # mp4 or avi
+        self.media_buffer_mb = float(os.getenv('MEDIA_BUFFER_MB', 64))  # Cap of the pre-roll buffer and of each clip
+        self.media_workers = int(os.getenv('MEDIA_WORKERS', 1))
+        self.media_max_pending = int(os.getenv('MEDIA_MAX_PENDING', 8))  # Alerts in progress before media is dropped
+        self.media_jpeg_quality = int(os.getenv('MEDIA_JPEG_QUALITY', 85))
         
         # Camera settings
         self.camera_index = int(os.getenv('CAMERA_INDEX', 0))  # Default is 0 (first camera)
         self.frame_width = int(os.getenv('FRAME_WIDTH', 1280))
         self.frame_height = int(os.getenv('FRAME_HEIGHT', 720))
+        # Comma-separated camera indices for multi-camera mode, e.g. "0,1,2"
+        self.camera_indices = [int(i) for i in os.getenv('CAMERA_INDICES', str(self.camera_index)).split(',') if i.strip()]
+
+        # Frame sources: device index, RTSP/HTTP URL, video file or image glob, separated by ';' for
+        # multi-camera mode. Per-source options go in a fragment: "rtsp://cam/live#fps=5&threads=2&step=2"
+        default_sources = ';'.join(str(i) for i in self.camera_indices)
+        self.sources = [s.strip() for s in os.getenv('SOURCE', default_sources).split(';') if s.strip()]
+        self.source_decode_threads = int(os.getenv('SOURCE_DECODE_THREADS', 0))  # 0 lets FFmpeg decide
+        self.source_target_fps = float(os.getenv('SOURCE_TARGET_FPS', 0))  # 0 disables throttling
+        self.source_frame_step = int(os.getenv('SOURCE_FRAME_STEP', 1))  # deliver every Nth frame
+        self.source_loop = _env_flag('SOURCE_LOOP', False)  # restart files and image sequences
+
+        # Background capture settings
+        self.capture_threaded = _env_flag('CAPTURE_THREADED', True)
+        self.capture_buffer_size = int(os.getenv('CAPTURE_BUFFER_SIZE', 2))
+        self.capture_drop_policy = os.getenv('CAPTURE_DROP_POLICY', 'keep_latest')  # 'keep_latest' or 'drop_oldest'
+        self.frame_pool_enabled = _env_flag('FRAME_POOL_ENABLED', True)  # decode into reused buffers
+
+        # Headless mode: no HighGUI window; the ROI comes from the configuration and annotated
+        # frames are only rendered when an output is configured
+        self.headless = _env_flag('HEADLESS', False)
+        self.roi = parse_roi(os.getenv('ROI'))  # "x,y,w,h" in frame pixels
+        # Named polygon zones (JSON or a JSON file, see parse_zones()); take precedence over ROI.
+        # The model runs once on their union bounding box.
+        self.zones = parse_zones(os.getenv('ZONES'))
+        self.output_video = os.getenv('OUTPUT_VIDEO')  # write annotated frames to this file
+        self.output_fps = float(os.getenv('OUTPUT_FPS', 15))
 
         # YOLO model configuration
         self.model_path = os.getenv('MODEL_PATH', 'yolov8n.pt')
+        # Inference backend: auto (from MODEL_PATH), ultralytics, onnxruntime or openvino. PyTorch
+        # weights are exported to ONNX on first use by the onnxruntime and openvino backends.
+        self.model_backend = os.getenv('MODEL_BACKEND', 'auto')
+        self.model_int8 = _env_flag('MODEL_INT8', False)  # dynamic INT8 quantization (exported backends)
+        self.inference_threads = int(os.getenv('INFERENCE_THREADS', 0))  # 0 keeps the library default
+        self.model_warmup = _env_flag('MODEL_WARMUP', True)  # one inference at startup
+        # Inference worker processes fed through shared memory (multi-camera mode); 0 runs the
+        # model in the main process
+        self.inference_workers = int(os.getenv('INFERENCE_WORKERS', 0))
+        self.target_classes = [c.strip() for c in os.getenv('TARGET_CLASSES', 'person').split(',') if c.strip()]
+        self.confidence_threshold = float(os.getenv('CONFIDENCE_THRESHOLD', 0.5))
+        # Upper bound for the inference size; smaller ROIs are run at (roughly) their own size
+        self.max_inference_size = int(os.getenv('MAX_INFERENCE_SIZE', 640))
+
+        # Motion gate: skip inference while the ROI is static
+        self.motion_gate_enabled = _env_flag('MOTION_GATE_ENABLED', True)
+        self.motion_downscale_width = int(os.getenv('MOTION_DOWNSCALE_WIDTH', 160))
+        self.motion_pixel_threshold = int(os.getenv('MOTION_PIXEL_THRESHOLD', 25))
+        self.motion_min_area = float(os.getenv('MOTION_MIN_AREA', 0.005))  # fraction of the ROI
+        self.motion_background_alpha = float(os.getenv('MOTION_BACKGROUND_ALPHA', 0.05))
+        self.motion_refresh_interval = float(os.getenv('MOTION_REFRESH_INTERVAL', 5))  # in seconds
+        self.motion_cooldown = float(os.getenv('MOTION_COOLDOWN', 2))  # in seconds
+
+        # Multi-object tracking: one notification per new track, inference every Nth frame
+        self.tracker_enabled = _env_flag('TRACKER_ENABLED', True)
+        self.tracker_iou_threshold = float(os.getenv('TRACKER_IOU_THRESHOLD', 0.3))
+        self.tracker_max_age = int(os.getenv('TRACKER_MAX_AGE', 10))  # in frames
+        self.tracker_min_hits = int(os.getenv('TRACKER_MIN_HITS', 2))
+        self.detection_interval = int(os.getenv('DETECTION_INTERVAL', 2))  # run the model every Nth frame
+
+        # Adaptive quality of service: lowers the inference size, detection rate and overlay
+        # quality while the loop is over its frame (or CPU) budget and restores them when load drops
+        self.qos_enabled = _env_flag('QOS_ENABLED', False)
+        self.qos_target_fps = float(os.getenv('QOS_TARGET_FPS', 10))
+        self.qos_cpu_budget = float(os.getenv('QOS_CPU_BUDGET', 0))  # in cores, e.g. 0.5; 0 disables
+        self.qos_window = int(os.getenv('QOS_WINDOW', 15))  # frames per evaluation
+        self.qos_hold_windows = int(os.getenv('QOS_HOLD_WINDOWS', 3))  # calm windows before raising quality
+        self.qos_upgrade_margin = float(os.getenv('QOS_UPGRADE_MARGIN', 0.7))  # fraction of the budget
+        self.qos_min_inference_size = int(os.getenv('QOS_MIN_INFERENCE_SIZE', 256))
+        self.qos_max_frame_stride = int(os.getenv('QOS_MAX_FRAME_STRIDE', 3))
+
+        # Batched multi-camera inference
+        self.batch_max_size = int(os.getenv('BATCH_MAX_SIZE', 8))
+        self.batch_max_wait_ms = float(os.getenv('BATCH_MAX_WAIT_MS', 10))
+
+        # Prometheus-style metrics endpoint (opt-in), served at http://<host>:<port>/metrics
+        self.metrics_enabled = _env_flag('METRICS_ENABLED', False)
+        self.metrics_host = os.getenv('METRICS_HOST', '0.0.0.0')
+        self.metrics_port = int(os.getenv('METRICS_PORT', 9108))
 
         # Location update settings
         self.location_update_interval = int(os.getenv('LOCATION_UPDATE_INTERVAL', 60))  # in seconds
+        self.location_failure_ttl = int(os.getenv('LOCATION_FAILURE_TTL', 30))  # retry delay after a failed lookup, in seconds
+        # Fixed coordinates for cameras that don't move; disables IP geolocation when both are set
+        static_latitude = os.getenv('STATIC_LATITUDE')
+        static_longitude = os.getenv('STATIC_LONGITUDE')
+        self.static_location = None
+        if static_latitude and static_longitude:
+            self.static_location = (float(static_latitude), float(static_longitude))
 
     def __repr__(self):
         return f"Settings(api_url={self.api_url}, api_key={self.api_key}, model_path={self.model_path})"
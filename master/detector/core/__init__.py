@@ -1,9 +1,26 @@
-from .obj_detector import YOLONDetector
-from .roi_handler import ROIHandler
-from .frame_processor import FrameProcessor
+from typing import TYPE_CHECKING
+from detector.utils.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .obj_detector import YOLONDetector
+    from .multi_detector import MultiSourceDetector
+    from .roi_handler import ROIHandler
+    from .frame_processor import FrameProcessor
+    from .motion_gate import MotionGate
+
+_EXPORTS = {
+    "YOLONDetector": "detector.core.obj_detector",
+    "MultiSourceDetector": "detector.core.multi_detector",
+    "ROIHandler": "detector.core.roi_handler",
+    "FrameProcessor": "detector.core.frame_processor",
+    "MotionGate": "detector.core.motion_gate"
+}
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
     "YOLONDetector",
+    "MultiSourceDetector",
     "ROIHandler",
-    "FrameProcessor"
+    "FrameProcessor",
+    "MotionGate"
 ]
\ No newline at end of file
@@ -0,0 +1,343 @@
+import ast
+import os
+from abc import ABC, abstractmethod
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+
+BACKENDS = ('auto', 'ultralytics', 'onnxruntime', 'openvino')
+
+# Same post-processing defaults as the ultralytics predictor
+NMS_IOU_THRESHOLD = 0.7
+MAX_DETECTIONS = 300
+PAD_VALUE = 114
+
+
+def resolve_backend(model_path: str, backend: str = 'auto') -> str:
+    """
+    Picks the backend for a model file when `backend` is 'auto': exported ONNX files run under
+    ONNX Runtime, OpenVINO IR (.xml or an `_openvino_model` directory) under OpenVINO and
+    everything else (.pt, .yaml) under ultralytics/PyTorch.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown model backend '{backend}', expected one of {BACKENDS}")
+    if backend != 'auto':
+        return backend
+    path = model_path.rstrip('/\\')
+    if path.endswith('.onnx'):
+        return 'onnxruntime'
+    if path.endswith('.xml') or path.endswith('_openvino_model'):
+        return 'openvino'
+    return 'ultralytics'
+
+
+def letterbox(image: np.ndarray, size: int, auto: bool = True, stride: int = 32) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Resizes an image to fit `size` keeping its aspect ratio and pads the rest, as the ultralytics
+    LetterBox transform does.
+    :param auto: Pad only up to the next stride multiple instead of to a `size` x `size` square.
+    :return: A tuple (padded image, scale, (left, top) padding).
+    """
+    height, width = image.shape[:2]
+    scale = min(size / height, size / width)
+    new_width, new_height = int(round(width * scale)), int(round(height * scale))
+    pad_w, pad_h = size - new_width, size - new_height
+    if auto:
+        pad_w, pad_h = pad_w % stride, pad_h % stride
+    pad_w, pad_h = pad_w / 2, pad_h / 2
+
+    if (width, height) != (new_width, new_height):
+        image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+    left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+    image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(PAD_VALUE,) * 3)
+    return image, scale, (left, top)
+
+
+def decode_predictions(output: np.ndarray, conf: float, classes: Optional[Sequence[int]] = None,
+                       iou: float = NMS_IOU_THRESHOLD, max_det: int = MAX_DETECTIONS) -> np.ndarray:
+    """
+    Turns the raw output of an exported YOLOv8 detection model for one image into detections.
+    :param output: Array of shape (4 + num_classes, anchors): cx, cy, w, h and class scores.
+    :return: Float32 array of shape (N, 6): x1, y1, x2, y2, confidence, class_id in input pixels.
+    """
+    scores = output[4:]
+    class_ids = scores.argmax(axis=0)
+    confidences = scores[class_ids, np.arange(scores.shape[1])]
+    keep = confidences > conf
+    if classes is not None:
+        keep &= np.isin(class_ids, classes)
+    if not keep.any():
+        return np.empty((0, 6), dtype=np.float32)
+
+    cx, cy, w, h = output[:4, keep]
+    confidences, class_ids = confidences[keep], class_ids[keep]
+    boxes = np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+    indices = cv2.dnn.NMSBoxesBatched(boxes.tolist(), confidences.tolist(), class_ids.tolist(), conf, iou)
+    indices = np.asarray(indices, dtype=np.int64).reshape(-1)[:max_det]
+
+    detections = np.empty((len(indices), 6), dtype=np.float32)
+    detections[:, 0] = boxes[indices, 0]
+    detections[:, 1] = boxes[indices, 1]
+    detections[:, 2] = boxes[indices, 0] + boxes[indices, 2]
+    detections[:, 3] = boxes[indices, 1] + boxes[indices, 3]
+    detections[:, 4] = confidences[indices]
+    detections[:, 5] = class_ids[indices]
+    return detections
+
+
+class InferenceBackend(ABC):
+    """
+    Callable model with the interface the detector uses from ultralytics.YOLO:
+    `model(images, imgsz=..., classes=..., conf=...)` returns one ultralytics Results per image,
+    and `model.names` maps class IDs to labels.
+    """
+    name = ''
+    names: Dict[int, str] = {}
+
+    @abstractmethod
+    def __call__(self, images, imgsz: int = 640, classes: Optional[Sequence[int]] = None, conf: float = 0.25,
+                 verbose: bool = False):
+        """
+        :return: One ultralytics Results per image.
+        """
+
+    def warmup(self, imgsz: int = 640, image_size: Optional[Tuple[int, int]] = None):
+        """
+        Runs one inference on a blank image so graph compilation, memory allocation and lazy
+        initialisation happen at startup rather than on the first real frame.
+        :param image_size: (width, height) of the crops the model will see, so the warm-up
+                           runs with the same padded input shape (default is `imgsz` square).
+        """
+        width, height = image_size or (imgsz, imgsz)
+        self(np.zeros((height, width, 3), dtype=np.uint8), imgsz=imgsz)
+
+
+class UltralyticsBackend(InferenceBackend):
+    """
+    The ultralytics YOLO model on PyTorch (or any format ultralytics loads itself).
+    """
+    name = 'ultralytics'
+
+    def __init__(self, model_path: str, threads: int = 0):
+        from ultralytics import YOLO
+        if threads > 0:
+            import torch
+            torch.set_num_threads(threads)
+        self.model = YOLO(model_path)
+        self.names = self.model.names
+
+    def __call__(self, images, imgsz: int = 640, classes: Optional[Sequence[int]] = None, conf: float = 0.25,
+                 verbose: bool = False):
+        return self.model(images, imgsz=imgsz, classes=classes, conf=conf, verbose=verbose)
+
+
+class ExportedModelBackend(InferenceBackend):
+    """
+    Shared pre- and post-processing for exported YOLOv8 graphs: letterboxing, NMS and scaling
+    the boxes back to image coordinates, matching the ultralytics predictor.
+    """
+    stride = 32
+
+    @abstractmethod
+    def _infer(self, blob: np.ndarray) -> np.ndarray:
+        """
+        :param blob: Float32 NCHW batch in [0, 1].
+        :return: Raw output of shape (N, 4 + num_classes, anchors).
+        """
+
+    def __call__(self, images, imgsz: int = 640, classes: Optional[Sequence[int]] = None, conf: float = 0.25,
+                 verbose: bool = False):
+        import torch
+        from ultralytics.engine.results import Results
+
+        images = images if isinstance(images, list) else [images]
+        # Minimal padding keeps the batch stackable only when all images have the same shape
+        same_shape = len({image.shape for image in images}) == 1
+        letterboxed = [letterbox(image, imgsz, auto=same_shape, stride=self.stride) for image in images]
+        blob = np.stack([padded[:, :, ::-1].transpose(2, 0, 1) for padded, _, _ in letterboxed])
+        blob = np.ascontiguousarray(blob, dtype=np.float32) / 255.0
+        outputs = self._infer(blob)
+
+        results = []
+        for image, (_, scale, (left, top)), output in zip(images, letterboxed, outputs):
+            detections = decode_predictions(output, conf, classes)
+            detections[:, [0, 2]] = ((detections[:, [0, 2]] - left) / scale).clip(0, image.shape[1])
+            detections[:, [1, 3]] = ((detections[:, [1, 3]] - top) / scale).clip(0, image.shape[0])
+            results.append(Results(image, self.name, self.names, boxes=torch.from_numpy(detections)))
+        return results
+
+
+class OnnxRuntimeBackend(ExportedModelBackend):
+    """
+    An exported ONNX model under ONNX Runtime on the CPU.
+    """
+    name = 'onnxruntime'
+
+    def __init__(self, model_path: str, threads: int = 0):
+        import onnxruntime
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata['names']) if 'names' in metadata else {}
+        self.stride = int(metadata.get('stride', 32))
+
+    def _infer(self, blob):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+class OpenVINOBackend(ExportedModelBackend):
+    """
+    An OpenVINO IR (or ONNX) model compiled for the CPU with the latency performance hint.
+    """
+    name = 'openvino'
+
+    def __init__(self, model_path: str, threads: int = 0):
+        import openvino
+        core = openvino.Core()
+        path = model_path.rstrip('/\\')
+        if os.path.isdir(path):
+            path = next(os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith('.xml'))
+        config = {'PERFORMANCE_HINT': 'LATENCY'}
+        if threads > 0:
+            config['INFERENCE_NUM_THREADS'] = threads
+        self.compiled = core.compile_model(core.read_model(path), 'CPU', config)
+        self.output = self.compiled.output(0)
+        self.names, self.stride = self._read_metadata(path)
+
+    @staticmethod
+    def _read_metadata(path: str) -> Tuple[Dict[int, str], int]:
+        # ultralytics writes metadata.yaml next to the IR; an ONNX file carries it inline
+        metadata_path = os.path.join(os.path.dirname(path), 'metadata.yaml')
+        if os.path.exists(metadata_path):
+            import yaml
+            with open(metadata_path) as f:
+                metadata = yaml.safe_load(f)
+            return {int(k): v for k, v in metadata.get('names', {}).items()}, int(metadata.get('stride', 32))
+        if path.endswith('.onnx'):
+            import onnx
+            metadata = {p.key: p.value for p in onnx.load(path, load_external_data=False).metadata_props}
+            return ast.literal_eval(metadata.get('names', '{}')), int(metadata.get('stride', 32))
+        return {}, 32
+
+    def _infer(self, blob):
+        return self.compiled(blob)[self.output]
+
+
+def export_model(model_path: str, int8: bool = False) -> str:
+    """
+    Exports PyTorch weights to ONNX next to the weights, for ONNX Runtime or OpenVINO (which
+    reads ONNX directly). Existing exports are reused.
+    :param int8: Apply dynamic INT8 quantization to the weights (ONNX graph, used by both backends).
+    :return: Path of the model file to load.
+    """
+    onnx_path = os.path.splitext(model_path)[0] + '.onnx'
+    if not os.path.exists(onnx_path):
+        from ultralytics import YOLO
+        print(f"Exporting {model_path} to ONNX...")
+        # Dynamic axes, so each ROI can run at its own input size
+        onnx_path = YOLO(model_path).export(format='onnx', dynamic=True, simplify=False)
+    return quantize_model(onnx_path) if int8 else onnx_path
+
+
+def quantize_model(onnx_path: str) -> str:
+    """
+    Applies dynamic INT8 quantization to the weights of an ONNX model, written next to it as
+    `<name>-int8.onnx`. An existing quantized file is reused, and a model that already is one
+    is returned as is.
+    :return: Path of the quantized model.
+    """
+    if onnx_path.endswith('-int8.onnx'):
+        return onnx_path
+    quantized_path = os.path.splitext(onnx_path)[0] + '-int8.onnx'
+    if not os.path.exists(quantized_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        print(f"Quantizing {onnx_path} to INT8...")
+        quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QInt8)
+    return quantized_path
+
+
+class SharedModel(InferenceBackend):
+    """
+    A loaded backend shared by every detector in the process that asked for the same model,
+    see get_model(). Calls are serialized, since the PyTorch predictor keeps per-call state,
+    and each input size is only warmed up once.
+    """
+
+    def __init__(self, backend: InferenceBackend):
+        self.backend = backend
+        self.name = backend.name
+        self.names = backend.names
+        self._lock = threading.Lock()
+        self._warm_sizes = set()
+
+    def __call__(self, images, imgsz: int = 640, classes: Optional[Sequence[int]] = None, conf: float = 0.25,
+                 verbose: bool = False):
+        with self._lock:
+            return self.backend(images, imgsz=imgsz, classes=classes, conf=conf, verbose=verbose)
+
+    def warmup(self, imgsz: int = 640, image_size: Optional[Tuple[int, int]] = None):
+        with self._lock:
+            if (imgsz, image_size) in self._warm_sizes:
+                return
+            self.backend.warmup(imgsz, image_size)
+            self._warm_sizes.add((imgsz, image_size))
+
+
+_model_cache: Dict[tuple, SharedModel] = {}
+_model_cache_lock = threading.Lock()
+
+
+def get_model(model_path: str, backend: str = 'auto', threads: int = 0, int8: bool = False) -> SharedModel:
+    """
+    Returns the process-wide instance of a model, loading it on first use with load_backend().
+    Detectors created with the same weights and backend options share it instead of each
+    loading (and warming up) a copy.
+    """
+    key = (os.path.abspath(model_path) if os.path.exists(model_path) else model_path,
+           resolve_backend(model_path, backend), threads, int8)
+    # Held while loading, so detectors starting concurrently wait for the first load
+    with _model_cache_lock:
+        model = _model_cache.get(key)
+        if model is None:
+            model = _model_cache[key] = SharedModel(load_backend(model_path, backend, threads, int8))
+        return model
+
+
+def clear_model_cache():
+    """
+    Drops the cached models; detectors holding one keep it alive until they are closed.
+    """
+    with _model_cache_lock:
+        _model_cache.clear()
+
+
+def load_backend(model_path: str, backend: str = 'auto', threads: int = 0, int8: bool = False) -> InferenceBackend:
+    """
+    Loads a model under the requested backend. PyTorch weights requested under ONNX Runtime or
+    OpenVINO are exported (and optionally quantized) first; ONNX files are quantized in place.
+    :param model_path: .pt/.yaml weights, an exported .onnx file or an OpenVINO model.
+    :param backend: One of BACKENDS; 'auto' picks it from the file, see resolve_backend().
+    :param threads: Intra-op threads (0 keeps the library default).
+    :param int8: Run the dynamically quantized INT8 model (exported backends only).
+    """
+    backend = resolve_backend(model_path, backend)
+    if backend == 'ultralytics':
+        if int8:
+            print("INT8 quantization is only available for the onnxruntime and openvino backends")
+        return UltralyticsBackend(model_path, threads)
+    if model_path.endswith(('.pt', '.yaml')):
+        model_path = export_model(model_path, int8)
+    elif int8 and model_path.endswith('.onnx'):
+        model_path = quantize_model(model_path)
+    elif int8:
+        print(f"INT8 quantization needs PyTorch weights or an ONNX model, running {model_path} unquantized")
+    if backend == 'onnxruntime':
+        return OnnxRuntimeBackend(model_path, threads)
+    return OpenVINOBackend(model_path, threads)
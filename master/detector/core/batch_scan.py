@@ -0,0 +1,255 @@
+import csv
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import cv2
+from detector.core.backends import load_backend
+from detector.core.detections import class_ids_for
+from detector.core.obj_detector import crop_roi, inference_size_for, results_to_detections, run_model
+from detector.core.roi_handler import ROIHandler, Zone
+from detector.utils.camera import FrameSource
+
+RECORD_FIELDS = ['video', 'frame', 'time', 'object', 'confidence', 'x1', 'y1', 'x2', 'y2', 'zone']
+
+
+class ScanOptions(NamedTuple):
+    """
+    Detection settings shipped to every worker process.
+    """
+    model_path: str = 'yolov8n.pt'
+    backend: str = 'auto'  # See detector.core.backends.BACKENDS
+    int8: bool = False
+    target_classes: Tuple[str, ...] = ('person',)
+    confidence_threshold: float = 0.5
+    max_inference_size: int = 640
+    roi: Optional[Tuple[int, int, int, int]] = None  # None scans the whole frame
+    # Zones as parsed by parse_zones(); like in the live path they take precedence over `roi`, the
+    # model runs on their bounding box and only detections inside a zone are reported
+    zones: Tuple[Dict, ...] = ()
+    frame_step: int = 1  # Analyse every Nth frame
+    batch_size: int = 8  # ROI crops per forward pass
+
+
+class Shard(NamedTuple):
+    """
+    A range of frames [start, end) of one video, processed by a single worker.
+    """
+    index: int
+    video_index: int
+    path: str
+    start: int
+    end: int
+    fps: float
+
+
+def plan_shards(paths: Iterable[str], shard_frames: int = 3000, frame_step: int = 1) -> List[Shard]:
+    """
+    Splits videos into frame-range shards. Shard sizes are a multiple of `frame_step`, so the
+    analysed frames are the same however a video is split.
+    :param paths: Video files, in output order.
+    :param shard_frames: Approximate number of frames per shard.
+    :return: Shards in output order.
+    """
+    frame_step = max(1, frame_step)
+    shard_frames = max(frame_step, (shard_frames // frame_step) * frame_step)
+    shards = []
+    for video_index, path in enumerate(paths):
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video {path}")
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        cap.release()
+        for start in range(0, frame_count, shard_frames):
+            shards.append(Shard(len(shards), video_index, path, start, min(start + shard_frames, frame_count), fps))
+    return shards
+
+
+# Per-process state, set up once by _init_worker()
+_worker_model = None
+_worker_options: Optional[ScanOptions] = None
+_worker_class_ids = None
+_worker_zones: Optional[ROIHandler] = None
+
+
+def _init_worker(options: ScanOptions, threads: int = 0):
+    global _worker_model, _worker_options, _worker_class_ids, _worker_zones
+    if threads > 0:
+        # Keep workers from oversubscribing the CPU with their own thread pools
+        cv2.setNumThreads(threads)
+    _worker_model = load_backend(options.model_path, options.backend, threads, options.int8)
+    _worker_options = options
+    _worker_class_ids = class_ids_for(_worker_model.names, options.target_classes)
+    _worker_zones = None
+    if options.zones:
+        _worker_zones = ROIHandler()
+        _worker_zones.set_zones([Zone(**zone) for zone in options.zones], verbose=False)
+
+
+def _detect_batch(batch: List[Tuple[int, object]], roi, shard: Shard) -> List[Dict[str, object]]:
+    options = _worker_options
+    zones = _worker_zones
+    # Zones may accept lower confidences than the default threshold, see YOLONDetector.process_results()
+    confidence = zones.min_confidence(options.confidence_threshold) if zones is not None else \
+        options.confidence_threshold
+    crops = [crop_roi(frame, roi) for _, frame in batch]
+    imgsz = inference_size_for(crops[0].shape[1], crops[0].shape[0], options.max_inference_size)
+    results = run_model(_worker_model, crops, imgsz, _worker_class_ids, confidence)
+
+    zone_names = [zone.name for zone in zones.get_zones()] if zones is not None else []
+    records = []
+    for (frame_index, _), result in zip(batch, results):
+        detections = results_to_detections([result], _worker_class_ids, confidence, roi[:2])
+        zone_ids = [-1] * len(detections)
+        if zones is not None:
+            zone_ids = zones.assign_zones(detections, options.confidence_threshold)
+            detections, zone_ids = detections[zone_ids >= 0], zone_ids[zone_ids >= 0].tolist()
+        for (x1, y1, x2, y2, conf, cls), zone_id in zip(detections.tolist(), zone_ids):
+            records.append({
+                'video': shard.path,
+                'frame': frame_index,
+                'time': round(frame_index / shard.fps, 3) if shard.fps else None,
+                'object': _worker_model.names[cls],
+                'confidence': round(conf, 4),
+                'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2,
+                'zone': zone_names[zone_id] if zone_id >= 0 else None
+            })
+    return records
+
+
+def _scan_shard(shard: Shard) -> Tuple[Shard, List[Dict[str, object]], int]:
+    """
+    Worker body: runs detection over the frames of one shard.
+    :return: A tuple (shard, records, frames analysed).
+    """
+    options = _worker_options
+    source = FrameSource(shard.path, frame_step=options.frame_step)
+    if shard.start:
+        source.set(cv2.CAP_PROP_POS_FRAMES, shard.start)
+
+    records, batch, frames = [], [], 0
+    roi = _worker_zones.get_roi() if _worker_zones is not None else options.roi
+    # Every frame_step-th frame is delivered: start + step - 1, start + 2 * step - 1, ...
+    frame_index = shard.start + options.frame_step - 1
+    while frame_index < shard.end:
+        ret, frame = source.read()
+        if not ret:
+            break
+        if roi is None:
+            roi = (0, 0, frame.shape[1], frame.shape[0])
+        if crop_roi(frame, roi) is not None:
+            batch.append((frame_index, frame))
+        if len(batch) == options.batch_size:
+            records.extend(_detect_batch(batch, roi, shard))
+            batch = []
+        frames += 1
+        frame_index += options.frame_step
+    if batch:
+        records.extend(_detect_batch(batch, roi, shard))
+    source.release()
+    return shard, records, frames
+
+
+class RecordWriter:
+    """
+    Writes detection records as JSON Lines or CSV.
+    """
+    FORMATS = ('jsonl', 'csv')
+
+    def __init__(self, path: str, fmt: Optional[str] = None):
+        """
+        :param path: Output file.
+        :param fmt: 'jsonl' or 'csv'; guessed from the extension if omitted.
+        """
+        fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}', expected one of {self.FORMATS}")
+        self.format = fmt
+        self.file = open(path, 'w', newline='' if fmt == 'csv' else None, encoding='utf-8')
+        self.csv_writer = csv.DictWriter(self.file, RECORD_FIELDS) if fmt == 'csv' else None
+        if self.csv_writer is not None:
+            self.csv_writer.writeheader()
+        self.records_written = 0
+
+    def write(self, records: List[Dict[str, object]]):
+        if self.csv_writer is not None:
+            self.csv_writer.writerows(records)
+        else:
+            self.file.writelines(json.dumps(record) + '\n' for record in records)
+        self.records_written += len(records)
+
+    def close(self):
+        self.file.close()
+
+
+def _run_shards(shards: List[Shard], options: ScanOptions, workers: int) -> Iterator[Tuple[Shard, list, int]]:
+    if workers <= 0:
+        # In-process, mainly for debugging and tests
+        _init_worker(options)
+        for shard in shards:
+            yield _scan_shard(shard)
+        return
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    context = multiprocessing.get_context('spawn')  # Forking a process with live torch threads is unsafe
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                             initargs=(options, threads)) as executor:
+        # Keep at most two shards per worker in flight
+        pending = iter(shards)
+        futures = set()
+        for shard in pending:
+            futures.add(executor.submit(_scan_shard, shard))
+            if len(futures) >= workers * 2:
+                break
+        while futures:
+            finished, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                next_shard = next(pending, None)
+                if next_shard is not None:
+                    futures.add(executor.submit(_scan_shard, next_shard))
+                yield future.result()
+
+
+def scan_videos(paths: List[str], output: str, options: ScanOptions = ScanOptions(), workers: int = 2,
+                shard_frames: int = 3000, fmt: Optional[str] = None) -> Dict[str, float]:
+    """
+    Runs detection over recorded videos with a pool of worker processes, each with its own model.
+    Shards are scanned in parallel and their records written in (video, frame) order.
+    :param paths: Video files to scan.
+    :param output: Output file (.jsonl or .csv).
+    :param workers: Worker processes (0 runs everything in the calling process).
+    :param shard_frames: Approximate number of frames per shard.
+    :param fmt: Output format, 'jsonl' or 'csv' (guessed from `output` if omitted).
+    :return: Throughput summary.
+    """
+    start_time = time.monotonic()
+    shards = plan_shards(paths, shard_frames, options.frame_step)
+    writer = RecordWriter(output, fmt)
+    # Shards can finish out of order; hold them back until all earlier shards are written
+    finished: Dict[int, list] = {}
+    next_index = 0
+    frames = 0
+    try:
+        for shard, records, shard_frames_analysed in _run_shards(shards, options, workers):
+            frames += shard_frames_analysed
+            finished[shard.index] = records
+            while next_index in finished:
+                writer.write(finished.pop(next_index))
+                next_index += 1
+    finally:
+        writer.close()
+
+    elapsed = time.monotonic() - start_time
+    return {
+        'videos': len(paths),
+        'shards': len(shards),
+        'frames': frames,
+        'detections': writer.records_written,
+        'elapsed': elapsed,
+        'fps': frames / elapsed if elapsed > 0 else math.inf,
+        'workers': workers
+    }
@@ -0,0 +1,67 @@
+import numpy as np
+from typing import Dict, Iterable, Tuple
+
+# Compact per-frame detection result shared by the overlay and notification stages.
+# Coordinates are in full-frame pixels.
+DETECTION_DTYPE = np.dtype([
+    ('x1', np.int32),
+    ('y1', np.int32),
+    ('x2', np.int32),
+    ('y2', np.int32),
+    ('confidence', np.float32),
+    ('class_id', np.int16)
+])
+
+EMPTY_DETECTIONS = np.empty(0, dtype=DETECTION_DTYPE)
+
+
+def class_ids_for(names: Dict[int, str], labels: Iterable[str]) -> np.ndarray:
+    """
+    Maps class labels to model class IDs.
+    :param names: Model class names, e.g. `model.names` ({0: 'person', ...}).
+    :param labels: Labels to look up (case-insensitive).
+    :return: Array of matching class IDs.
+    """
+    wanted = {label.lower() for label in labels}
+    return np.array([cls for cls, name in names.items() if name.lower() in wanted], dtype=np.int64)
+
+
+def result_to_array(result) -> np.ndarray:
+    """
+    Transfers the boxes of one ultralytics result to NumPy in a single copy. Arrays that are
+    already in this form (e.g. returned by inference workers) are passed through.
+    :return: Float32 array of shape (N, 6) with columns x1, y1, x2, y2, confidence, class_id.
+    """
+    if isinstance(result, np.ndarray):
+        return result
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return np.empty((0, 6), dtype=np.float32)
+    return boxes.data[:, :6].cpu().numpy().astype(np.float32, copy=False)
+
+
+def filter_detections(data: np.ndarray, class_ids: np.ndarray, min_confidence: float,
+                      offset: Tuple[int, int] = (0, 0)) -> np.ndarray:
+    """
+    Keeps the target classes above the confidence threshold and translates the boxes
+    from ROI coordinates to frame coordinates, all as whole-array operations.
+    :param data: (N, 6) array as returned by result_to_array().
+    :param class_ids: Class IDs to keep.
+    :param min_confidence: Detections must score strictly above this value.
+    :param offset: (x, y) of the ROI's top-left corner in the frame.
+    :return: Structured array of DETECTION_DTYPE.
+    """
+    if len(data) == 0:
+        return EMPTY_DETECTIONS
+    mask = (data[:, 4] > min_confidence) & np.isin(data[:, 5].astype(np.int64), class_ids)
+    kept = data[mask]
+
+    detections = np.empty(len(kept), dtype=DETECTION_DTYPE)
+    boxes = kept[:, :4].astype(np.int32) + np.array([offset[0], offset[1], offset[0], offset[1]], dtype=np.int32)
+    detections['x1'] = boxes[:, 0]
+    detections['y1'] = boxes[:, 1]
+    detections['x2'] = boxes[:, 2]
+    detections['y2'] = boxes[:, 3]
+    detections['confidence'] = kept[:, 4]
+    detections['class_id'] = kept[:, 5]
+    return detections
@@ -16,6 +16,7 @@ class YOLONDetector:
         self.roi_handler = ROIHandler()
         self.geocoder = Geocoder()
         self.api_client = APIClient(api_url, api_key)
+        self.id_generator = IDGenerator()
         self.model = YOLO(model_path)
         self.last_detections: Set[str] = set()
         self.location_update_time = 0
@@ -51,7 +52,7 @@ class YOLONDetector:
                             if 'person' not in self.last_detections:
                                 location = self.geocoder.get_location()
                                 detection_info = {
-                                    "id": IDGenerator.generate_id(),
+                                    "id": self.id_generator.generate_unique_id(),
                                     "timestamp": self.get_timestamp(),
                                     "detection": {
                                         "object": "person",
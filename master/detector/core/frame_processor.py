@@ -1,29 +1,56 @@
 import cv2
-from detector.core.roi_handler import ROIHandler
+import time
+import numpy as np
+from detector.core.qos import OVERLAY_FULL
+from detector.core.roi_handler import ROI_ZONE_NAME, ROIHandler
 from detector.utils.geocoding import Geocoder
 
 class FrameProcessor:
-    def __init__(self, roi_handler: ROIHandler, geocoder: Geocoder):
+    def __init__(self, roi_handler: ROIHandler, geocoder: Geocoder, metrics=None, camera_id: str = 'camera_1'):
+        """
+        :param metrics: PipelineMetrics recording the overlay time (optional).
+        :param camera_id: Camera the overlay time is recorded for.
+        """
         self.roi_handler = roi_handler
         self.geocoder = geocoder
+        self._overlay_stage = metrics.stage('overlay', camera_id) if metrics is not None else None
+        self._display_buffer = None  # Reused output buffer, reallocated only when the frame size changes
+        self.overlay = OVERLAY_FULL  # Overlay quality, lowered by the QoS controller
 
-    def process_frame(self, frame):
+    def process_frame(self, frame, out=None):
         """
         Processes a frame by adding an overlay, drawing the ROI,
         and displaying location information if available.
+        :param frame: Input frame; it is not modified.
+        :param out: Destination array of the same shape; defaults to a buffer owned by this
+                    processor that is overwritten by the next call.
+        :return: The annotated frame (`out` or the internal buffer).
         """
-        display_frame = frame.copy()
-        
-        # Add a semi-transparent dark overlay
-        overlay = display_frame.copy()
-        cv2.rectangle(overlay, (0, 0), (frame.shape[1], frame.shape[0]), (0, 0, 0), -1)
-        display_frame = cv2.addWeighted(overlay, 0.4, display_frame, 0.6, 0)
+        start = time.perf_counter()
+        display_frame = out
+        if display_frame is None:
+            if self._display_buffer is None or self._display_buffer.shape != frame.shape:
+                self._display_buffer = np.empty_like(frame)
+            display_frame = self._display_buffer
+
+        full = self.overlay == OVERLAY_FULL
+        if full:
+            # Semi-transparent dark overlay: blending with black at 0.4 is a plain 0.6 scale,
+            # written straight into the destination instead of allocating overlay and blend arrays
+            cv2.convertScaleAbs(frame, dst=display_frame, alpha=0.6)
+        else:
+            np.copyto(display_frame, frame)
         
-        # Draw the ROI if it exists
+        # Draw the zones if they exist
         roi = self.roi_handler.get_roi()
         if roi:
+            cv2.polylines(display_frame, self.roi_handler.get_polygons(), True, (0, 255, 0), 2)
+        if roi and full:
             x, y, w, h = roi
-            cv2.rectangle(display_frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            for zone in self.roi_handler.get_zones():
+                if zone.name != ROI_ZONE_NAME:
+                    cv2.putText(display_frame, zone.name, (zone.points[0][0] + 5, zone.points[0][1] + 20),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
             text = f"ROI: x={x}, y={y}, w={w}, h={h}"
             cv2.putText(display_frame, text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
             
@@ -32,5 +59,27 @@ class FrameProcessor:
             if location:
                 loc_text = f"Location: {location[0]:.6f}, {location[1]:.6f}"
                 cv2.putText(display_frame, loc_text, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        
+
+        if self._overlay_stage is not None:
+            self._overlay_stage.observe(time.perf_counter() - start)
+        return display_frame
+
+    @staticmethod
+    def draw_detections(display_frame, detections, names, labels: bool = True):
+        """
+        Draws detection boxes and labels onto the frame in place.
+        :param display_frame: Frame to draw on.
+        :param detections: Structured array of DETECTION_DTYPE (or TRACK_DTYPE) in frame coordinates.
+        :param names: Model class names used for the labels.
+        :param labels: Draw the class, track ID and confidence above each box.
+        """
+        has_tracks = 'track_id' in detections.dtype.names
+        for row in detections.tolist():
+            x1, y1, x2, y2, conf, cls = row[:6]
+            cv2.rectangle(display_frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
+            if not labels:
+                continue
+            label = f'{names[cls]} #{row[6]}' if has_tracks else names[cls]
+            cv2.putText(display_frame, f'{label} {conf:.2f}', (x1, y1 - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
         return display_frame
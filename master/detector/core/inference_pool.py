@@ -0,0 +1,290 @@
+import multiprocessing
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+import cv2
+import numpy as np
+from detector.core.backends import load_backend
+from detector.core.detections import result_to_array
+
+READY = 'ready'
+EMPTY_RESULT = np.empty((0, 6), dtype=np.float32)
+STARTUP_TIMEOUT = 300  # Seconds for the workers to load the model (exports can take a while)
+
+
+def _worker_main(index: int, model_path: str, backend: str, threads: int, int8: bool, warmup_size: int, tasks,
+                 results, loader: Callable = load_backend):
+    """
+    Worker process body: loads the model and runs inference on the ring slots it is handed
+    until it receives None. The ring is (re)attached whenever a task names a new segment.
+    """
+    if threads > 0:
+        cv2.setNumThreads(threads)
+    try:
+        model = loader(model_path, backend, threads, int8)
+        if warmup_size:
+            model.warmup(warmup_size)
+    except Exception as e:
+        results.put((READY, index, None, f"{type(e).__name__}: {str(e)}"))
+        return
+    results.put((READY, index, dict(model.names), None))
+
+    shm = None
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            job_id, shm_name, offset, shape, imgsz, classes, conf = task
+            if shm is None or shm.name != shm_name:
+                if shm is not None:
+                    shm.close()
+                shm = shared_memory.SharedMemory(name=shm_name)
+            crop = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=offset)
+            start = time.perf_counter()
+            try:
+                output = model(crop, imgsz=imgsz, classes=classes, conf=conf, verbose=False)
+                results.put((job_id, result_to_array(output[0]), time.perf_counter() - start, None))
+            except Exception as e:
+                results.put((job_id, None, time.perf_counter() - start, f"{type(e).__name__}: {str(e)}"))
+            del crop  # Release the buffer export before the segment is closed
+    finally:
+        if shm is not None:
+            shm.close()
+
+
+class InferencePool:
+    """
+    Pool of inference worker processes, each with its own copy of the model.
+
+    Crops are copied into slots of a shared-memory ring and only the slot index, shape and
+    inference options travel through the task queue, so frames are never pickled. Results come
+    back as compact (N, 6) float32 arrays (x1, y1, x2, y2, confidence, class_id in crop pixels).
+    A slot is reused once its result has been collected.
+
+    Each worker has its own task queue, so the pool knows which jobs a worker holds: if it dies
+    (e.g. killed by the OOM killer), its jobs are returned as failed and it is restarted.
+
+    The pool can also be called like a model (see InferenceBackend), which submits the crops
+    and waits for their results.
+    """
+
+    def __init__(self, model_path: str, workers: int, frame_shape: Tuple[int, int, int] = (720, 1280, 3),
+                 slots: int = 0, backend: str = 'auto', threads: int = 0, int8: bool = False, warmup_size: int = 0,
+                 loader: Callable = load_backend):
+        """
+        :param workers: Worker processes.
+        :param frame_shape: (height, width, channels) of the largest crop expected; the ring is
+                            reallocated if a larger crop is submitted.
+        :param slots: Frames that can be in flight at once (default is two per worker).
+        :param threads: Intra-op threads per worker (0 splits the CPU cores between the workers).
+        :param warmup_size: Input size each worker warms its model up at (0 skips the warm-up).
+        :param loader: Module-level function (model_path, backend, threads, int8) -> model, run in
+                       each worker; load_backend() unless testing.
+        """
+        if workers <= 0:
+            raise ValueError("An inference pool needs at least one worker")
+        self.workers = workers
+        self.slots = slots or workers * 2
+        self.threads = threads or max(1, (os.cpu_count() or 1) // workers)
+        self.slot_bytes = 0
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self._allocate(int(np.prod(frame_shape)))
+        self._free_slots = list(range(self.slots))
+        self._job_slots: Dict[int, int] = {}
+        self._finished: List[Tuple[int, Optional[np.ndarray], float]] = []  # Collected while resizing the ring
+        self._next_job = 0
+        self._context = multiprocessing.get_context('spawn')  # Forking a process with live torch threads is unsafe
+        self._results = self._context.Queue()
+        self._worker_args = (model_path, backend, self.threads, int8, warmup_size)
+        self._loader = loader
+        self._tasks: List = [None] * workers
+        self._processes: List = [None] * workers
+        self._ready = [False] * workers
+        self._worker_jobs: List[Set[int]] = [set() for _ in range(workers)]
+        self._job_workers: Dict[int, int] = {}
+        for index in range(workers):
+            self._create_worker(index)
+        self.name = 'pool'
+        self.names: Dict[int, str] = {}
+        self.errors = 0
+        self.restarts = 0
+        self._closed = False
+
+    def _create_worker(self, index: int):
+        # A fresh task queue: a killed worker may have died holding the old one's lock
+        self._tasks[index] = self._context.Queue()
+        self._processes[index] = self._context.Process(
+            target=_worker_main, name=f"inference-worker-{index}", daemon=True,
+            args=(index, *self._worker_args, self._tasks[index], self._results, self._loader))
+        self._ready[index] = False
+
+    def _allocate(self, slot_bytes: int):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=slot_bytes * self.slots)
+
+    def start(self, timeout: float = STARTUP_TIMEOUT):
+        """
+        Starts the workers and waits until every one of them has loaded the model.
+        :raises RuntimeError: If a worker fails to load the model or does not report in time.
+        """
+        for process in self._processes:
+            process.start()
+        deadline = time.monotonic() + timeout
+        ready = 0
+        while ready < self.workers:
+            try:
+                _, index, names, error = self._results.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                self.close()
+                raise RuntimeError(f"Inference workers did not start within {timeout:.0f}s")
+            if error is not None:
+                self.close()
+                raise RuntimeError(f"Inference worker {index} failed to load the model: {error}")
+            self.names = names
+            self._ready[index] = True
+            ready += 1
+        print(f"Started {self.workers} inference workers ({self.threads} threads each, {self.slots} frame slots)")
+
+    def has_free_slot(self) -> bool:
+        return bool(self._free_slots)
+
+    def in_flight(self) -> int:
+        return len(self._job_slots)
+
+    def submit(self, crop: np.ndarray, imgsz: int, classes: Optional[Sequence[int]] = None,
+               conf: float = 0.25) -> Optional[int]:
+        """
+        Copies a crop into a free slot and queues it for inference.
+        :param crop: uint8 image; a view (e.g. an ROI of a pooled frame) is fine, it is copied.
+        :return: Job ID to match the result in poll(), or None if all slots are in flight.
+        """
+        if crop.dtype != np.uint8:
+            raise ValueError(f"Inference workers take uint8 images, got {crop.dtype}")
+        if not self._free_slots:
+            return None
+        if crop.nbytes > self.slot_bytes:
+            # Larger than any crop so far: wait for the jobs in flight, then reallocate the ring
+            while self._job_slots:
+                self._finished.extend(self._collect(block=True, timeout=1.0))
+            self._allocate(crop.nbytes)
+            print(f"Inference frame slots resized to {crop.shape[1]}x{crop.shape[0]}")
+        slot = self._free_slots.pop()
+        offset = slot * self.slot_bytes
+        np.copyto(np.ndarray(crop.shape, dtype=np.uint8, buffer=self.shm.buf, offset=offset), crop)
+        job_id = self._next_job
+        self._next_job += 1
+        self._job_slots[job_id] = slot
+        # Least busy worker, preferring those that have loaded the model (restarted ones may still be loading)
+        index = min(range(self.workers), key=lambda i: (not self._ready[i], len(self._worker_jobs[i])))
+        self._worker_jobs[index].add(job_id)
+        self._job_workers[job_id] = index
+        class_list = np.asarray(classes).tolist() if classes is not None else None
+        self._tasks[index].put((job_id, self.shm.name, offset, crop.shape, imgsz, class_list, conf))
+        return job_id
+
+    def poll(self, timeout: float = 0.0) -> List[Tuple[int, Optional[np.ndarray], float]]:
+        """
+        Collects finished jobs, waiting up to `timeout` for the first one.
+        :return: List of (job ID, detections array or None on error, inference seconds).
+        """
+        if self._finished:
+            finished, self._finished = self._finished, []
+            return finished + self._collect(block=False)
+        return self._collect(block=timeout > 0, timeout=timeout)
+
+    def _collect(self, block: bool, timeout: Optional[float] = None):
+        finished = []
+        while self._job_slots:
+            try:
+                job_id, data, seconds, error = self._results.get(block=block, timeout=timeout if block else None)
+            except queue.Empty:
+                finished.extend(self._fail_dead_workers())
+                break
+            if job_id == READY:  # A restarted worker has loaded the model
+                if error is not None:
+                    raise RuntimeError(f"Restarted inference worker {data} failed to load the model: {error}")
+                self._ready[data] = True
+                continue
+            block = False
+            if job_id not in self._job_slots:
+                continue  # Already returned as failed when its worker was found dead
+            self._free_slots.append(self._job_slots.pop(job_id))
+            self._worker_jobs[self._job_workers.pop(job_id)].discard(job_id)
+            if error is not None:
+                self.errors += 1
+                print(f"Inference error in worker: {error}")
+            finished.append((job_id, data, seconds))
+        return finished
+
+    def _fail_dead_workers(self) -> List[Tuple[int, None, float]]:
+        """
+        Returns the jobs of workers that have exited as failed (no detections) and restarts them.
+        :raises RuntimeError: If a restarted worker died again before it loaded the model.
+        """
+        failed = []
+        for index, process in enumerate(self._processes):
+            if process.pid is None or process.is_alive():
+                continue
+            if not self._ready[index]:
+                raise RuntimeError(f"Inference worker {index} died while loading the model "
+                                   f"(exit code {process.exitcode})")
+            jobs = self._worker_jobs[index]
+            print(f"Inference worker {index} died (exit code {process.exitcode}), restarting it; "
+                  f"{len(jobs)} frame(s) lost")
+            for job_id in jobs:
+                self._free_slots.append(self._job_slots.pop(job_id))
+                del self._job_workers[job_id]
+                failed.append((job_id, None, 0.0))
+            self.errors += len(jobs)
+            jobs.clear()
+            self.restarts += 1
+            self._create_worker(index)
+            self._processes[index].start()
+        return failed
+
+    def __call__(self, images, imgsz: int = 640, classes: Optional[Sequence[int]] = None, conf: float = 0.25,
+                 verbose: bool = False) -> List[np.ndarray]:
+        """
+        Runs one crop or a list of crops through the workers and waits for the results. Do not
+        mix with submit()/poll() on the same pool.
+        :return: One detections array per crop, in order (empty if its inference failed).
+        """
+        images = images if isinstance(images, list) else [images]
+        jobs: Dict[int, int] = {}
+        outputs = [EMPTY_RESULT] * len(images)
+        pending = list(enumerate(images))
+        while pending or jobs:
+            while pending and self.has_free_slot():
+                index, image = pending.pop(0)
+                jobs[self.submit(image, imgsz, classes, conf)] = index
+            for job_id, data, _ in self.poll(timeout=1.0):
+                if job_id in jobs and data is not None:
+                    outputs[jobs[job_id]] = data
+                jobs.pop(job_id, None)
+        return outputs
+
+    def close(self, timeout: float = 5.0):
+        """
+        Stops the workers and frees the shared memory.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for tasks, process in zip(self._tasks, self._processes):
+            if process.is_alive():
+                tasks.put(None)
+        for process in self._processes:
+            if process.pid is not None:
+                process.join(timeout)
+                if process.is_alive():
+                    process.terminate()
+        self.shm.close()
+        self.shm.unlink()
+        self._job_slots.clear()
+        self._job_workers.clear()
@@ -0,0 +1,91 @@
+import cv2
+import time
+import numpy as np
+from typing import Dict, Optional
+
+
+class MotionGate:
+    """
+    Cheap pre-filter that decides whether an ROI changed enough to be worth a model pass.
+
+    The ROI is downscaled and compared against a running-average background. Inference is
+    requested when the changed-pixel area exceeds `min_area`, for `cooldown` seconds after
+    the last motion, and at least every `refresh_interval` seconds regardless of motion.
+    """
+
+    def __init__(self, downscale_width: int = 160, pixel_threshold: int = 25, min_area: float = 0.005,
+                 background_alpha: float = 0.05, refresh_interval: float = 5.0, cooldown: float = 2.0):
+        """
+        :param downscale_width: Width the ROI is resized to before differencing.
+        :param pixel_threshold: Minimum grey-level difference for a pixel to count as changed.
+        :param min_area: Fraction of changed pixels that counts as motion.
+        :param background_alpha: Learning rate of the running-average background.
+        :param refresh_interval: Force an inference after this many seconds without one.
+        :param cooldown: Keep inferring for this many seconds after the last motion.
+        """
+        self.downscale_width = downscale_width
+        self.pixel_threshold = pixel_threshold
+        self.min_area = min_area
+        self.background_alpha = background_alpha
+        self.refresh_interval = refresh_interval
+        self.cooldown = cooldown
+
+        self.background: Optional[np.ndarray] = None
+        self.last_motion_time = 0.0
+        self.last_inference_time = 0.0
+        self.changed_fraction = 0.0
+        self.frames = 0
+        self.skipped = 0
+
+    def _prepare(self, roi_frame: np.ndarray) -> np.ndarray:
+        height, width = roi_frame.shape[:2]
+        scale = min(1.0, self.downscale_width / width)
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        small = cv2.resize(roi_frame, size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+    def should_infer(self, roi_frame: np.ndarray, now: Optional[float] = None) -> bool:
+        """
+        Updates the background model with the ROI and decides whether to run the model.
+        :param roi_frame: Current ROI crop.
+        :param now: Current time in seconds (defaults to time.monotonic()).
+        :return: True if the model should run on this frame.
+        """
+        now = time.monotonic() if now is None else now
+        self.frames += 1
+        gray = self._prepare(roi_frame)
+
+        if self.background is None or self.background.shape != gray.shape:
+            # First frame or the ROI changed size: start a new background
+            self.background = gray.astype(np.float32)
+            self.changed_fraction = 1.0
+            self.last_motion_time = now
+        else:
+            diff = cv2.absdiff(gray, cv2.convertScaleAbs(self.background))
+            self.changed_fraction = cv2.countNonZero(cv2.threshold(
+                diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)[1]) / diff.size
+            cv2.accumulateWeighted(gray, self.background, self.background_alpha)
+            if self.changed_fraction >= self.min_area:
+                self.last_motion_time = now
+
+        if (now - self.last_motion_time <= self.cooldown
+                or now - self.last_inference_time >= self.refresh_interval):
+            self.last_inference_time = now
+            return True
+        self.skipped += 1
+        return False
+
+    def reset(self):
+        """
+        Drops the background model, e.g. after the ROI was changed.
+        """
+        self.background = None
+
+    def skip_ratio(self) -> float:
+        """
+        :return: Fraction of frames for which inference was skipped.
+        """
+        return self.skipped / self.frames if self.frames else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {'frames': self.frames, 'skipped': self.skipped, 'skip_ratio': self.skip_ratio()}
@@ -0,0 +1,258 @@
+import cv2
+import time
+import threading
+import platform
+from typing import List, Optional, Tuple
+from detector.core.inference_pool import InferencePool
+from detector.core.obj_detector import YOLONDetector, run_model
+from detector.config.settings import Settings
+from detector.utils.frame_sink import VideoFileSink
+
+
+class MultiSourceDetector:
+    """
+    Runs detection for several cameras with a single shared model.
+
+    The current ROI crops of all cameras are collected into one batch and passed to the
+    model in a single call (ultralytics letterboxes every crop to the same input size and
+    stacks them into one tensor), then the results are scattered back to each camera's
+    YOLONDetector.process_results() for tracking and notifications.
+    """
+
+    def __init__(self, model_path='yolov8n.pt', api_url='http://your-mongodb-api-url', api_key='your-api-key',
+                 sources: Optional[List[str]] = None, settings: Optional[Settings] = None,
+                 max_batch_size: Optional[int] = None, max_wait_ms: Optional[float] = None):
+        """
+        :param sources: Frame source URIs to open (default is `settings.sources`).
+        :param max_batch_size: Maximum number of ROI crops per forward pass (default is `settings.batch_max_size`).
+        :param max_wait_ms: Maximum time to wait for more cameras to deliver a frame before
+                            running an incomplete batch (default is `settings.batch_max_wait_ms`).
+        """
+        self.settings = settings or Settings()
+        if not self.settings.capture_threaded:
+            raise ValueError("MultiSourceDetector requires background capture (CAPTURE_THREADED=true)")
+        self.max_batch_size = max_batch_size or self.settings.batch_max_size
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else self.settings.batch_max_wait_ms) / 1000.0
+        sources = sources or self.settings.sources
+        self.pool = None
+        if self.settings.inference_workers > 0:
+            # One frame per camera in flight, plus one spare slot per worker
+            self.pool = InferencePool(model_path, self.settings.inference_workers,
+                                      (self.settings.frame_height, self.settings.frame_width, 3),
+                                      slots=len(sources) + self.settings.inference_workers,
+                                      backend=self.settings.model_backend, threads=self.settings.inference_threads,
+                                      int8=self.settings.model_int8,
+                                      warmup_size=self.settings.max_inference_size if self.settings.model_warmup else 0)
+            self.pool.start()
+            self.model = self.pool
+        else:
+            self.model = YOLONDetector.load_model(model_path, self.settings)
+
+        # All cameras share one metrics endpoint and one event store, and write to one outbox drained by
+        # a single replayer
+        self.metrics = YOLONDetector.create_metrics(self.settings) if self.settings.metrics_enabled else None
+        self.outbox = YOLONDetector.create_outbox(self.settings) if self.settings.outbox_enabled else None
+        self.event_store = YOLONDetector.create_event_store(self.settings) if self.settings.event_store_enabled else None
+
+        self.detectors = []
+        for i, source in enumerate(sources):
+            camera_id = f"camera_{i + 1}"
+            output_video = None
+            if self.settings.output_video:
+                output_video = VideoFileSink.path_for(self.settings.output_video, camera_id)
+            self.detectors.append(YOLONDetector(model_path, api_url, api_key, settings=self.settings,
+                                                source=source, camera_id=camera_id, model=self.model,
+                                                outbox=self.outbox, output_video=output_video,
+                                                metrics=self.metrics, event_store=self.event_store))
+        self.replayer = None
+        if self.outbox is not None:
+            self.replayer = YOLONDetector.create_replayer(self.outbox, self.detectors[0].api_client, self.settings)
+
+        self.frames_processed = 0
+        self.batches_run = 0
+        self.stop_event = threading.Event()
+        self._in_flight = {}  # Pool job ID -> (detector, frame)
+
+    def collect_batch(self) -> Tuple[List[Tuple[YOLONDetector, object, object]], List[Tuple[YOLONDetector, object]]]:
+        """
+        Collects the newest frame of each camera, waiting at most `max_wait` for slower cameras.
+        Frames that don't need the model (no ROI, static ROI, or a frame between two inference
+        passes of the tracker) are post-processed right away.
+        :return: A tuple (batch, done): `batch` holds (detector, frame, roi_crop) entries to run
+                 through the model; `done` holds (detector, frame) entries.
+        """
+        batch, done = [], []
+        waiting = list(self.detectors)
+        deadline = time.monotonic() + self.max_wait
+        while waiting and len(batch) < self.max_batch_size:
+            for detector in list(waiting):
+                captured = detector.read_captured()
+                if captured is None:
+                    continue
+                waiting.remove(detector)
+                roi_frame = detector.crop_roi(captured.frame)
+                if roi_frame is None:
+                    detector.process_results([])
+                    done.append((detector, captured.frame))
+                elif detector.is_tracking_frame():
+                    detector.predict_tracks()
+                    done.append((detector, captured.frame))
+                elif not detector.should_infer(roi_frame):
+                    done.append((detector, captured.frame))  # Static ROI: keep the previous result
+                else:
+                    batch.append((detector, captured.frame, roi_frame))
+                    if len(batch) == self.max_batch_size:
+                        break
+            if not waiting or time.monotonic() >= deadline:
+                break
+            time.sleep(0.001)
+        return batch, done
+
+    def process_batch(self, batch, done):
+        """
+        Runs one forward pass over the batch and scatters the results back to each detector.
+        :return: List of (detector, frame) pairs whose detections are up to date.
+        """
+        outputs = list(done)
+        if batch:
+            # One input size for the whole batch, large enough for the biggest ROI, and the lowest
+            # confidence any camera's zones accept (each camera filters its own results afterwards)
+            imgsz = max(detector.inference_size(roi_frame) for detector, _, roi_frame in batch)
+            confidence = min(detector.roi_handler.min_confidence(detector.confidence_threshold)
+                             for detector, _, _ in batch)
+            start = time.perf_counter()
+            results = run_model(self.model, [roi_frame for _, _, roi_frame in batch], imgsz,
+                                self.detectors[0].target_class_ids, confidence)
+            seconds = time.perf_counter() - start
+            self.batches_run += 1
+            for (detector, frame, _), result in zip(batch, results):
+                detector.record_inference(seconds)
+                detector.process_results([result])
+                outputs.append((detector, frame))
+        self.frames_processed += len(outputs)
+        return outputs
+
+    def dispatch_frames(self) -> List[Tuple[YOLONDetector, object]]:
+        """
+        Worker-pool mode: hands the newest frame of every camera without a frame in flight to the
+        inference workers. Frames that don't need the model are post-processed right away.
+        :return: (detector, frame) entries whose detections are up to date.
+        """
+        busy = {detector.camera_id for detector, _ in self._in_flight.values()}
+        done = []
+        for detector in self.detectors:
+            if detector.camera_id in busy:
+                continue  # Its frame stays held until the result is back
+            captured = detector.read_captured()
+            if captured is None:
+                continue
+            roi_frame = detector.crop_roi(captured.frame)
+            if roi_frame is None:
+                detector.process_results([])
+                done.append((detector, captured.frame))
+            elif detector.is_tracking_frame():
+                detector.predict_tracks()
+                done.append((detector, captured.frame))
+            elif not detector.should_infer(roi_frame):
+                done.append((detector, captured.frame))
+            else:
+                job_id = self.pool.submit(roi_frame, detector.inference_size(roi_frame), detector.target_class_ids,
+                                          detector.roi_handler.min_confidence(detector.confidence_threshold))
+                self._in_flight[job_id] = (detector, captured.frame)
+        return done
+
+    def collect_results(self, timeout: float) -> List[Tuple[YOLONDetector, object]]:
+        """
+        Worker-pool mode: post-processes the results the workers have finished.
+        :param timeout: Seconds to wait for the first result.
+        :return: (detector, frame) entries whose detections are up to date.
+        """
+        outputs = []
+        for job_id, data, seconds in self.pool.poll(timeout):
+            detector, frame = self._in_flight.pop(job_id)
+            detector.record_inference(seconds)
+            detector.process_results([data] if data is not None else [])
+            outputs.append((detector, frame))
+        return outputs
+
+    def step(self) -> Optional[List[Tuple[YOLONDetector, object]]]:
+        """
+        Runs one iteration of the processing loop: a batched forward pass in the main process,
+        or one round of dispatching frames to and collecting results from the worker pool.
+        :return: (detector, frame) entries to display, or None once every source has ended.
+        """
+        if self.pool is None:
+            batch, done = self.collect_batch()
+            if not batch and not done and all(detector.camera.is_finished() for detector in self.detectors):
+                return None
+            return self.process_batch(batch, done)
+
+        done = self.dispatch_frames()
+        outputs = done + self.collect_results(0.0 if done else self.max_wait)
+        if not outputs and not self._in_flight and \
+                all(detector.camera.is_finished() for detector in self.detectors):
+            return None
+        self.frames_processed += len(outputs)
+        return outputs
+
+    def stop(self):
+        """
+        Asks the loop in run() to exit after the current batch; safe to call from a signal handler.
+        """
+        self.stop_event.set()
+
+    def run(self):
+        headless = self.settings.headless
+        print(f"Running on {platform.system()} system with {len(self.detectors)} cameras")
+        if headless:
+            print("Running headless")
+        else:
+            print("Press 'q' to quit or 'c' to clear all ROIs")
+            for detector in self.detectors:
+                cv2.namedWindow(detector.camera_id)
+                cv2.setMouseCallback(detector.camera_id, detector.roi_handler.draw_roi)
+
+        start_time = time.monotonic()
+        try:
+            while not self.stop_event.is_set():
+                outputs = self.step()
+                if outputs is None:
+                    print("All sources ended")
+                    break
+                for detector, frame in outputs:
+                    detector.emit(frame, None if headless else detector.camera_id)
+
+                if headless:
+                    continue
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    break
+                elif key == ord('c'):
+                    for detector in self.detectors:
+                        detector.clear_roi()
+
+        except Exception as e:
+            print(f"Error in main loop: {str(e)}")
+        finally:
+            print("Cleaning up...")
+            elapsed = time.monotonic() - start_time
+            if elapsed > 0:
+                mode = f"with {self.pool.workers} inference workers" if self.pool is not None else \
+                    f"in {self.batches_run} batches"
+                print(f"Processed {self.frames_processed} frames {mode} "
+                      f"({self.frames_processed / elapsed:.1f} frames/s)")
+            for detector in self.detectors:
+                if detector.motion_gate is not None:
+                    print(f"{detector.camera_id}: motion gate skipped {detector.motion_gate.skip_ratio():.0%} of frames")
+                detector.close()
+            if self.replayer is not None:
+                self.replayer.stop()
+                self.outbox.close()
+            if self.event_store is not None:
+                self.event_store.close()
+            if self.metrics is not None:
+                self.metrics.close()
+            if self.pool is not None:
+                self.pool.close()
+            if not headless:
+                cv2.destroyAllWindows()
@@ -1,115 +1,690 @@
 import cv2
+import queue
+import threading
+import time
 import numpy as np
-from ultralytics import YOLO
 from detector.utils.camera import Camera
+from detector.utils.event_store import EventStore
+from detector.utils.frame_sink import FrameSlot, VideoFileSink
+from detector.utils.media_recorder import MediaRecorder
 from detector.utils.geocoding import Geocoder
 from detector.utils.id_generator import IDGenerator
+from detector.utils.metrics import PipelineMetrics
 from detector.api.client import APIClient
-from detector.core.roi_handler import ROIHandler
+from detector.api.records import NotificationRecord, validate_notification
+from detector.api.dispatcher import NotificationDispatcher
+from detector.api.outbox import NotificationOutbox, OutboxReplayer
+from detector.core.roi_handler import ROIHandler, Zone, zones_bounding_box
 from detector.core.frame_processor import FrameProcessor
+from detector.core.motion_gate import MotionGate
+from detector.core.tracker import Tracker
+from detector.core.qos import OVERLAY_FULL, QualityController, QualityLevel, build_levels
+from detector.core.backends import InferenceBackend, get_model
+from detector.core.detections import EMPTY_DETECTIONS, class_ids_for, filter_detections, result_to_array
+from detector.config.settings import Settings
 from datetime import datetime
-from typing import Set
+from typing import Optional, Set
 import platform
 
+MODEL_STRIDE = 32
+
+
+def inference_size_for(width: int, height: int, max_size: int = 640, stride: int = MODEL_STRIDE) -> int:
+    """
+    Picks the model input size for an ROI: its longest side rounded down to a stride
+    multiple, so small ROIs are never upsampled to `max_size`.
+    :return: Input size in pixels, a stride multiple between `stride` and `max_size` (itself
+             rounded down to a stride multiple).
+    """
+    size = max(width, height) // stride * stride
+    max_size = max(stride, int(max_size) // stride * stride)
+    return int(min(max(size, stride), max_size))
+
+
+def crop_roi(frame, roi):
+    """
+    Returns the part of the frame inside an ROI.
+    :param roi: (x, y, w, h) in frame pixels, or None.
+    :return: A view of the frame, or None if there is no (non-empty) ROI.
+    """
+    if not roi:
+        return None
+    x, y, w, h = roi
+    roi_frame = frame[y:y+h, x:x+w]
+    return roi_frame if roi_frame.size > 0 else None
+
+
+def run_model(model, roi_frames, imgsz: int, class_ids: np.ndarray, confidence: float):
+    """
+    Runs the model with class and confidence filtering pushed into the predictor,
+    so NMS only sees candidates of the target classes.
+    :param roi_frames: One ROI crop or a list of crops (batched in a single forward pass).
+    :param imgsz: Model input size, see inference_size_for().
+    """
+    return model(roi_frames, imgsz=imgsz, classes=class_ids.tolist(), conf=confidence, verbose=False)
+
+
+def results_to_detections(results, class_ids: np.ndarray, confidence: float, offset) -> np.ndarray:
+    """
+    Filters the results computed on an ROI crop and moves them to frame coordinates.
+    :param offset: (x, y) of the ROI's top-left corner in the frame.
+    :return: DETECTION_DTYPE array.
+    """
+    arrays = [filter_detections(result_to_array(result), class_ids, confidence, offset) for result in results]
+    if not arrays:
+        return EMPTY_DETECTIONS
+    return np.concatenate(arrays) if len(arrays) > 1 else arrays[0]
+
+
 class YOLONDetector:
-    def __init__(self, model_path='yolov8n.pt', api_url='http://your-mongodb-api-url', api_key='your-api-key'):
-        self.camera = Camera()
+    def __init__(self, model_path='yolov8n.pt', api_url='http://your-mongodb-api-url', api_key='your-api-key',
+                 settings: Optional[Settings] = None, source: Optional[str] = None,
+                 camera_id: str = 'camera_1', model=None, outbox: Optional[NotificationOutbox] = None,
+                 output_video: Optional[str] = None, metrics: Optional[PipelineMetrics] = None,
+                 event_store: Optional[EventStore] = None):
+        """
+        :param settings: Settings instance; a default one is created from the environment if omitted.
+        :param source: Frame source URI overriding `settings.sources[0]`, see parse_source().
+        :param camera_id: Camera ID reported in notifications.
+        :param model: Already loaded model to share between detectors; loaded from `model_path` with the
+                      configured backend if omitted, see load_model().
+        :param outbox: Notification outbox shared with other detectors; its owner is responsible for
+                       replaying and closing it. One is created from the settings if omitted.
+        :param output_video: File to write annotated frames to (default is `settings.output_video`).
+        :param metrics: Metrics shared with other detectors; its owner serves and closes it. One is
+                        created if omitted and METRICS_ENABLED is set, otherwise nothing is measured.
+        :param event_store: Event store shared with other detectors; its owner closes it. One is
+                            opened if omitted and EVENT_STORE_ENABLED is set.
+        """
+        self.settings = settings or Settings()
+        if source is None:
+            source = self.settings.sources[0]
+        self.camera_id = camera_id
+        self.metrics = metrics
+        self._owns_metrics = False
+        if self.metrics is None and self.settings.metrics_enabled:
+            self.metrics = self.create_metrics(self.settings)
+            self._owns_metrics = True
+        self.camera = Camera(source, self.settings.frame_width, self.settings.frame_height,
+                             decode_threads=self.settings.source_decode_threads,
+                             target_fps=self.settings.source_target_fps,
+                             frame_step=self.settings.source_frame_step,
+                             loop=self.settings.source_loop)
         self.roi_handler = ROIHandler()
-        self.geocoder = Geocoder()
-        self.api_client = APIClient(api_url, api_key)
-        self.model = YOLO(model_path)
+        if self.settings.zones:
+            self.roi_handler.set_zones([Zone(**zone) for zone in self.settings.zones])
+        elif self.settings.roi:
+            self.roi_handler.set_roi(*self.settings.roi)
+        self.geocoder = Geocoder(self.settings.location_update_interval, self.settings.location_failure_ttl,
+                                 self.settings.static_location)
+        self.geocoder.start()
+        self.api_client = APIClient(api_url, api_key,
+                                    timeout=(self.settings.api_connect_timeout, self.settings.api_read_timeout),
+                                    pool_size=self.settings.notify_workers,
+                                    bulk_url=self.settings.api_bulk_url,
+                                    bulk_format=self.settings.api_bulk_format,
+                                    metrics=self.metrics)
+        self.outbox = outbox
+        self.replayer = None
+        if self.outbox is None and self.settings.outbox_enabled:
+            self.outbox = self.create_outbox(self.settings)
+            self.replayer = self.create_replayer(self.outbox, self.api_client, self.settings)
+        self.notifier = NotificationDispatcher(
+            self.api_client,
+            workers=self.settings.notify_workers,
+            queue_size=self.settings.notify_queue_size,
+            max_retries=self.settings.notify_max_retries,
+            backoff_base=self.settings.notify_backoff_base,
+            backoff_max=self.settings.notify_backoff_max,
+            batch_size=self.settings.notify_batch_size,
+            batch_wait_ms=self.settings.notify_batch_wait_ms,
+            outbox=self.outbox,
+            metrics=self.metrics
+        )
+        self.notifier.start()
+        self.model = model if model is not None else self.load_model(model_path, self.settings)
+        self.event_store = event_store
+        self._owns_event_store = False
+        if self.event_store is None and self.settings.event_store_enabled:
+            self.event_store = self.create_event_store(self.settings)
+            self._owns_event_store = True
+        if self.event_store is not None:
+            self.event_store.set_class_names(self.model.names)
+        self.media = None
+        if self.settings.media_enabled:
+            self.media = self.create_media_recorder(self.settings)
+            self.media.start()
+        self.frame_processor = FrameProcessor(self.roi_handler, self.geocoder, self.metrics, camera_id)
+        # Annotated frames are only rendered for a window or this sink
+        output_video = output_video or self.settings.output_video
+        self.sink = VideoFileSink(output_video, self.settings.output_fps) if output_video else None
+        self.preview: Optional[FrameSlot] = None  # Set by a GUI that displays the annotated frames
+        self._roi_requests = queue.SimpleQueue()  # ROI changes from other threads, applied by the loop
+        self.stop_event = threading.Event()
+        self.id_generator = IDGenerator()
+        self.target_class_ids = class_ids_for(self.model.names, self.settings.target_classes)
+        self.confidence_threshold = self.settings.confidence_threshold
+        self.max_inference_size = self.settings.max_inference_size  # Lowered by the QoS controller
+        self.detections = EMPTY_DETECTIONS  # Detections of the last processed frame
+        self.tracker = None
+        if self.settings.tracker_enabled:
+            self.tracker = Tracker(self.settings.tracker_iou_threshold, self.settings.tracker_max_age,
+                                   self.settings.tracker_min_hits)
+        self.detection_interval = max(1, self.settings.detection_interval) if self.tracker is not None else 1
+        self.frame_index = 0
+        self.motion_gate = None
+        if self.settings.motion_gate_enabled:
+            self.motion_gate = MotionGate(
+                downscale_width=self.settings.motion_downscale_width,
+                pixel_threshold=self.settings.motion_pixel_threshold,
+                min_area=self.settings.motion_min_area,
+                background_alpha=self.settings.motion_background_alpha,
+                refresh_interval=self.settings.motion_refresh_interval,
+                cooldown=self.settings.motion_cooldown
+            )
+        self.qos = None
+        if self.settings.qos_enabled:
+            self.qos = QualityController(
+                self.settings.qos_target_fps,
+                build_levels(self.settings.max_inference_size, self.settings.qos_min_inference_size,
+                             self.settings.qos_max_frame_stride),
+                cpu_budget=self.settings.qos_cpu_budget,
+                window=self.settings.qos_window,
+                hold_windows=self.settings.qos_hold_windows,
+                upgrade_margin=self.settings.qos_upgrade_margin
+            )
         self.last_detections: Set[str] = set()
         self.location_update_time = 0
         self.LOCATION_UPDATE_INTERVAL = 60
 
-        # Windows-specific camera initialization
-        if platform.system() == 'Windows':
-            self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)  # DirectShow API for Windows
-        else:
-            self.cap = cv2.VideoCapture(0)
-
         # Check if camera opened successfully
-        if not self.cap.isOpened():
+        if not self.camera.is_opened():
             raise RuntimeError("Error: Could not open camera. Make sure the webcam is connected and accessible.")
+        self.cap = self.camera.cap
+
+        # Drain the device on a background thread so slow inference never reads stale frames
+        self._held_frame = None  # Pooled frame the loop is currently working on
+        self.frame_timestamp = 0.0  # Capture time (time.time()) of the current frame
+        self.current_frame = None  # Frame the loop is working on, for alert snapshots
+        if self.settings.capture_threaded:
+            self.camera.start_capture(self.settings.capture_buffer_size, self.settings.capture_drop_policy,
+                                      use_pool=self.settings.frame_pool_enabled)
+
+        if self.metrics is not None:
+            # Per-frame series, looked up once
+            self._stages = {stage: self.metrics.stage(stage, camera_id)
+                            for stage in ('capture', 'motion', 'inference', 'postprocess')}
+            self._frames_processed = self.metrics.frames_processed.labels(camera_id)
+            self._skipped = {reason: self.metrics.inference_skipped.labels(camera_id, reason)
+                             for reason in ('motion', 'tracker', 'qos')}
+            self._qos_level = self.metrics.qos_level.labels(camera_id)
+            self.metrics.watch_detector(self)
+            self.metrics.watch_dispatcher(self.notifier, camera_id)
+
+    @staticmethod
+    def load_model(model_path: str, settings: Settings) -> InferenceBackend:
+        """
+        Returns the model under the configured backend, shared with the other detectors of the
+        process (see get_model()), and warms it up at the input shape of the configured ROI so
+        the first real frame runs at steady-state latency.
+        """
+        start = time.perf_counter()
+        model = get_model(model_path, settings.model_backend, settings.inference_threads, settings.model_int8)
+        print(f"Model {model_path} loaded with the {model.name} backend in {time.perf_counter() - start:.2f}s")
+        if settings.model_warmup:
+            start = time.perf_counter()
+            roi = zones_bounding_box([Zone(**zone) for zone in settings.zones]) if settings.zones else settings.roi
+            if roi:
+                width, height = roi[2:]
+                model.warmup(inference_size_for(width, height, settings.max_inference_size), (width, height))
+            else:
+                model.warmup(settings.max_inference_size)
+            print(f"Model warmed up in {time.perf_counter() - start:.2f}s")
+        return model
+
+    @staticmethod
+    def create_outbox(settings: Settings) -> NotificationOutbox:
+        """
+        Opens the notification outbox configured in the settings.
+        """
+        return NotificationOutbox(
+            settings.outbox_path,
+            max_entries=settings.outbox_max_entries,
+            flush_interval_ms=settings.outbox_flush_interval_ms,
+            synchronous=settings.outbox_synchronous,
+            max_dead_letters=settings.outbox_max_dead_letters
+        )
+
+    @staticmethod
+    def create_event_store(settings: Settings) -> EventStore:
+        """
+        Opens the detection event store configured in the settings.
+        """
+        return EventStore(
+            settings.event_store_path,
+            segment_records=settings.event_store_segment_records,
+            segment_seconds=settings.event_store_segment_hours * 3600,
+            retention_seconds=settings.event_store_retention_days * 86400
+        )
+
+    @staticmethod
+    def create_media_recorder(settings: Settings) -> MediaRecorder:
+        """
+        Creates the alert snapshot/clip recorder configured in the settings.
+        """
+        return MediaRecorder(
+            settings.media_dir,
+            pre_roll=settings.media_pre_roll,
+            post_roll=settings.media_post_roll,
+            clip_fps=settings.media_clip_fps,
+            clip_width=settings.media_clip_width,
+            max_buffer_bytes=int(settings.media_buffer_mb * 2 ** 20),
+            workers=settings.media_workers,
+            max_pending=settings.media_max_pending,
+            jpeg_quality=settings.media_jpeg_quality,
+            clip_format=settings.media_clip_format
+        )
+
+    @staticmethod
+    def create_metrics(settings: Settings) -> PipelineMetrics:
+        """
+        Creates the pipeline metrics and starts their HTTP endpoint.
+        """
+        metrics = PipelineMetrics()
+        metrics.serve(settings.metrics_host, settings.metrics_port)
+        return metrics
+
+    @staticmethod
+    def create_replayer(outbox: NotificationOutbox, api_client: APIClient, settings: Settings) -> OutboxReplayer:
+        """
+        Starts a replayer that re-sends notifications left in the outbox.
+        """
+        replayer = OutboxReplayer(
+            outbox, api_client,
+            interval=settings.outbox_replay_interval,
+            min_age=settings.outbox_replay_min_age,
+            batch_size=settings.notify_batch_size
+        )
+        replayer.start()
+        return replayer
 
-        # Set camera properties for better performance
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        
     def get_timestamp(self) -> str:
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
     
     def run(self):
+        """
+        Runs the capture and detection loop until 'q' is pressed, the camera stops delivering
+        frames or stop() is called. In headless mode no window is opened and frames are only
+        rendered if an output video is configured.
+        """
+        headless = self.settings.headless
         print(f"Running on {platform.system()} system")
-        print("Press 'q' to quit or 'c' to clear ROI")
-        
+        window = None
+        if headless:
+            print("Running headless" + (f", writing to {self.sink.path}" if self.sink is not None else ""))
+            if not self.roi_handler.get_roi():
+                print("Warning: no ROI or zones configured (ROI=x,y,w,h or ZONES), frames will not be analysed")
+        else:
+            print("Press 'q' to quit or 'c' to clear ROI")
+            window = 'Video'
+            cv2.namedWindow(window)
+            cv2.setMouseCallback(window, self.roi_handler.draw_roi)
+
         try:
-            while True:
-                ret, frame = self.cap.read()
-                if not ret or frame is None:
+            while not self.stop_event.is_set():
+                self.apply_roi_requests()
+                frame = self.read_frame()
+                if frame is None:
                     print("Error capturing frame")
                     break
-                
-                display_frame = FrameProcessor.process_frame(self,frame)
-                cv2.imshow('Video', display_frame)
+
+                start = time.perf_counter()
+                self.detect(frame)
+                self.emit(frame, window)
+                if self.qos is not None:
+                    self.update_quality(time.perf_counter() - start)
+                if headless:
+                    continue
                 key = cv2.waitKey(1) & 0xFF
                 if key == ord('q'):
                     break
                 elif key == ord('c'):
-                    self.roi = None
-                    self.start_point = None
-                    self.end_point = None
-                    self.last_detections.clear()
-                    print("ROI cleared")
+                    self.clear_roi()
 
         except Exception as e:
             print(f"Error in main loop: {str(e)}")
         finally:
             print("Cleaning up...")
-            self.cap.release()
-            cv2.destroyAllWindows()
+            if self.camera.is_capturing():
+                stats = self.camera.capture_stats()
+                print(f"Capture stats: captured={stats['captured']}, processed={stats['consumed']}, "
+                      f"dropped={stats['dropped']}")
+            if self.motion_gate is not None:
+                print(f"Motion gate skipped {self.motion_gate.skipped} of {self.motion_gate.frames} frames "
+                      f"({self.motion_gate.skip_ratio():.0%})")
+            self.close()
+            if not headless:
+                cv2.destroyAllWindows()
+
+    def stop(self):
+        """
+        Asks the loop in run() to exit after the current frame; safe to call from a signal handler.
+        """
+        self.stop_event.set()
+
+    def update_quality(self, frame_seconds: float):
+        """
+        Reports a frame's processing time to the QoS controller and applies its decision.
+        """
+        level = self.qos.record(frame_seconds)
+        if level is not None:
+            self.apply_quality(level)
+
+    def apply_quality(self, level: QualityLevel):
+        """
+        Switches the inference size and overlay to a QoS level; the frame stride is applied in detect().
+        """
+        self.max_inference_size = min(level.inference_size, self.settings.max_inference_size)
+        self.frame_processor.overlay = level.overlay
+        if self.metrics is not None:
+            self._qos_level.set(self.qos.index)
+
+    def request_roi(self, roi: Optional[tuple]):
+        """
+        Sets (x, y, w, h) or clears (None) the ROI from another thread, e.g. a GUI; the loop
+        applies it before its next frame.
+        """
+        self._roi_requests.put(roi)
+
+    def apply_roi_requests(self):
+        while not self._roi_requests.empty():
+            roi = self._roi_requests.get()
+            self.clear_roi()
+            if roi is not None:
+                self.roi_handler.set_roi(*roi)
+
+    def clear_roi(self):
+        """
+        Clears the ROI together with the detection state tied to it.
+        """
+        self.roi_handler.clear_roi()
+        self.last_detections.clear()
+        self.detections = EMPTY_DETECTIONS
+        if self.tracker is not None:
+            self.tracker.reset()
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+
+    def close(self):
+        """
+        Releases the camera and flushes pending notifications.
+        """
+        self.release_held_frame()
+        self.current_frame = None
+        self.camera.release()
+        if self.sink is not None:
+            self.sink.close()
+        if self.media is not None:
+            self.media.stop()
+            stats = self.media.stats()
+            print(f"Alert media: snapshots={stats['snapshots']}, clips={stats['clips']}, dropped={stats['dropped']}, "
+                  f"failed={stats['failed']}")
+        self.geocoder.stop()
+        self.notifier.stop()
+        if self.replayer is not None:
+            self.replayer.stop()
+            self.outbox.close()
+        stats = self.notifier.stats()
+        print(f"Notifications: sent={stats['sent']}, failed={stats['failed']}, dropped={stats['dropped']}, "
+              f"avg latency={stats['avg_latency'] * 1000:.0f} ms")
+        self.api_client.close()
+        if self._owns_event_store:
+            self.event_store.close()
+        if self._owns_metrics:
+            self.metrics.close()
+
+    def read_frame(self, timeout: float = 1.0):
+        """
+        Returns the next frame to process. In background capture mode this is the newest
+        frame in the ring buffer; stale frames captured during processing are skipped.
+        :param timeout: Seconds to wait for a new frame before giving up.
+        :return: The frame, or None if the camera stopped delivering frames.
+        """
+        if self.camera.buffer is None:
+            start = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                return None
+            self.frame_timestamp = time.time()
+            self.record_frame(frame)
+            if self.metrics is not None:
+                self._stages['capture'].observe(time.perf_counter() - start)
+                self._frames_processed.inc()
+            return frame
+
+        start = time.perf_counter()
+        captured = self.read_captured(timeout)
+        if captured is not None and self.metrics is not None:
+            self._stages['capture'].observe(time.perf_counter() - start)  # Time spent waiting for a frame
+        return captured.frame if captured is not None else None
+
+    def read_captured(self, timeout: float = 0.0):
+        """
+        Takes the newest frame from the background capture. The frame stays valid until the
+        next call (or close()); its pooled buffer is then handed back to the camera.
+        :param timeout: Seconds to wait for a new frame (0 means non-blocking).
+        :return: CapturedFrame, or None if no new frame is available.
+        """
+        captured = self.camera.read_latest(timeout=timeout)
+        if captured is not None:
+            self.release_held_frame()
+            self._held_frame = captured
+            self.frame_timestamp = captured.timestamp
+            self.record_frame(captured.frame)
+            if self.metrics is not None:
+                self._frames_processed.inc()
+        return captured
+
+    def record_frame(self, frame):
+        """
+        Makes a newly read frame the current one and feeds it to the alert pre-roll buffer.
+        """
+        self.current_frame = frame
+        if self.media is not None:
+            self.media.add_frame(frame, self.frame_timestamp)
+
+    def release_held_frame(self):
+        if self._held_frame is not None:
+            self.camera.release_frame(self._held_frame)
+            self._held_frame = None
+
+    def crop_roi(self, frame):
+        """
+        Returns the part of the frame inside the current ROI.
+        :return: A view of the frame, or None if no (non-empty) ROI is set.
+        """
+        return crop_roi(frame, self.roi_handler.get_roi())
+
+    def predict(self, roi_frames, imgsz: int):
+        """
+        Runs the model on one ROI crop or a batch of crops, see run_model().
+        """
+        # Zones may accept lower confidences than the default threshold
+        confidence = self.roi_handler.min_confidence(self.confidence_threshold)
+        if self.metrics is None:
+            return run_model(self.model, roi_frames, imgsz, self.target_class_ids, confidence)
+        start = time.perf_counter()
+        results = run_model(self.model, roi_frames, imgsz, self.target_class_ids, confidence)
+        self.record_inference(time.perf_counter() - start)
+        return results
+
+    def record_inference(self, seconds: float):
+        """
+        Records the inference latency of a frame of this camera (run here or in a shared batch).
+        """
+        if self.metrics is not None:
+            self._stages['inference'].observe(seconds)
+
+    def inference_size(self, roi_frame) -> int:
+        return inference_size_for(roi_frame.shape[1], roi_frame.shape[0], self.max_inference_size)
+
+    def should_infer(self, roi_frame) -> bool:
+        """
+        Asks the motion gate whether the ROI changed enough to run the model.
+        :return: True if the model should run (always True without a motion gate).
+        """
+        if self.motion_gate is None:
+            return True
+        if self.metrics is None:
+            return self.motion_gate.should_infer(roi_frame)
+        start = time.perf_counter()
+        infer = self.motion_gate.should_infer(roi_frame)
+        self._stages['motion'].observe(time.perf_counter() - start)
+        if not infer:
+            self._skipped['motion'].inc()
+        return infer
+
+    def is_tracking_frame(self) -> bool:
+        """
+        Advances the frame counter and tells whether this frame is one of the frames between
+        two inference passes, for which the tracker predicts the boxes instead of the model.
+        """
+        self.frame_index += 1
+        return self.tracker is not None and len(self.tracker) > 0 and self.frame_index % self.detection_interval != 0
+
+    def detect(self, frame):
+        """
+        Runs the detection stage for a frame without drawing anything: model inference (or
+        tracker prediction / motion-gated reuse of the previous result), tracking and notifications.
+        :param frame: Full-resolution frame.
+        :return: Detections for the frame (DETECTION_DTYPE, or TRACK_DTYPE with the tracker enabled).
+        """
+        if self.qos is not None and not self.qos.should_detect():
+            # Skipped by the QoS frame stride: only move the existing tracks along
+            if self.metrics is not None:
+                self._skipped['qos'].inc()
+            if self.tracker is not None and len(self.tracker) > 0:
+                self.detections = self.tracker.predict()
+            return self.detections
+        roi_frame = self.crop_roi(frame)
+        if roi_frame is not None and self.is_tracking_frame():
+            return self.predict_tracks()
+        if roi_frame is not None and not self.should_infer(roi_frame):
+            return self.detections  # Static ROI: keep the previous result
+        results = self.predict(roi_frame, self.inference_size(roi_frame)) if roi_frame is not None else []
+        return self.process_results(results)
+
+    def render(self, frame):
+        """
+        Draws the overlay, ROI and current detections for a frame.
+        :return: Annotated frame. It lives in a buffer reused by the next call, so display
+                 or copy it before rendering the next frame.
+        """
+        display_frame = self.frame_processor.process_frame(frame)
+        return self.frame_processor.draw_detections(display_frame, self.detections, self.model.names,
+                                                    labels=self.frame_processor.overlay == OVERLAY_FULL)
+
+    def emit(self, frame, window: Optional[str] = None):
+        """
+        Hands the annotated frame to its consumers: the HighGUI window (if given), the GUI
+        preview slot and the output video. Nothing is rendered when there is no consumer.
+        """
+        if window is None and self.preview is None and self.sink is None:
+            return
+        display_frame = self.render(frame)
+        if window is not None:
+            cv2.imshow(window, display_frame)
+        if self.preview is not None:
+            self.preview.publish(display_frame)
+        if self.sink is not None:
+            self.sink.write(display_frame)
 
     def detect_objects(self, frame):
-        display_frame = frame.copy()
-        current_detections = set()
-        
+        """
+        Runs detection on a frame and returns it annotated, see detect() and render().
+        """
+        self.detect(frame)
+        return self.render(frame)
+
+    def predict_tracks(self):
+        """
+        Advances the tracker on a frame for which inference was skipped.
+        :return: Predicted boxes of the current tracks.
+        """
+        self.detections = self.tracker.predict()
+        if self.metrics is not None:
+            self._skipped['tracker'].inc()
+        return self.detections
+
+    def process_results(self, results):
+        """
+        Post-processes model results for the current ROI crop: keeps the detections inside a
+        zone (above that zone's threshold), records them in the event store and sends
+        notifications for newly detected target classes (or new tracks).
+        :param results: Model results computed on the ROI crop (may be empty).
+        :return: Detections in frame coordinates.
+        """
+        start = time.perf_counter()
+        detections = EMPTY_DETECTIONS
+        current_labels = set()
+
         roi = self.roi_handler.get_roi()
         if roi:
-            x, y, w, h = roi
-            roi_frame = frame[y:y+h, x:x+w]
-            if roi_frame.size > 0:
-                results = self.model(roi_frame, verbose=False)
-                for result in results:
-                    for box in result.boxes:
-                        conf = float(box.conf)
-                        cls = int(box.cls)
-                        label = f'{self.model.names[cls]}'
-                        if label.lower() == 'person' and conf > 0.5:
-                            current_detections.add(label)
-                            bbox = box.xyxy[0].cpu().numpy()
-                            x1, y1, x2, y2 = map(int, bbox)
-                            x1, x2 = x1 + x, x2 + x
-                            y1, y2 = y1 + y, y2 + y
-                            cv2.rectangle(display_frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
-                            cv2.putText(display_frame, f'{label} {conf:.2f}', (x1, y1 - 10), 
-                                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
-                            if 'person' not in self.last_detections:
-                                location = self.geocoder.get_location()
-                                detection_info = {
-                                    "id": IDGenerator.generate_unique_id(),
-                                    "timestamp": self.get_timestamp(),
-                                    "detection": {
-                                        "object": "person",
-                                        "confidence": conf,
-                                        "bbox": [x1, y1, x2, y2]
-                                    },
-                                    "location": {
-                                        "roi": roi,
-                                        "camera_id": "camera_1",
-                                        "coordinates": location
-                                    }
-                                }
-                                self.api_client.send_notification(detection_info)
-        
-        self.last_detections = current_detections
-        return display_frame
+            detections = results_to_detections(results, self.target_class_ids,
+                                               self.roi_handler.min_confidence(self.confidence_threshold), roi[:2])
+            zone_ids = self.roi_handler.assign_zones(detections, self.confidence_threshold)
+            in_zone = zone_ids >= 0
+            detections, zone_ids = detections[in_zone], zone_ids[in_zone]
+            class_ids = np.unique(detections['class_id']).tolist()
+            current_labels = {self.model.names[cls] for cls in class_ids}
+
+            if self.tracker is not None:
+                # Notify once per new track; smoothed track boxes are assigned with the same thresholds
+                detections = self.tracker.update(detections)
+                zone_ids = self.roi_handler.assign_zones(detections, self.confidence_threshold)
+                new_tracks = self.tracker.pop_new_tracks()
+                if len(new_tracks):
+                    # New tracks are a subset of the confirmed tracks, in the same order
+                    is_new = np.isin(detections['track_id'], new_tracks['track_id'])
+                    self.send_notifications(detections[is_new], roi, zone_ids[is_new])
+            else:
+                # Notify for classes that were not present in the previous frame
+                new_ids = [cls for cls in class_ids if self.model.names[cls] not in self.last_detections]
+                if new_ids:
+                    is_new = np.isin(detections['class_id'], new_ids)
+                    self.send_notifications(detections[is_new], roi, zone_ids[is_new])
+
+            if self.event_store is not None and len(detections):
+                self.event_store.append(self.frame_timestamp or time.time(), self.camera_id, detections, zone_ids,
+                                        [zone.name for zone in self.roi_handler.get_zones()])
+
+        self.detections = detections
+        self.last_detections = current_labels
+        if self.metrics is not None:
+            self._stages['postprocess'].observe(time.perf_counter() - start)
+        return detections
+
+    def send_notifications(self, detections, roi, zone_ids):
+        """
+        Queues one notification record per detection, tagged with the zone it was found in and
+        the paths of the frame's snapshot and clip if alert media is recorded.
+        :param detections: Structured array of DETECTION_DTYPE (or TRACK_DTYPE, which adds the track ID).
+        :param roi: ROI the detections were made in.
+        :param zone_ids: Zone index of each detection from ROIHandler.assign_zones() (-1 for none).
+        """
+        location = self.geocoder.get_location()
+        timestamp = self.get_timestamp()
+        has_tracks = 'track_id' in detections.dtype.names
+        zone_names = [zone.name for zone in self.roi_handler.get_zones()] + [None]  # -1 -> None
+        snapshot = clip = None
+        if self.media is not None and self.current_frame is not None:
+            # One snapshot and clip per frame, referenced by all of its notifications
+            snapshot, clip = self.media.capture(self.current_frame, self.frame_timestamp or time.time(),
+                                                self.camera_id, detections[['x1', 'y1', 'x2', 'y2']].tolist())
+        for row, zone_id in zip(detections.tolist(), zone_ids.tolist()):
+            record = NotificationRecord(self.id_generator.generate_unique_id(), timestamp, self.model.names[row[5]],
+                                        row[4], row[:4], roi, self.camera_id, location, zone_names[zone_id],
+                                        row[6] if has_tracks else None, snapshot, clip)
+            if self.settings.notify_validate:
+                validate_notification(record)
+            self.notifier.submit(record, captured_at=self.frame_timestamp)
@@ -0,0 +1,157 @@
+import time
+from typing import List, NamedTuple, Optional
+
+OVERLAY_FULL = 'full'  # Dimmed frame, zone labels, location text and box labels
+OVERLAY_FAST = 'fast'  # Plain copy of the frame with zone outlines and boxes only
+
+
+class QualityLevel(NamedTuple):
+    """
+    One step of the quality ladder.
+    """
+    inference_size: int  # Upper bound for the model input size
+    frame_stride: int  # Run detection on every Nth frame
+    overlay: str  # OVERLAY_FULL or OVERLAY_FAST
+
+    def describe(self) -> str:
+        stride = "every frame" if self.frame_stride == 1 else f"every {self.frame_stride} frames"
+        return f"inference size {self.inference_size}, detection on {stride}, {self.overlay} overlay"
+
+
+def build_levels(max_size: int = 640, min_size: int = 256, max_stride: int = 3, stride: int = 32) -> List[QualityLevel]:
+    """
+    Builds the ladder from full quality down, cheapest losses first: the overlay is simplified,
+    then the inference size is lowered in stride-multiple steps of about 20%, then detection
+    runs on every 2nd, 3rd... frame at the smallest size.
+    :param stride: Model stride; inference sizes are multiples of it (`max_size` and `min_size`
+                   are rounded down to one).
+    :return: Levels ordered from best (index 0) to cheapest.
+    """
+    max_size = max(stride, max_size // stride * stride)
+    min_size = min(max(stride, min_size // stride * stride), max_size)
+    levels = [QualityLevel(max_size, 1, OVERLAY_FULL), QualityLevel(max_size, 1, OVERLAY_FAST)]
+    size = max_size
+    while size > min_size:
+        size = max(min_size, int(size * 0.8) // stride * stride)
+        levels.append(QualityLevel(size, 1, OVERLAY_FAST))
+    for frame_stride in range(2, max_stride + 1):
+        levels.append(QualityLevel(min_size, frame_stride, OVERLAY_FAST))
+    return levels
+
+
+class QualityController:
+    """
+    Holds a frame-rate (and optionally CPU) budget by moving along a ladder of quality levels.
+
+    The detection loop reports the processing time of every frame with record(); every `window`
+    frames the mean is compared with the frame budget (1 / target FPS) and the process CPU use
+    with `cpu_budget`. Over budget drops one level right away, so the loop never builds up a
+    backlog. Going back up needs `hold_windows` consecutive windows below `upgrade_margin` of the
+    budget; a level that is left again right after an upgrade doubles that hold, which stops the
+    controller from oscillating around a level it cannot sustain.
+    """
+
+    def __init__(self, target_fps: float, levels: List[QualityLevel], cpu_budget: float = 0.0, window: int = 15,
+                 hold_windows: int = 3, upgrade_margin: float = 0.7, max_hold_windows: int = 48):
+        """
+        :param target_fps: Frames per second the loop must sustain.
+        :param levels: Quality ladder, best first (see build_levels()).
+        :param cpu_budget: Maximum process CPU use in cores (e.g. 0.5); 0 disables the CPU budget.
+        :param window: Frames per evaluation.
+        :param hold_windows: Windows under budget needed before raising the quality.
+        :param upgrade_margin: Fraction of the budget the loop must stay under to raise the quality.
+        :param max_hold_windows: Upper bound for the hold after repeated failed upgrades.
+        """
+        if target_fps <= 0:
+            raise ValueError("The QoS target FPS must be positive")
+        self.frame_budget = 1.0 / target_fps
+        self.levels = levels
+        self.cpu_budget = cpu_budget
+        self.window = max(1, window)
+        self.base_hold = max(1, hold_windows)
+        self.hold = self.base_hold
+        self.max_hold = max(self.base_hold, max_hold_windows)
+        self.upgrade_margin = upgrade_margin
+        self.index = 0
+        self.adjustments = 0
+        self._frame = 0
+        self._samples: List[float] = []
+        self._calm_windows = 0
+        self._just_upgraded = False
+        self._window_start = time.monotonic()
+        self._cpu_start = time.process_time()
+        self._warned_floor = False
+
+    @property
+    def level(self) -> QualityLevel:
+        return self.levels[self.index]
+
+    def should_detect(self) -> bool:
+        """
+        Advances the frame counter and tells whether detection runs on this frame at the current stride.
+        """
+        self._frame += 1
+        return self._frame % self.level.frame_stride == 0
+
+    def record(self, frame_seconds: float) -> Optional[QualityLevel]:
+        """
+        Reports the processing time of one frame (excluding the wait for the frame itself).
+        :return: The new level if the quality was changed, else None.
+        """
+        self._samples.append(frame_seconds)
+        if len(self._samples) < self.window:
+            return None
+
+        now, cpu_now = time.monotonic(), time.process_time()
+        elapsed = max(now - self._window_start, 1e-9)
+        mean = sum(self._samples) / len(self._samples)
+        cpu = (cpu_now - self._cpu_start) / elapsed
+        self._samples.clear()
+        self._window_start, self._cpu_start = now, cpu_now
+        return self.evaluate(mean, cpu)
+
+    def evaluate(self, mean_frame_seconds: float, cpu: float = 0.0) -> Optional[QualityLevel]:
+        """
+        Applies one window's measurements: mean processing time per frame and CPU use in cores.
+        :return: The new level if the quality was changed, else None.
+        """
+        cpu_limited = self.cpu_budget > 0
+        over_time = mean_frame_seconds > self.frame_budget
+        over_cpu = cpu_limited and cpu > self.cpu_budget
+        if over_time or over_cpu:
+            self._calm_windows = 0
+            if self._just_upgraded:
+                # The level we just raised to is not sustainable: wait longer before the next try
+                self.hold = min(self.hold * 2, self.max_hold)
+            self._just_upgraded = False
+            if self.index == len(self.levels) - 1:
+                if not self._warned_floor:
+                    print(f"QoS: lowest quality level reached and still over budget "
+                          f"({mean_frame_seconds * 1000:.0f} ms/frame, budget {self.frame_budget * 1000:.0f} ms)")
+                    self._warned_floor = True
+                return None
+            reason = (f"{mean_frame_seconds * 1000:.0f} ms/frame over the {self.frame_budget * 1000:.0f} ms budget"
+                      if over_time else f"CPU {cpu:.2f} cores over the {self.cpu_budget:.2f} budget")
+            return self._change(self.index + 1, reason)
+
+        if self._just_upgraded:
+            self.hold = self.base_hold  # The upgrade held
+            self._just_upgraded = False
+        self._warned_floor = False
+        calm = mean_frame_seconds < self.frame_budget * self.upgrade_margin and \
+            (not cpu_limited or cpu < self.cpu_budget * self.upgrade_margin)
+        self._calm_windows = self._calm_windows + 1 if calm else 0
+        if self.index > 0 and self._calm_windows >= self.hold:
+            self._calm_windows = 0
+            self._just_upgraded = True
+            return self._change(self.index - 1, f"{mean_frame_seconds * 1000:.0f} ms/frame, CPU {cpu:.2f} cores "
+                                                 f"within budget")
+        return None
+
+    def _change(self, index: int, reason: str) -> QualityLevel:
+        direction = "lowering" if index > self.index else "raising"
+        self.index = index
+        self.adjustments += 1
+        print(f"QoS: {reason}, {direction} quality to level {index}/{len(self.levels) - 1} "
+              f"({self.level.describe()})")
+        return self.level
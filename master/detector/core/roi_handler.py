@@ -1,12 +1,51 @@
 import cv2
+import numpy as np
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+# Name of the zone created from a rectangular ROI (mouse selection or ROI=x,y,w,h)
+ROI_ZONE_NAME = 'roi'
+
+
+class Zone(NamedTuple):
+    """
+    A named polygon in which detections are reported.
+    """
+    name: str
+    points: Tuple[Tuple[int, int], ...]  # Polygon vertices in frame pixels
+    min_confidence: Optional[float] = None  # Defaults to the detector's confidence threshold
+    # Fraction of the box that must lie inside the polygon; None tests the box's bottom-centre
+    # point instead (where a person stands)
+    min_overlap: Optional[float] = None
+
+
+def zones_bounding_box(zones: Sequence[Zone]) -> Tuple[int, int, int, int]:
+    """
+    :return: (x, y, w, h) of the smallest rectangle containing all zones, in frame pixels.
+    """
+    points = np.concatenate([np.asarray(zone.points, dtype=np.int32) for zone in zones])
+    x1, y1 = np.maximum(points.min(axis=0), 0)
+    x2, y2 = points.max(axis=0)
+    return int(x1), int(y1), int(x2 - x1), int(y2 - y1)
+
 
 class ROIHandler:
+    """
+    Holds the detection zones of a camera. The model runs once on the union bounding box of all
+    zones (the ROI, see get_roi()); assign_zones() then maps each detection to its zone using
+    masks rasterised once per zone configuration.
+    """
+
     def __init__(self):
-        self.roi = None
+        self.roi = None  # Union bounding box of the zones (x, y, w, h)
+        self.zones: List[Zone] = []
         self.drawing = False
         self.start_point = None
         self.end_point = None
         self.min_roi_size = 10
+        self._polygons: List[np.ndarray] = []  # Zone vertices as int32 arrays, for drawing
+        self._masks = None  # (zones, h, w) bool masks in ROI coordinates
+        self._integrals = {}  # Zone index -> summed-area table of its mask, for overlap tests
+        self._thresholds = np.empty(0, dtype=np.float64)  # Per-zone confidence thresholds (NaN: default)
 
     def validate_roi(self, x1, y1, x2, y2):
         width = abs(x2 - x1)
@@ -29,14 +68,112 @@ class ROIHandler:
                 x1, y1, x2, y2 = self.validate_roi(
                     self.start_point[0], self.start_point[1], x, y
                 )
-                self.roi = (min(x1, x2), min(y1, y2), abs(x2 - x1), abs(y2 - y1))
+                self._set_rectangle(x1, y1, x2, y2)
                 print(f"ROI set: {self.roi}")
 
+    def set_roi(self, x, y, w, h):
+        """
+        Sets a single rectangular zone programmatically, e.g. from the configuration in headless mode.
+        """
+        x1, y1, x2, y2 = self.validate_roi(x, y, x + w, y + h)
+        self._set_rectangle(x1, y1, x2, y2)
+        print(f"ROI set: {self.roi}")
+
+    def _set_rectangle(self, x1, y1, x2, y2):
+        x1, x2 = sorted((x1, x2))
+        y1, y2 = sorted((y1, y2))
+        self.set_zones([Zone(ROI_ZONE_NAME, ((x1, y1), (x2, y1), (x2, y2), (x1, y2)))], verbose=False)
+
+    def set_zones(self, zones: Sequence[Zone], verbose: bool = True):
+        """
+        Replaces the zones and precomputes their masks relative to the new ROI.
+        :param zones: Zones in priority order: a detection inside several zones is assigned to the first.
+        """
+        zones = [zone._replace(points=tuple((int(x), int(y)) for x, y in zone.points)) for zone in zones]
+        for zone in zones:
+            if len(zone.points) < 3:
+                raise ValueError(f"Zone '{zone.name}' needs at least 3 points")
+        if not zones:
+            self.clear_roi()
+            return
+        x, y, w, h = zones_bounding_box(zones)
+        if w <= 0 or h <= 0:
+            raise ValueError("Zones must cover a non-empty area")
+
+        self._polygons = [np.asarray(zone.points, dtype=np.int32) for zone in zones]
+        self._masks = np.zeros((len(zones), h, w), dtype=np.uint8)
+        self._integrals = {}
+        for i, (zone, polygon) in enumerate(zip(zones, self._polygons)):
+            cv2.fillPoly(self._masks[i], [polygon - np.array([x, y], dtype=np.int32)], 1)
+            if zone.min_overlap is not None:
+                self._integrals[i] = cv2.integral(self._masks[i], sdepth=cv2.CV_32S)
+        self._masks = self._masks.view(bool)
+        self._thresholds = np.array([np.nan if zone.min_confidence is None else zone.min_confidence
+                                     for zone in zones], dtype=np.float64)
+        self.zones = zones
+        self.roi = (x, y, w, h)
+        if verbose:
+            print(f"Zones set: {', '.join(zone.name for zone in zones)} (ROI {self.roi})")
+
     def get_roi(self):
         return self.roi
 
+    def get_zones(self) -> List[Zone]:
+        return self.zones
+
+    def get_polygons(self) -> List[np.ndarray]:
+        """
+        :return: The zone outlines as int32 (N, 2) arrays, ready for cv2.polylines().
+        """
+        return self._polygons
+
+    def min_confidence(self, default: float) -> float:
+        """
+        :return: The lowest confidence threshold of any zone, i.e. the one to run the model with.
+        """
+        if not len(self._thresholds):
+            return default
+        return float(np.fmin(self._thresholds, default).min())
+
+    def assign_zones(self, detections: np.ndarray, default_confidence: Optional[float] = None) -> np.ndarray:
+        """
+        Finds the zone of each detection with whole-array lookups into the precomputed masks:
+        the bottom-centre point of the box, or the fraction of the box inside the zone for
+        zones with `min_overlap`.
+        :param detections: DETECTION_DTYPE (or TRACK_DTYPE) array in frame coordinates.
+        :param default_confidence: If given, a detection only counts for a zone when its confidence is
+                                   above the zone's threshold (this value for zones without one).
+        :return: Int array with the index of each detection's zone in get_zones(), or -1.
+        """
+        if self._masks is None or len(detections) == 0:
+            return np.full(len(detections), -1, dtype=np.int64)
+        x, y, _, _ = self.roi
+        _, h, w = self._masks.shape
+        x1, x2 = detections['x1'].astype(np.int64) - x, detections['x2'].astype(np.int64) - x
+        y1, y2 = detections['y1'].astype(np.int64) - y, detections['y2'].astype(np.int64) - y
+
+        anchor_x, anchor_y = (x1 + x2) // 2, y2 - 1
+        in_roi = (anchor_x >= 0) & (anchor_x < w) & (anchor_y >= 0) & (anchor_y < h)
+        # (zones, detections) membership
+        inside = self._masks[:, np.clip(anchor_y, 0, h - 1), np.clip(anchor_x, 0, w - 1)] & in_roi
+        if self._integrals:
+            area = np.maximum((x2 - x1) * (y2 - y1), 1)
+            x1, x2, y1, y2 = np.clip(x1, 0, w), np.clip(x2, 0, w), np.clip(y1, 0, h), np.clip(y2, 0, h)
+            for i, integral in self._integrals.items():
+                covered = integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+                inside[i] = covered / area >= self.zones[i].min_overlap
+        if default_confidence is not None:
+            thresholds = np.where(np.isnan(self._thresholds), default_confidence, self._thresholds)
+            inside &= detections['confidence'][None, :] > thresholds[:, None]
+        return np.where(inside.any(axis=0), inside.argmax(axis=0), -1)
+
     def clear_roi(self):
         self.roi = None
+        self.zones = []
+        self._polygons = []
+        self._masks = None
+        self._integrals = {}
+        self._thresholds = np.empty(0, dtype=np.float64)
         self.start_point = None
         self.end_point = None
         print("ROI cleared")
@@ -0,0 +1,199 @@
+import numpy as np
+from detector.core.detections import DETECTION_DTYPE
+
+# Tracker output: a detection plus the stable ID of the track it belongs to
+TRACK_DTYPE = np.dtype(DETECTION_DTYPE.descr + [('track_id', np.int32)])
+
+EMPTY_TRACKS = np.empty(0, dtype=TRACK_DTYPE)
+
+# Constant-velocity model over [cx, cy, area, aspect, vcx, vcy, varea] as in SORT
+_F = np.eye(7)
+_F[0, 4] = _F[1, 5] = _F[2, 6] = 1.0
+_H = np.eye(4, 7)
+_Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001])
+_R = np.diag([1.0, 1.0, 10.0, 10.0])
+_P0 = np.diag([10.0, 10.0, 10.0, 10.0, 1e4, 1e4, 1e4])
+
+
+def _boxes_to_z(boxes: np.ndarray) -> np.ndarray:
+    w = boxes[:, 2] - boxes[:, 0]
+    h = np.maximum(boxes[:, 3] - boxes[:, 1], 1e-6)
+    return np.stack([boxes[:, 0] + w / 2, boxes[:, 1] + h / 2, w * h, w / h], axis=1)
+
+
+def _x_to_boxes(x: np.ndarray) -> np.ndarray:
+    area = np.maximum(x[:, 2], 1e-6)
+    w = np.sqrt(area * np.maximum(x[:, 3], 1e-6))
+    h = area / w
+    return np.stack([x[:, 0] - w / 2, x[:, 1] - h / 2, x[:, 0] + w / 2, x[:, 1] + h / 2], axis=1)
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise IoU between two sets of [x1, y1, x2, y2] boxes.
+    :return: Array of shape (len(a), len(b)).
+    """
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-6)
+
+
+class Tracker:
+    """
+    Lightweight SORT-style multi-object tracker in pure NumPy.
+
+    Every track carries a Kalman filter; all filters are stored as stacked arrays and
+    predicted/updated together. Detections are associated to tracks greedily by IoU
+    (same class only). A track is confirmed after `min_hits` matched detections and
+    dropped after `max_age` frames without one.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_age: int = 10, min_hits: int = 2):
+        """
+        :param iou_threshold: Minimum IoU for a detection to be associated with a track.
+        :param max_age: Frames a track survives without a matching detection.
+        :param min_hits: Matched detections needed before a track is reported.
+        """
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.next_id = 1
+        self.reset()
+
+    def reset(self):
+        """
+        Drops all tracks.
+        """
+        self._x = np.empty((0, 7))
+        self._p = np.empty((0, 7, 7))
+        self._ids = np.empty(0, dtype=np.int32)
+        self._cls = np.empty(0, dtype=np.int16)
+        self._conf = np.empty(0, dtype=np.float32)
+        self._hits = np.empty(0, dtype=np.int32)
+        self._misses = np.empty(0, dtype=np.int32)  # Frames since the last matched detection
+        self._notified = np.empty(0, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _advance(self):
+        # Keep the predicted area positive
+        shrinking = self._x[:, 2] + self._x[:, 6] <= 0
+        self._x[shrinking, 6] = 0.0
+        self._x = self._x @ _F.T
+        self._p = _F @ self._p @ _F.T + _Q
+        self._misses += 1
+
+    def _confirmed(self) -> np.ndarray:
+        return (self._hits >= self.min_hits) & (self._misses <= self.max_age)
+
+    def _output(self, mask: np.ndarray) -> np.ndarray:
+        tracks = np.empty(int(mask.sum()), dtype=TRACK_DTYPE)
+        boxes = _x_to_boxes(self._x[mask]).astype(np.int32)
+        tracks['x1'], tracks['y1'], tracks['x2'], tracks['y2'] = boxes.T
+        tracks['confidence'] = self._conf[mask]
+        tracks['class_id'] = self._cls[mask]
+        tracks['track_id'] = self._ids[mask]
+        return tracks
+
+    def predict(self) -> np.ndarray:
+        """
+        Advances all tracks by one frame without detections (frames where inference is skipped).
+        :return: Predicted boxes of the confirmed tracks as a TRACK_DTYPE array.
+        """
+        if len(self) == 0:
+            return EMPTY_TRACKS
+        self._advance()
+        self._remove(self._misses > self.max_age)
+        return self._output(self._confirmed())
+
+    def update(self, detections: np.ndarray) -> np.ndarray:
+        """
+        Advances all tracks by one frame and corrects them with the frame's detections.
+        :param detections: DETECTION_DTYPE array in frame coordinates.
+        :return: Confirmed tracks as a TRACK_DTYPE array.
+        """
+        if len(self):
+            self._advance()
+        boxes = np.stack([detections['x1'], detections['y1'], detections['x2'], detections['y2']],
+                         axis=1).astype(np.float64)
+
+        track_idx, det_idx = self._associate(boxes, detections['class_id'])
+        if len(track_idx):
+            self._correct(track_idx, _boxes_to_z(boxes[det_idx]))
+            self._cls[track_idx] = detections['class_id'][det_idx]
+            self._conf[track_idx] = detections['confidence'][det_idx]
+
+        unmatched = np.setdiff1d(np.arange(len(detections)), det_idx)
+        self._remove(self._misses > self.max_age)
+        if len(unmatched):
+            self._add(boxes[unmatched], detections[unmatched])
+        return self._output(self._confirmed())
+
+    def pop_new_tracks(self) -> np.ndarray:
+        """
+        Returns confirmed tracks that have not been reported yet and marks them as reported.
+        :return: TRACK_DTYPE array, one entry per new track.
+        """
+        new = self._confirmed() & ~self._notified & (self._misses == 0)
+        self._notified |= new
+        return self._output(new)
+
+    def _associate(self, boxes: np.ndarray, class_ids: np.ndarray):
+        if len(self) == 0 or len(boxes) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        iou = iou_matrix(_x_to_boxes(self._x), boxes)
+        iou[self._cls[:, None] != class_ids[None, :]] = 0.0
+
+        # Greedy assignment, best overlaps first
+        track_idx, det_idx = [], []
+        order = np.argsort(iou, axis=None)[::-1]
+        used_tracks, used_dets = set(), set()
+        for flat in order:
+            t, d = divmod(int(flat), iou.shape[1])
+            if iou[t, d] < self.iou_threshold:
+                break
+            if t in used_tracks or d in used_dets:
+                continue
+            used_tracks.add(t)
+            used_dets.add(d)
+            track_idx.append(t)
+            det_idx.append(d)
+        return np.array(track_idx, dtype=np.int64), np.array(det_idx, dtype=np.int64)
+
+    def _correct(self, idx: np.ndarray, z: np.ndarray):
+        x, p = self._x[idx], self._p[idx]
+        y = z - x @ _H.T
+        s = _H @ p @ _H.T + _R
+        k = p @ _H.T @ np.linalg.inv(s)
+        self._x[idx] = x + (k @ y[:, :, None])[:, :, 0]
+        self._p[idx] = (np.eye(7) - k @ _H) @ p
+        self._hits[idx] += 1
+        self._misses[idx] = 0
+
+    def _add(self, boxes: np.ndarray, detections: np.ndarray):
+        count = len(boxes)
+        x = np.zeros((count, 7))
+        x[:, :4] = _boxes_to_z(boxes)
+        self._x = np.concatenate([self._x, x])
+        self._p = np.concatenate([self._p, np.repeat(_P0[None], count, axis=0)])
+        self._ids = np.concatenate([self._ids, np.arange(self.next_id, self.next_id + count, dtype=np.int32)])
+        self.next_id += count
+        self._cls = np.concatenate([self._cls, detections['class_id']])
+        self._conf = np.concatenate([self._conf, detections['confidence']])
+        self._hits = np.concatenate([self._hits, np.ones(count, dtype=np.int32)])
+        self._misses = np.concatenate([self._misses, np.zeros(count, dtype=np.int32)])
+        self._notified = np.concatenate([self._notified, np.zeros(count, dtype=bool)])
+
+    def _remove(self, mask: np.ndarray):
+        if not mask.any():
+            return
+        keep = ~mask
+        self._x, self._p = self._x[keep], self._p[keep]
+        self._ids, self._cls, self._conf = self._ids[keep], self._cls[keep], self._conf[keep]
+        self._hits, self._misses, self._notified = self._hits[keep], self._misses[keep], self._notified[keep]
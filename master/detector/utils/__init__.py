@@ -1,9 +1,43 @@
-from .camera import Camera
-from .geocoding import Geocoder
-from .id_generator import IDGenerator
+from typing import TYPE_CHECKING
+from .lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .camera import Camera, CapturedFrame, FrameRingBuffer, FrameSource, ImageSequenceCapture, parse_source
+    from .event_store import EventStore
+    from .frame_pool import FramePool
+    from .geocoding import Geocoder
+    from .id_generator import IDGenerator
+    from .metrics import MetricsRegistry, MetricsServer, PipelineMetrics
+
+_EXPORTS = {
+    "Camera": "detector.utils.camera",
+    "CapturedFrame": "detector.utils.camera",
+    "FrameRingBuffer": "detector.utils.camera",
+    "FrameSource": "detector.utils.camera",
+    "ImageSequenceCapture": "detector.utils.camera",
+    "parse_source": "detector.utils.camera",
+    "EventStore": "detector.utils.event_store",
+    "FramePool": "detector.utils.frame_pool",
+    "Geocoder": "detector.utils.geocoding",
+    "IDGenerator": "detector.utils.id_generator",
+    "MetricsRegistry": "detector.utils.metrics",
+    "MetricsServer": "detector.utils.metrics",
+    "PipelineMetrics": "detector.utils.metrics"
+}
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
     "Camera",
+    "CapturedFrame",
+    "FrameRingBuffer",
+    "FrameSource",
+    "ImageSequenceCapture",
+    "parse_source",
+    "EventStore",
+    "FramePool",
     "Geocoder",
-    "IDGenerator"
+    "IDGenerator",
+    "MetricsRegistry",
+    "MetricsServer",
+    "PipelineMetrics"
 ]
\ No newline at end of file
@@ -1,51 +1,516 @@
 import cv2
+import glob
+import os
 import platform
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import parse_qsl
+
+import numpy as np
+from detector.utils.frame_pool import FramePool
+
+
+class CapturedFrame(NamedTuple):
+    """
+    A frame taken from the capture device together with its capture metadata.
+    """
+    frame: np.ndarray  # BGR image as returned by cv2.VideoCapture.read()
+    timestamp: float  # Wall-clock capture time (time.time())
+    sequence: int  # Monotonic frame counter assigned by the capture thread
+    pool: Optional[FramePool] = None  # Pool owning the frame buffer, if pooled
+    slot: int = -1  # Slot of the frame buffer in `pool`
+
+
+class FrameRingBuffer:
+    """
+    Bounded, thread-safe buffer between the capture thread and the consumer.
+
+    Two policies are supported:
+    - 'drop_oldest': keeps up to `capacity` frames; when full the oldest frame is evicted.
+    - 'keep_latest': keeps only the most recent frame, regardless of `capacity`.
+    """
+    POLICIES = ('drop_oldest', 'keep_latest')
+
+    def __init__(self, capacity: int = 2, policy: str = 'keep_latest',
+                 on_discard: Optional[Callable[[CapturedFrame], None]] = None):
+        """
+        :param capacity: Maximum number of frames held (default is 2).
+        :param policy: Either 'drop_oldest' or 'keep_latest' (default is 'keep_latest').
+        :param on_discard: Called with every frame that leaves the buffer without being handed
+                           to the consumer (e.g. to return its buffer to a FramePool).
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown buffer policy '{policy}', expected one of {self.POLICIES}")
+        if capacity < 1:
+            raise ValueError("Buffer capacity must be at least 1")
+        self.policy = policy
+        self.capacity = 1 if policy == 'keep_latest' else capacity
+        self._frames: Deque[CapturedFrame] = deque(maxlen=self.capacity)
+        self._on_discard = on_discard
+        self._cond = threading.Condition()
+        self._last_sequence = -1  # Sequence number of the newest frame put into the buffer
+        self._last_consumed = -1  # Sequence number of the last frame handed to the consumer
+        self.consumed = 0
+        self.dropped = 0
+
+    def put(self, item: CapturedFrame):
+        """
+        Adds a frame to the buffer, evicting the oldest one if the buffer is full.
+        """
+        with self._cond:
+            if len(self._frames) == self.capacity:
+                self._discard(self._frames[0])
+            self._frames.append(item)
+            self._last_sequence = item.sequence
+            self._cond.notify_all()
+
+    def _discard(self, item: CapturedFrame):
+        if self._on_discard is not None:
+            self._on_discard(item)
+
+    def _consume(self, item: CapturedFrame) -> CapturedFrame:
+        # Every sequence number between two consumed frames is a frame the consumer never saw
+        if self._last_consumed >= 0:
+            self.dropped += max(0, item.sequence - self._last_consumed - 1)
+        self._last_consumed = item.sequence
+        self.consumed += 1
+        return item
+
+    def _wait(self, timeout: float) -> bool:
+        if not self._frames and timeout > 0:
+            self._cond.wait(timeout)
+        return bool(self._frames)
+
+    def get_latest(self, timeout: float = 0.0) -> Optional[CapturedFrame]:
+        """
+        Returns the newest unread frame and discards any older unread frames.
+        :param timeout: Seconds to wait for a frame if none is available (0 means non-blocking).
+        :return: The newest CapturedFrame, or None if no unread frame is available.
+        """
+        with self._cond:
+            if not self._wait(timeout):
+                return None
+            item = self._frames.pop()
+            while self._frames:
+                self._discard(self._frames.popleft())
+            return self._consume(item)
+
+    def get_next(self, timeout: float = 0.0) -> Optional[CapturedFrame]:
+        """
+        Returns the oldest unread frame (FIFO order).
+        :param timeout: Seconds to wait for a frame if none is available (0 means non-blocking).
+        :return: The oldest buffered CapturedFrame, or None if the buffer is empty.
+        """
+        with self._cond:
+            if not self._wait(timeout):
+                return None
+            return self._consume(self._frames.popleft())
+
+    def lag(self) -> int:
+        """
+        :return: Number of frames captured since the last frame handed to the consumer.
+        """
+        with self._cond:
+            return max(0, self._last_sequence - self._last_consumed)
+
+    def clear(self):
+        with self._cond:
+            while self._frames:
+                self._discard(self._frames.popleft())
+
+
+STREAM_SCHEMES = ('rtsp', 'rtsps', 'rtmp', 'http', 'https', 'udp', 'tcp', 'srt')
+_SOURCE_OPTIONS = {'threads': ('decode_threads', int), 'fps': ('target_fps', float),
+                   'step': ('frame_step', int), 'loop': ('loop', lambda v: v.lower() in ('1', 'true', 'yes'))}
+# A fragment of key=value options; anything else after a '#' (e.g. in a password) is part of the URI
+_OPTIONS_FRAGMENT = re.compile(r'[A-Za-z_]+=[^&=/@:]*(&[A-Za-z_]+=[^&=/@:]*)*')
+
+
+def parse_source(uri) -> Tuple[str, Union[int, str], Dict[str, object]]:
+    """
+    Classifies a frame source URI.
+
+    Accepted forms are a device index ("0"), a stream URL ("rtsp://...", "http://..."), a video
+    file ("clip.mp4" or "file://clip.mp4") and an image glob or directory ("frames/*.jpg").
+    Per-source options can be appended as a fragment, e.g. "rtsp://cam/stream#fps=5&threads=2".
+    A '#' that is not followed by key=value options is kept as part of the URI.
+    :return: A tuple (kind, target, options) with kind 'device', 'stream', 'file' or 'images'.
+    :raises ValueError: If the fragment names an unknown option.
+    """
+    if isinstance(uri, int):
+        return 'device', uri, {}
+    uri = str(uri).strip()
+    options: Dict[str, object] = {}
+    base, _, fragment = uri.rpartition('#')
+    if base and _OPTIONS_FRAGMENT.fullmatch(fragment):
+        uri = base
+        for key, value in parse_qsl(fragment, keep_blank_values=True):
+            if key not in _SOURCE_OPTIONS:
+                raise ValueError(f"Unknown source option '{key}', expected one of {sorted(_SOURCE_OPTIONS)}")
+            name, convert = _SOURCE_OPTIONS[key]
+            options[name] = convert(value)
+
+    if uri.isdigit():
+        return 'device', int(uri), options
+    scheme = uri.split('://', 1)[0].lower() if '://' in uri else ''
+    if scheme in STREAM_SCHEMES:
+        return 'stream', uri, options
+    if scheme == 'file':
+        uri = uri[len('file://'):]
+    if os.path.isdir(uri):
+        return 'images', os.path.join(uri, '*'), options
+    if any(char in uri for char in '*?['):
+        return 'images', uri, options
+    return 'file', uri, options
+
+
+class ImageSequenceCapture:
+    """
+    cv2.VideoCapture look-alike over the image files matching a glob, in sorted order.
+    Skipped frames (grab()) are never read from disk.
+    """
+    IMAGE_EXTENSIONS = ('.bmp', '.jpeg', '.jpg', '.png', '.tif', '.tiff', '.webp')
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.paths: List[str] = sorted(path for path in glob.glob(pattern)
+                                       if path.lower().endswith(self.IMAGE_EXTENSIONS))
+        self.position = 0  # Index of the next image
+        self._grabbed: Optional[str] = None
+
+    def isOpened(self) -> bool:
+        return bool(self.paths)
+
+    def grab(self) -> bool:
+        if self.position >= len(self.paths):
+            self._grabbed = None
+            return False
+        self._grabbed = self.paths[self.position]
+        self.position += 1
+        return True
+
+    def retrieve(self, image: Optional[np.ndarray] = None):
+        if self._grabbed is None:
+            return False, None
+        frame = cv2.imread(self._grabbed, cv2.IMREAD_COLOR)
+        if frame is None:
+            return False, None
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame
+
+    def read(self, image: Optional[np.ndarray] = None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def get(self, prop_id: int) -> float:
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self.paths))
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        return 0.0
+
+    def set(self, prop_id: int, value: float) -> bool:
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            self.position = int(min(max(value, 0), len(self.paths)))
+            return True
+        return False
+
+    def release(self):
+        self.paths = []
+
+
+class FrameSource:
+    """
+    A device, stream, video file or image sequence behind the cv2.VideoCapture read interface
+    (read/grab/retrieve/isOpened/get/set/release), so it can replace a VideoCapture directly.
+
+    On top of the backend it adds:
+    - `frame_step`: deliver every Nth frame. The others are only grabbed, which skips the
+      colour conversion and copy into a BGR array (and, for images, reading the file).
+    - `target_fps`: cap the delivery rate. Live sources grab and drop frames that arrive
+      before the next frame is due; files and images are paced to play back at that rate.
+    - `loop`: restart files and image sequences from the beginning when they end.
+    """
+
+    def __init__(self, uri: Union[int, str] = 0, width: Optional[int] = None, height: Optional[int] = None,
+                 decode_threads: int = 0, target_fps: float = 0.0, frame_step: int = 1, loop: bool = False):
+        """
+        :param uri: Source URI, see parse_source(). Options in its fragment override the arguments below.
+        :param width: Requested frame width (devices only).
+        :param height: Requested frame height (devices only).
+        :param decode_threads: FFmpeg decoder threads for streams and files (0 lets FFmpeg decide).
+        :param target_fps: Maximum delivery rate in frames per second (0 disables throttling).
+        :param frame_step: Deliver every Nth frame (default is 1, every frame).
+        :param loop: Restart finite sources when they end.
+        """
+        self.kind, self.target, options = parse_source(uri)
+        self.decode_threads = options.get('decode_threads', decode_threads)
+        self.target_fps = options.get('target_fps', target_fps)
+        self.frame_step = max(1, options.get('frame_step', frame_step))
+        self.loop = options.get('loop', loop)
+        self.finished = False  # Set once a finite source has no frames left
+        self._interval = 1.0 / self.target_fps if self.target_fps > 0 else 0.0
+        self._next_due = 0.0
+        self.cap = self._open(width, height)
+
+    @property
+    def is_live(self) -> bool:
+        """
+        True for devices and streams, which keep producing frames whether or not they are read.
+        """
+        return self.kind in ('device', 'stream')
+
+    def _open(self, width: Optional[int], height: Optional[int]):
+        if self.kind == 'images':
+            return ImageSequenceCapture(self.target)
+        if self.kind == 'device':
+            # Use DirectShow for better compatibility on Windows
+            api = cv2.CAP_DSHOW if platform.system() == 'Windows' else cv2.CAP_ANY
+            cap = cv2.VideoCapture(self.target, api)
+            if width and height:
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            return cap
+        params = [cv2.CAP_PROP_N_THREADS, self.decode_threads] if self.decode_threads > 0 else []
+        return cv2.VideoCapture(self.target, cv2.CAP_FFMPEG, params)
+
+    def _rewind(self) -> bool:
+        if self.is_live or not self.loop:
+            self.finished = not self.is_live
+            return False
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return True
+
+    def grab(self) -> bool:
+        if self.cap.grab():
+            return True
+        return self._rewind() and self.cap.grab()
+
+    def retrieve(self, image: Optional[np.ndarray] = None):
+        return self.cap.retrieve(image)
+
+    def _throttle(self) -> bool:
+        now = time.monotonic()
+        if now < self._next_due:
+            if not self.is_live:
+                time.sleep(self._next_due - now)
+            else:
+                # Drain the frames that arrive before the next one is due without converting them
+                while time.monotonic() < self._next_due:
+                    if not self.grab():
+                        return False
+        self._next_due = max(self._next_due + self._interval, time.monotonic())
+        return True
+
+    def read(self, image: Optional[np.ndarray] = None):
+        """
+        Reads the next frame to deliver, honouring `frame_step` and `target_fps`.
+        :param image: Optional array to decode into (see FramePool).
+        :return: A tuple (ret, frame) like cv2.VideoCapture.read().
+        """
+        for _ in range(self.frame_step - 1):
+            if not self.grab():
+                return False, None
+        if self._interval and not self._throttle():
+            return False, None
+        if not self.grab():
+            return False, None
+        return self.cap.retrieve(image)
+
+    def isOpened(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+    def get(self, prop_id: int) -> float:
+        return self.cap.get(prop_id)
+
+    def set(self, prop_id: int, value: float) -> bool:
+        return self.cap.set(prop_id, value)
+
+    def release(self):
+        self.cap.release()
+
+    def __repr__(self):
+        return f"FrameSource({self.kind}: {self.target})"
+
 
 class Camera:
-    def __init__(self, camera_index=0, width=1280, height=720):
+    def __init__(self, source=0, width=1280, height=720, decode_threads: int = 0, target_fps: float = 0.0,
+                 frame_step: int = 1, loop: bool = False):
         """
-        Initialize the camera with the specified index and resolution.
-        :param camera_index: Index of the camera (default is 0).
+        Initialize the camera with the specified source and resolution.
+        :param source: Device index or source URI, see parse_source() (default is 0).
         :param width: Width of the captured frames (default is 1280).
         :param height: Height of the captured frames (default is 720).
+        :param decode_threads: FFmpeg decoder threads for streams and files (0 lets FFmpeg decide).
+        :param target_fps: Maximum frame rate delivered by the source (0 disables throttling).
+        :param frame_step: Deliver every Nth frame; skipped frames are not converted.
+        :param loop: Restart video files and image sequences when they end.
         """
-        self.camera_index = camera_index
+        self.source = source
         self.width = width
         self.height = height
+        self._source_options = dict(decode_threads=decode_threads, target_fps=target_fps,
+                                    frame_step=frame_step, loop=loop)
         self.cap = None
-        
+
+        # Background capture state
+        self.buffer: Optional[FrameRingBuffer] = None
+        self.pool: Optional[FramePool] = None
+        self._use_pool = False
+        self.frames_captured = 0
+        self.capture_failures = 0
+        self._capture_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
         self._initialize_camera()
 
     def _initialize_camera(self):
         """
-        Initializes the camera based on the operating system.
-        Uses DirectShow on Windows and default API on other systems.
+        Opens the frame source (DirectShow is used for devices on Windows).
         """
         try:
-            if platform.system() == 'Windows':
-                # Use DirectShow for better compatibility on Windows
-                self.cap = cv2.VideoCapture(self.camera_index, cv2.CAP_DSHOW)
-            else:
-                self.cap = cv2.VideoCapture(self.camera_index)
-
-            # Set camera resolution
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+            self.cap = FrameSource(self.source, self.width, self.height, **self._source_options)
 
             if not self.cap.isOpened():
-                raise Exception("Camera initialization failed")
+                raise Exception(f"Camera initialization failed for {self.cap}")
 
-            print(f"Camera initialized with resolution {self.width}x{self.height}")
+            if self.cap.kind == 'device':
+                print(f"Camera initialized with resolution {self.width}x{self.height}")
+            else:
+                print(f"Opened {self.cap}")
 
         except Exception as e:
             print(f"Error initializing camera: {str(e)}")
             self.cap = None
 
+    def start_capture(self, buffer_size: int = 2, policy: str = 'keep_latest', use_pool: bool = True):
+        """
+        Starts a background thread that continuously drains the device into a ring buffer,
+        so that slow consumers never leave stale frames queued in the driver.
+        :param buffer_size: Number of frames kept in the ring buffer (default is 2).
+        :param policy: Buffer policy, 'drop_oldest' or 'keep_latest' (default is 'keep_latest').
+        :param use_pool: Decode into preallocated FramePool buffers instead of a new array per
+                         frame. Consumers must then hand frames back with release_frame().
+        """
+        if self._capture_thread is not None:
+            return
+        if not self.is_opened():
+            raise RuntimeError("Cannot start capture: camera is not opened")
+
+        self.buffer = FrameRingBuffer(buffer_size, policy, on_discard=self.release_frame)
+        self._use_pool = use_pool
+        self._stop_event.clear()
+        self._capture_thread = threading.Thread(target=self._capture_loop, name="camera-capture", daemon=True)
+        self._capture_thread.start()
+        print(f"Background capture started (buffer={self.buffer.capacity}, policy={policy})")
+
+    def _capture_loop(self):
+        """
+        Capture thread body: reads frames as fast as the device delivers them.
+        """
+        while not self._stop_event.is_set():
+            pool, slot = self.pool, -1
+            if pool is not None:
+                slot = pool.acquire()
+                ret, frame = self.cap.read(pool.buffer(slot))
+            else:
+                ret, frame = self.cap.read()
+
+            if not ret or frame is None:
+                if pool is not None:
+                    pool.release(slot)
+                if self.cap.finished:
+                    break  # End of a video file or image sequence
+                self.capture_failures += 1
+                time.sleep(0.01)
+                continue
+
+            if pool is not None and frame is not pool.buffer(slot):
+                # The device delivered a different size than the pool was built for
+                pool.release(slot)
+                pool, slot = None, -1
+            if self._use_pool and (self.pool is None or self.pool.shape != frame.shape):
+                # Size the pool from the first real frame: ring buffer + consumer + frame being decoded
+                self.pool = FramePool(frame.shape, size=self.buffer.capacity + 2, dtype=frame.dtype)
+
+            self.buffer.put(CapturedFrame(frame, time.time(), self.frames_captured, pool, slot))
+            self.frames_captured += 1
+
+    def stop_capture(self):
+        """
+        Stops the background capture thread, if running.
+        """
+        if self._capture_thread is None:
+            return
+        self._stop_event.set()
+        self._capture_thread.join(timeout=2.0)
+        self._capture_thread = None
+
+    def is_capturing(self) -> bool:
+        """
+        :return: True if the background capture thread is running.
+        """
+        return self._capture_thread is not None and self._capture_thread.is_alive()
+
+    def read_latest(self, timeout: float = 0.0) -> Optional[CapturedFrame]:
+        """
+        Returns the most recent frame captured by the background thread.
+        :param timeout: Seconds to wait for a new frame (0 means non-blocking).
+        :return: CapturedFrame(frame, timestamp, sequence), or None if no new frame is available.
+        """
+        if self.buffer is None:
+            raise RuntimeError("Background capture is not running, call start_capture() first")
+        # Once a finite source ended, only the frames left in the buffer can still arrive
+        return self.buffer.get_latest(timeout if self.is_capturing() else 0.0)
+
+    def release_frame(self, captured: CapturedFrame):
+        """
+        Hands a frame obtained from read_latest() back to the buffer pool. The frame's
+        array must not be used afterwards.
+        """
+        if captured.pool is not None:
+            captured.pool.release(captured.slot)
+
+    def capture_stats(self) -> Dict[str, int]:
+        """
+        Reports how far the consumer lags behind the sensor.
+        :return: Dictionary with captured, consumed, dropped, lag and failure counts.
+        """
+        stats = {
+            'captured': self.frames_captured,
+            'consumed': 0,
+            'dropped': 0,
+            'lag': 0,
+            'failures': self.capture_failures
+        }
+        if self.buffer is not None:
+            stats['consumed'] = self.buffer.consumed
+            stats['dropped'] = self.buffer.dropped
+            stats['lag'] = self.buffer.lag()
+        if self.pool is not None:
+            stats['pool_allocations'] = self.pool.allocations
+        return stats
+
     def capture_frame(self):
         """
         Captures a frame from the camera.
         :return: Captured frame or None if capturing fails.
         """
+        if self.buffer is not None:
+            # In background mode the device is owned by the capture thread
+            captured = self.buffer.get_latest(timeout=1.0)
+            if captured is None:
+                return None
+            # The caller keeps the frame, so it can't stay in a pooled buffer
+            frame = captured.frame.copy() if captured.pool is not None else captured.frame
+            self.release_frame(captured)
+            return frame
         if self.cap:
             ret, frame = self.cap.read()
             if ret:
@@ -59,10 +524,17 @@ class Camera:
         """
         Releases the camera resource.
         """
+        self.stop_capture()
         if self.cap:
             self.cap.release()
             print("Camera released")
 
+    def is_finished(self) -> bool:
+        """
+        :return: True once a finite source (file, image sequence) delivered its last frame.
+        """
+        return self.cap is not None and self.cap.finished
+
     def is_opened(self):
         """
         Check if the camera is properly opened.
@@ -0,0 +1,395 @@
+import glob
+import json
+import math
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Union
+import numpy as np
+
+# One fixed-width record per detection. Cameras, classes and zones are small integers; their
+# names are kept in the store's meta.json.
+EVENT_DTYPE = np.dtype([
+    ('timestamp', np.float64),  # Capture time, seconds since the epoch
+    ('camera', np.int16),  # Index into EventStore.cameras
+    ('class_id', np.int16),  # Model class ID
+    ('zone', np.int16),  # Index into EventStore.zones, -1 outside any zone
+    ('track_id', np.int32),  # -1 without tracker
+    ('confidence', np.float32),
+    ('x1', np.int32),
+    ('y1', np.int32),
+    ('x2', np.int32),
+    ('y2', np.int32)
+])
+
+# Event counts per minute and (camera, class, zone), precomputed when a segment is sealed
+ROLLUP_DTYPE = np.dtype([
+    ('minute', np.int64),  # Seconds since the epoch // 60
+    ('camera', np.int16),
+    ('class_id', np.int16),
+    ('zone', np.int16),
+    ('count', np.int32)
+])
+
+_ROLLUP_KEYS = ['minute', 'camera', 'class_id', 'zone']
+
+
+def compute_rollup(events: np.ndarray) -> np.ndarray:
+    """
+    Counts events per minute and (camera, class, zone).
+    :param events: EVENT_DTYPE array.
+    :return: ROLLUP_DTYPE array sorted by minute.
+    """
+    keys = np.empty(len(events), dtype=ROLLUP_DTYPE[_ROLLUP_KEYS])
+    keys['minute'] = (events['timestamp'] // 60).astype(np.int64)
+    for field in _ROLLUP_KEYS[1:]:
+        keys[field] = events[field]
+    unique, counts = np.unique(keys, return_counts=True)
+    rollup = np.empty(len(unique), dtype=ROLLUP_DTYPE)
+    for field in _ROLLUP_KEYS:
+        rollup[field] = unique[field]
+    rollup['count'] = counts
+    return rollup
+
+
+class _Segment:
+    """
+    One segment file: a preallocated EVENT_DTYPE .npy array, memory-mapped, filled in time
+    order. Unused records are all zeros, so the record count is found again after a restart
+    by a binary search for the first zero timestamp.
+    """
+
+    def __init__(self, path: str, data: np.ndarray, index_stride: int):
+        self.path = path
+        self.data = data
+        self.index_stride = index_stride
+        self.count = self._find_count()
+        # Sparse time index: timestamp of every index_stride-th record
+        self.index = np.array(data['timestamp'][:self.count:index_stride])
+        self.rollup: Optional[np.ndarray] = None  # Set once the segment is sealed
+
+    @classmethod
+    def create(cls, path: str, capacity: int, index_stride: int):
+        return cls(path, np.lib.format.open_memmap(path, mode='w+', dtype=EVENT_DTYPE, shape=(capacity,)),
+                   index_stride)
+
+    @classmethod
+    def open(cls, path: str, index_stride: int, writable: bool):
+        return cls(path, np.load(path, mmap_mode='r+' if writable else 'r'), index_stride)
+
+    @property
+    def rollup_path(self) -> str:
+        return self.path[:-len('.npy')] + '.rollup.npy'
+
+    @property
+    def capacity(self) -> int:
+        return len(self.data)
+
+    @property
+    def first_timestamp(self) -> float:
+        return float(self.data['timestamp'][0]) if self.count else math.inf
+
+    @property
+    def last_timestamp(self) -> float:
+        return float(self.data['timestamp'][self.count - 1]) if self.count else -math.inf
+
+    def _find_count(self) -> int:
+        timestamps = self.data['timestamp']
+        low, high = 0, len(self.data)
+        while low < high:
+            middle = (low + high) // 2
+            if timestamps[middle] > 0:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def append(self, events: np.ndarray) -> int:
+        """
+        Copies as many events as fit.
+        :return: Number of events written.
+        """
+        written = min(len(events), self.capacity - self.count)
+        start = self.count
+        self.data[start:start + written] = events[:written]
+        first_indexed = -start % self.index_stride
+        if first_indexed < written:
+            self.index = np.concatenate([self.index, events['timestamp'][first_indexed:written:self.index_stride]])
+        self.count += written
+        return written
+
+    def locate(self, start: float, end: float):
+        """
+        Finds the records in [start, end) with the sparse index, then a binary search within
+        the index blocks at both ends, so only a few pages of the file are read.
+        :return: (first, stop) record indices.
+        """
+        timestamps = self.data['timestamp']
+        bounds = []
+        for value in (start, end):
+            block = max(0, int(np.searchsorted(self.index, value, side='left')) - 1)
+            low = block * self.index_stride
+            high = min(self.count, low + 2 * self.index_stride)
+            bounds.append(low + int(np.searchsorted(timestamps[low:high], value, side='left')))
+        return bounds[0], bounds[1]
+
+    def seal(self):
+        """
+        Shrinks the file to its records and writes the segment's per-minute rollup next to it.
+        """
+        events = np.array(self.data[:self.count])
+        shrink = self.count < self.capacity
+        self.data.flush()
+        del self.data
+        if shrink:
+            _save_atomic(self.path, events)
+        self.data = np.load(self.path, mmap_mode='r') if self.count else events
+        self.rollup = compute_rollup(events)
+        _save_atomic(self.rollup_path, self.rollup)
+
+    def close(self):
+        if isinstance(self.data, np.memmap) and self.data.mode != 'r':
+            self.data.flush()
+
+
+def _save_atomic(path: str, array: np.ndarray):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        np.save(file, array)
+    os.replace(temp_path, path)
+
+
+class EventStore:
+    """
+    Local history of detection events: fixed-width EVENT_DTYPE records appended to
+    memory-mapped NumPy segment files under one directory.
+
+    Appends copy the frame's detections straight into the mapped file of the active segment
+    (the OS writes the pages back), so the detection loop never serializes anything. A segment
+    is sealed when it is full or spans `segment_seconds`: it is shrunk to its records and its
+    per-minute rollup (counts per camera, class and zone) is written next to it.
+
+    Queries over a range use the rollups of sealed segments for the whole minutes and the
+    sparse time index plus a binary search for the partial minutes at both ends and the
+    active segment, so a count over months reads a few rollup arrays rather than every event.
+    Timestamps are kept in append order: an event older than the previous one (e.g. from
+    another camera sharing the store) is stored at the previous timestamp.
+    """
+
+    def __init__(self, path: str = 'events', segment_records: int = 1 << 20, segment_seconds: float = 86400,
+                 retention_seconds: float = 0, index_stride: int = 1024):
+        """
+        :param path: Directory holding the segment files and meta.json.
+        :param segment_records: Capacity of a segment (the file is preallocated to it while active).
+        :param segment_seconds: Seal the active segment once it spans this long (0 disables).
+        :param retention_seconds: Delete sealed segments whose newest event is older (0 keeps everything).
+        :param index_stride: Records per sparse time index entry.
+        """
+        self.path = path
+        self.segment_records = segment_records
+        self.segment_seconds = segment_seconds
+        self.retention_seconds = retention_seconds
+        self.index_stride = index_stride
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+        self.cameras: List[str] = []
+        self.zones: List[str] = []
+        self.class_names: Dict[int, str] = {}
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as file:
+                meta = json.load(file)
+            self.cameras = meta['cameras']
+            self.zones = meta['zones']
+            self.class_names = {int(cls): name for cls, name in meta['classes'].items()}
+
+        self.segments: List[_Segment] = []
+        paths = sorted(glob.glob(os.path.join(path, 'events-*[0-9].npy')))
+        for i, segment_path in enumerate(paths):
+            segment = _Segment.open(segment_path, index_stride, writable=i == len(paths) - 1)
+            if os.path.exists(segment.rollup_path):
+                segment.rollup = np.load(segment.rollup_path)
+            elif i < len(paths) - 1:
+                segment.seal()  # Interrupted while sealing
+            self.segments.append(segment)
+        self._next_segment = int(os.path.basename(paths[-1])[7:-4]) + 1 if paths else 1
+        self._last_timestamp = max((segment.last_timestamp for segment in self.segments), default=0.0)
+
+    @property
+    def active(self) -> Optional[_Segment]:
+        if self.segments and self.segments[-1].rollup is None:
+            return self.segments[-1]
+        return None
+
+    def _save_meta(self):
+        temp_path = os.path.join(self.path, 'meta.json.tmp')
+        with open(temp_path, 'w') as file:
+            json.dump({'cameras': self.cameras, 'zones': self.zones,
+                       'classes': {str(cls): name for cls, name in self.class_names.items()}}, file)
+        os.replace(temp_path, os.path.join(self.path, 'meta.json'))
+
+    def _register(self, names: List[str], name: str) -> int:
+        if name not in names:
+            names.append(name)
+            self._save_meta()
+        return names.index(name)
+
+    def set_class_names(self, names: Dict[int, str]):
+        """
+        Records the model's class names so queries can name classes (e.g. 'person').
+        """
+        with self._lock:
+            if self.class_names != dict(names):
+                self.class_names = dict(names)
+                self._save_meta()
+
+    def append(self, timestamp: float, camera_id: str, detections: np.ndarray,
+               zone_ids: Optional[np.ndarray] = None, zone_names: Sequence[str] = ()):
+        """
+        Stores one frame's detections.
+        :param timestamp: Capture time of the frame (seconds since the epoch).
+        :param detections: DETECTION_DTYPE array, or TRACK_DTYPE to store the track IDs.
+        :param zone_ids: Zone index of each detection into `zone_names`, -1 outside any zone.
+        :param zone_names: Names of the camera's zones.
+        """
+        if len(detections) == 0:
+            return
+        with self._lock:
+            events = np.empty(len(detections), dtype=EVENT_DTYPE)
+            timestamp = max(timestamp, self._last_timestamp)
+            self._last_timestamp = timestamp
+            events['timestamp'] = timestamp
+            events['camera'] = self._register(self.cameras, camera_id)
+            events['class_id'] = detections['class_id']
+            if zone_ids is None:
+                events['zone'] = -1
+            else:
+                # Camera zone index -> store zone index; -1 maps to the trailing -1
+                lookup = np.array([self._register(self.zones, name) for name in zone_names] + [-1], dtype=np.int16)
+                events['zone'] = lookup[zone_ids]
+            events['track_id'] = detections['track_id'] if 'track_id' in detections.dtype.names else -1
+            events['confidence'] = detections['confidence']
+            for field in ('x1', 'y1', 'x2', 'y2'):
+                events[field] = detections[field]
+
+            while len(events):
+                segment = self.active
+                if segment is None or segment.count == segment.capacity or \
+                        (self.segment_seconds and timestamp - segment.first_timestamp >= self.segment_seconds):
+                    segment = self._rotate()
+                events = events[segment.append(events):]
+
+    def _rotate(self) -> _Segment:
+        if self.active is not None:
+            self.active.seal()
+        path = os.path.join(self.path, f"events-{self._next_segment:06d}.npy")
+        self._next_segment += 1
+        segment = _Segment.create(path, self.segment_records, self.index_stride)
+        self.segments.append(segment)
+        if self.retention_seconds:
+            self._expire(self._last_timestamp - self.retention_seconds)
+        return segment
+
+    def _expire(self, cutoff: float):
+        for segment in [segment for segment in self.segments if segment.rollup is not None]:
+            if segment.last_timestamp < cutoff:
+                self.segments.remove(segment)
+                del segment.data
+                os.remove(segment.path)
+                os.remove(segment.rollup_path)
+
+    def _filters(self, camera: Optional[str], class_id: Union[int, str, None], zone: Optional[str]):
+        """
+        Translates query filters to stored integers.
+        :return: Dict of field -> value, or None if a name is unknown (nothing can match).
+        """
+        filters = {}
+        if camera is not None:
+            if camera not in self.cameras:
+                return None
+            filters['camera'] = self.cameras.index(camera)
+        if class_id is not None:
+            if isinstance(class_id, str):
+                matches = [cls for cls, name in self.class_names.items() if name.lower() == class_id.lower()]
+                if not matches:
+                    return None
+                class_id = matches[0]
+            filters['class_id'] = class_id
+        if zone is not None:
+            if zone not in self.zones:
+                return None
+            filters['zone'] = self.zones.index(zone)
+        return filters
+
+    @staticmethod
+    def _mask(rows: np.ndarray, filters: Dict[str, int]):
+        mask = np.ones(len(rows), dtype=bool)
+        for field, value in filters.items():
+            mask &= rows[field] == value
+        return mask
+
+    def events(self, start: float, end: float, camera: Optional[str] = None, class_id: Union[int, str, None] = None,
+               zone: Optional[str] = None) -> np.ndarray:
+        """
+        Returns the stored events in [start, end), optionally filtered.
+        :param class_id: Class ID or class name.
+        :return: EVENT_DTYPE array (a copy).
+        """
+        with self._lock:
+            filters = self._filters(camera, class_id, zone)
+            if filters is None:
+                return np.empty(0, dtype=EVENT_DTYPE)
+            parts = []
+            for segment in self.segments:
+                if segment.first_timestamp >= end or segment.last_timestamp < start:
+                    continue
+                first, stop = segment.locate(start, end)
+                rows = segment.data[first:stop]
+                parts.append(rows[self._mask(rows, filters)])
+            return np.concatenate(parts) if parts else np.empty(0, dtype=EVENT_DTYPE)
+
+    def count(self, start: float, end: float, camera: Optional[str] = None, class_id: Union[int, str, None] = None,
+              zone: Optional[str] = None) -> int:
+        """
+        Counts the events in [start, end), e.g. count(t1, t2, camera='camera_1', class_id='person').
+        A detection is counted once per analysed frame it appears in.
+        :param class_id: Class ID or class name.
+        """
+        with self._lock:
+            filters = self._filters(camera, class_id, zone)
+            if filters is None:
+                return 0
+            total = 0
+            first_minute, end_minute = math.ceil(start / 60), math.floor(end / 60)
+            for segment in self.segments:
+                if segment.first_timestamp >= end or segment.last_timestamp < start:
+                    continue
+                ranges = [(start, end)]
+                if segment.rollup is not None and first_minute < end_minute:
+                    rollup = segment.rollup
+                    low, high = np.searchsorted(rollup['minute'], [first_minute, end_minute])
+                    rows = rollup[low:high]
+                    total += int(rows['count'][self._mask(rows, filters)].sum())
+                    ranges = [(start, first_minute * 60), (end_minute * 60, end)]
+                for range_start, range_end in ranges:
+                    if range_start < range_end:
+                        first, stop = segment.locate(range_start, range_end)
+                        total += int(np.count_nonzero(self._mask(segment.data[first:stop], filters)))
+            return total
+
+    def __len__(self) -> int:
+        return sum(segment.count for segment in self.segments)
+
+    def flush(self):
+        with self._lock:
+            if self.active is not None:
+                self.active.data.flush()
+
+    def close(self):
+        """
+        Writes back the active segment. It stays active (preallocated) for the next run.
+        """
+        with self._lock:
+            for segment in self.segments:
+                segment.close()
+        print(f"Event store: {len(self)} events in {len(self.segments)} segments at {self.path}")
@@ -0,0 +1,74 @@
+import threading
+import numpy as np
+from typing import List, Tuple
+
+
+class FramePool:
+    """
+    Pool of preallocated frame buffers reused across iterations instead of allocating a
+    new full-resolution array for every captured frame.
+
+    Buffers are reference counted: acquire() hands out a slot with one reference, every
+    additional holder calls retain(), and the slot returns to the pool when the last holder
+    calls release(). If all slots are in use the pool grows by one buffer (counted in
+    `allocations`) rather than blocking the capture thread.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], size: int = 4, dtype=np.uint8):
+        """
+        :param shape: Shape of each buffer, e.g. (720, 1280, 3).
+        :param size: Number of buffers allocated up front.
+        :param dtype: Buffer dtype (default is uint8).
+        """
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self._buffers: List[np.ndarray] = [np.empty(self.shape, dtype=dtype) for _ in range(size)]
+        self._refs: List[int] = [0] * size
+        self._free: List[int] = list(range(size))
+        self._lock = threading.Lock()
+        self.allocations = size
+
+    def acquire(self) -> int:
+        """
+        Takes a free buffer out of the pool.
+        :return: Slot number of the buffer, holding one reference.
+        """
+        with self._lock:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self._buffers)
+                self._buffers.append(np.empty(self.shape, dtype=self.dtype))
+                self._refs.append(0)
+                self.allocations += 1
+            self._refs[slot] = 1
+            return slot
+
+    def buffer(self, slot: int) -> np.ndarray:
+        """
+        :return: The array backing a slot.
+        """
+        return self._buffers[slot]
+
+    def retain(self, slot: int):
+        """
+        Adds a reference to a slot that is already in use.
+        """
+        with self._lock:
+            self._refs[slot] += 1
+
+    def release(self, slot: int):
+        """
+        Drops a reference; the buffer returns to the pool when no references are left.
+        """
+        with self._lock:
+            self._refs[slot] -= 1
+            if self._refs[slot] == 0:
+                self._free.append(slot)
+
+    def in_use(self) -> int:
+        """
+        :return: Number of buffers currently handed out.
+        """
+        with self._lock:
+            return len(self._buffers) - len(self._free)
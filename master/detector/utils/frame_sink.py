@@ -0,0 +1,119 @@
+import os
+import threading
+import cv2
+import numpy as np
+from typing import Optional
+
+
+class VideoFileSink:
+    """
+    Writes annotated frames to a video file, for headless nodes where nobody watches a window.
+
+    The writer is opened on the first frame so the video always has the frame's size.
+    """
+
+    def __init__(self, path: str, fps: float = 15.0, fourcc: Optional[str] = None, verbose: bool = True):
+        """
+        :param path: Output file; the codec is picked from the extension unless `fourcc` is given.
+        :param fps: Frame rate stored in the file.
+        :param fourcc: Four-character codec code, e.g. 'mp4v' or 'MJPG'.
+        :param verbose: Print the path when the file is opened.
+        """
+        self.path = path
+        self.fps = fps
+        self.verbose = verbose
+        if fourcc is None:
+            fourcc = 'MJPG' if os.path.splitext(path)[1].lower() == '.avi' else 'mp4v'
+        self.fourcc = fourcc
+        self.writer: Optional[cv2.VideoWriter] = None
+        self.frames_written = 0
+
+    @staticmethod
+    def path_for(path: str, camera_id: str) -> str:
+        """
+        Derives a per-camera output path, e.g. out.mp4 -> out_camera_2.mp4.
+        """
+        root, ext = os.path.splitext(path)
+        return f"{root}_{camera_id}{ext}"
+
+    def write(self, frame: np.ndarray):
+        if self.writer is None:
+            height, width = frame.shape[:2]
+            self.writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (width, height))
+            if not self.writer.isOpened():
+                raise RuntimeError(f"Could not open video writer for {self.path}")
+            if self.verbose:
+                print(f"Writing annotated frames to {self.path}")
+        self.writer.write(frame)
+        self.frames_written += 1
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+
+class FrameSlot:
+    """
+    Single-slot mailbox handing the newest annotated frame from the detection loop to a GUI
+    thread, e.g. a Tk viewer polling it with after().
+
+    publish() scales the frame to fit the display size straight into a buffer owned by the slot
+    and replaces any frame the GUI has not taken yet, so a slow display drops frames instead of
+    queueing them. Three buffers rotate between the loop, the slot and the GUI, so neither side
+    allocates per frame nor overwrites a frame the other is still using.
+    """
+
+    def __init__(self, width: int, height: int):
+        """
+        :param width: Display width; frames are scaled down (or up) to fit, keeping their aspect ratio.
+        :param height: Display height.
+        """
+        self.width = width
+        self.height = height
+        self.scale = 1.0  # Display pixels per frame pixel of the last published frame
+        self._lock = threading.Lock()
+        self._buffers = []
+        self._ready: Optional[np.ndarray] = None  # Published, not taken yet
+        self._displayed: Optional[np.ndarray] = None  # Last taken, may still be read by the GUI
+        self.published = 0
+        self.dropped = 0
+
+    def _display_size(self, frame: np.ndarray):
+        height, width = frame.shape[:2]
+        scale = min(self.width / width, self.height / height)
+        return scale, (max(1, round(width * scale)), max(1, round(height * scale)))
+
+    def publish(self, frame: np.ndarray):
+        """
+        Scales a BGR frame to the display size and makes it the newest frame. Called from the
+        detection loop (a single publisher thread).
+        """
+        scale, size = self._display_size(frame)
+        shape = (size[1], size[0]) + frame.shape[2:]
+        with self._lock:
+            if not self._buffers or self._buffers[0].shape != shape:
+                self._buffers = [np.empty(shape, dtype=frame.dtype) for _ in range(3)]
+                self._ready = self._displayed = None
+            target = next(buffer for buffer in self._buffers
+                          if buffer is not self._ready and buffer is not self._displayed)
+        # Only the publisher touches `target` until it is handed over below
+        cv2.resize(frame, size, dst=target, interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+        with self._lock:
+            if self._ready is not None:
+                self.dropped += 1
+            self._ready = target
+            self.scale = scale
+            self.published += 1
+
+    def take(self) -> Optional[np.ndarray]:
+        """
+        Returns the newest frame (BGR, display size) once, or None if nothing was published since the
+        last call. The array stays unchanged until the next call. Called from the GUI thread.
+        """
+        with self._lock:
+            frame = self._ready
+            if frame is not None:
+                self._displayed = frame
+                self._ready = None
+            return frame
@@ -1,34 +1,100 @@
-import geocoder
+import threading
+import time
 from typing import Optional, Tuple
 
 class Geocoder:
-    def __init__(self, update_interval: int = 60):
+    def __init__(self, update_interval: int = 60, failure_ttl: int = 30,
+                 static_location: Optional[Tuple[float, float]] = None):
         """
         Initializes the Geocoder with the specified update interval for location checks.
+
+        Lookups run on a background thread; get_location() only reads the cached value, so it
+        is safe to call from the per-frame hot path. A stale value keeps being served while a
+        refresh is in progress (stale-while-revalidate).
         :param update_interval: Interval (in seconds) between location updates (default is 60 seconds).
+        :param failure_ttl: Seconds to wait before retrying after a failed lookup (default is 30 seconds).
+        :param static_location: Fixed (latitude, longitude); disables IP lookups entirely.
         """
         self.update_interval = update_interval
-        self.last_location: Optional[Tuple[float, float]] = None
+        self.failure_ttl = failure_ttl
+        self.static_location = static_location
+        self.last_location: Optional[Tuple[float, float]] = static_location
         self.last_update_time: float = 0
+        self.last_failure_time: float = 0
 
-    def get_location(self) -> Optional[Tuple[float, float]]:
+        self._refresh_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Starts the background refresh thread (no-op with a static location).
+        """
+        with self._lock:
+            if self.static_location is not None or self._thread is not None:
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._refresh_loop, name="geocoder-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background refresh thread.
+        """
+        self._stop_event.set()
+        self._refresh_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _refresh_due(self, current_time: float) -> bool:
+        if self.last_failure_time and current_time - self.last_failure_time < self.failure_ttl:
+            return False  # Negative cache: don't hammer the lookup service after a failure
+        return self.last_location is None or not self.is_location_fresh(current_time)
+
+    def _refresh_loop(self):
+        while not self._stop_event.is_set():
+            if self._refresh_due(time.time()):
+                self.refresh()
+            self._refresh_event.wait(timeout=min(self.update_interval, self.failure_ttl))
+            self._refresh_event.clear()
+
+    def refresh(self) -> Optional[Tuple[float, float]]:
         """
-        Retrieves the current location based on IP address.
+        Retrieves the current location based on IP address (blocking network call).
         :return: A tuple containing (latitude, longitude) if successful, else None.
         """
         try:
+            # Imported here: only needed without a static location, and slow to import
+            import geocoder
             g = geocoder.ip('me')
             if g.ok:
                 # If geocoding is successful, store and return location
                 self.last_location = (g.lat, g.lng)
-                self.last_update_time = g.timestamp
+                self.last_update_time = time.time()
+                self.last_failure_time = 0
                 return self.last_location
             else:
                 print("Failed to retrieve location.")
-                return None
         except Exception as e:
             print(f"Error getting location: {str(e)}")
-            return None
+        self.last_failure_time = time.time()
+        return None
+
+    def get_location(self) -> Optional[Tuple[float, float]]:
+        """
+        Returns the cached location without blocking. If the value is stale, a background
+        refresh is requested and the stale value is returned meanwhile.
+        :return: A tuple containing (latitude, longitude), or None if no location is known yet.
+        """
+        if self.static_location is not None:
+            return self.static_location
+        if self._thread is None:
+            self.start()
+        elif self._refresh_due(time.time()):
+            self._refresh_event.set()
+        return self.last_location
 
     def is_location_fresh(self, current_time: float) -> bool:
         """
@@ -40,7 +106,7 @@ class Geocoder:
 
     def get_cached_location(self, current_time: float) -> Optional[Tuple[float, float]]:
         """
-        Returns the cached location if it's fresh, otherwise retrieves a new one.
+        Returns the cached location if it's fresh, otherwise the last known one while a refresh is requested.
         :param current_time: Current time in seconds (e.g., using `time.time()`).
         :return: A tuple containing (latitude, longitude), or None if no valid location.
         """
@@ -48,4 +114,3 @@ class Geocoder:
             return self.last_location
         else:
             return self.get_location()
-
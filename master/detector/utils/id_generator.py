@@ -1,19 +1,79 @@
-import random
-import string
+import os
+import threading
+import time
+
+# Crockford's base32 (no I, L, O, U), in ASCII order so that IDs sort like the values they encode
+_ENCODING = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+_DECODING = {char: value for value, char in enumerate(_ENCODING)}
+_PAIRS = [a + b for a in _ENCODING for b in _ENCODING]  # Two characters per 10 bits
+
+ID_LENGTH = 26  # 48-bit millisecond timestamp + 80 random bits, 5 bits per character
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+# Shared by every IDGenerator of the process, so IDs stay ordered across cameras
+_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+_prefix = ''  # Encoded _last_ms
+
+
+def _encode_pairs(value: int, pairs: int) -> str:
+    return ''.join(_PAIRS[(value >> shift) & 1023] for shift in range(10 * (pairs - 1), -1, -10))
+
+
+def _reset_after_fork():
+    # A child process would otherwise continue the parent's random sequence and repeat its IDs
+    global _lock, _last_ms, _last_random, _prefix
+    _lock = threading.Lock()
+    _last_ms = _last_random = 0
+    _prefix = ''
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
 
 class IDGenerator:
-    def __init__(self, length: int = 16):
+    """
+    Generates notification IDs that sort by creation time (ULIDs: a millisecond timestamp
+    followed by 80 random bits, as 26 characters of Crockford's base32).
+
+    IDs are strictly increasing within a process: IDs created in the same millisecond (or
+    while the wall clock steps back) increment the random part of the previous one instead of
+    drawing a new one. Between processes and hosts, the random part makes collisions
+    negligible. The backend can index notifications by ID in time order, and since an ID is
+    generated once per notification and kept through retries and outbox replays, it doubles
+    as the idempotency key of the delivery.
+    """
+
+    def generate_unique_id(self) -> str:
         """
-        Initializes the ID generator with the specified ID length.
-        :param length: Length of the generated unique ID (default is 16 characters).
+        Generates the next ID.
+        :return: A 26-character string, greater than every ID generated before in this process.
         """
-        self.length = length
+        global _last_ms, _last_random, _prefix
+        now = time.time_ns() // 1_000_000
+        with _lock:
+            if now > _last_ms:
+                _last_ms, _last_random = now, int.from_bytes(os.urandom(10), 'big')
+                _prefix = _encode_pairs(now, 5)
+            elif _last_random < _RANDOM_MAX:
+                _last_random += 1
+            else:  # Random part exhausted within the millisecond: borrow the next one
+                _last_ms, _last_random = _last_ms + 1, int.from_bytes(os.urandom(10), 'big')
+                _prefix = _encode_pairs(_last_ms, 5)
+            prefix, r = _prefix, _last_random
+        # Unrolled _encode_pairs(r, 8): base64.b32encode() is several times slower than the lookups
+        return (prefix + _PAIRS[r >> 70] + _PAIRS[r >> 60 & 1023] + _PAIRS[r >> 50 & 1023] + _PAIRS[r >> 40 & 1023]
+                + _PAIRS[r >> 30 & 1023] + _PAIRS[r >> 20 & 1023] + _PAIRS[r >> 10 & 1023] + _PAIRS[r & 1023])
 
-    def generate_unique_id(self) -> str:
+    @staticmethod
+    def timestamp_of(unique_id: str) -> float:
         """
-        Generates a unique ID consisting of random alphanumeric characters.
-        :return: A string representing the unique ID.
+        :return: Creation time of an ID as seconds since the epoch.
         """
-        characters = string.ascii_letters + string.digits  # Alphanumeric characters (uppercase, lowercase, digits)
-        unique_id = ''.join(random.choice(characters) for _ in range(self.length))
-        return unique_id
+        value = 0
+        for char in unique_id[:10].upper():
+            value = (value << 5) | _DECODING[char]
+        return value / 1000.0
@@ -0,0 +1,26 @@
+import importlib
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    Builds the module-level __getattr__ and __dir__ of a package whose public names are
+    imported on first access (PEP 562), so `import detector.api.models` does not pull in
+    OpenCV, the HTTP stack or the model runtime through the package __init__ files.
+    :param package: The package's __name__.
+    :param exports: Maps each public name to the module that defines it.
+    :return: The (__getattr__, __dir__) pair to assign in the package.
+    """
+    def __getattr__(name: str):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module '{package}' has no attribute '{name}'")
+        value = getattr(importlib.import_module(module), name)
+        # Cache on the package so later lookups skip __getattr__
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(importlib.import_module(package))) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,262 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from detector.utils.frame_sink import VideoFileSink
+
+
+class PreRollBuffer:
+    """
+    Bounded history of recent frames for alert clips.
+
+    Frames are stored scaled down to `width` and at most `fps` per second, and the oldest ones
+    are evicted once the buffer spans more than `seconds` or holds more than `max_bytes`.
+    Stored frames are never written to again, so clips still being collected or encoded can
+    keep references to them after they have left the buffer.
+    """
+
+    def __init__(self, seconds: float = 3.0, max_bytes: int = 64 << 20, fps: float = 10.0, width: int = 640):
+        """
+        :param seconds: History kept before the newest frame.
+        :param max_bytes: Memory cap for the stored frames.
+        :param fps: Maximum stored frames per second (0 stores every frame).
+        :param width: Stored frame width (frames narrower than this are copied as they are).
+        """
+        self.seconds = seconds
+        self.max_bytes = max_bytes
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.width = width
+        self._frames: Deque[Tuple[float, np.ndarray]] = deque()
+        self.nbytes = 0
+        self._last_timestamp = -float('inf')
+
+    def add(self, frame: np.ndarray, timestamp: float) -> Optional[np.ndarray]:
+        """
+        Stores a scaled copy of the frame, unless one was stored less than 1 / fps ago.
+        :return: The stored frame, or None if the frame was skipped.
+        """
+        if timestamp - self._last_timestamp < self.interval * 0.9:  # Tolerates capture jitter
+            return None
+        self._last_timestamp = timestamp
+        height, width = frame.shape[:2]
+        if width > self.width:
+            stored = cv2.resize(frame, (self.width, max(1, round(height * self.width / width))),
+                                interpolation=cv2.INTER_AREA)
+        else:
+            stored = frame.copy()
+        self._frames.append((timestamp, stored))
+        self.nbytes += stored.nbytes
+        while self._frames and (self.nbytes > self.max_bytes or timestamp - self._frames[0][0] > self.seconds):
+            self.nbytes -= self._frames.popleft()[1].nbytes
+        return stored
+
+    def frames(self) -> List[Tuple[float, np.ndarray]]:
+        """
+        :return: (timestamp, frame) pairs, oldest first.
+        """
+        return list(self._frames)
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+
+class _ClipJob:
+    __slots__ = ('path', 'frames', 'end', 'nbytes')
+
+    def __init__(self, path: str, frames: List[Tuple[float, np.ndarray]], end: float):
+        self.path = path
+        self.frames = frames
+        self.end = end  # Timestamp the post-roll runs to
+        self.nbytes = sum(frame.nbytes for _, frame in frames)
+
+
+class MediaRecorder:
+    """
+    Saves a JPEG snapshot and a short pre/post-roll clip for alerts, off the detection loop.
+
+    The loop feeds every frame to add_frame(), which keeps the PreRollBuffer and extends the
+    clips still collecting their post-roll. capture() copies the alert frame and returns the
+    paths the files will be written to, so they can go into the notification right away; the
+    snapshot is encoded by a worker thread immediately and the clip once its post-roll is
+    complete. At most `max_pending` alerts are collected or encoded at a time: further alerts
+    get no media (counted in `dropped`) instead of growing memory or slowing down capture.
+    """
+
+    def __init__(self, directory: str = 'media', pre_roll: float = 3.0, post_roll: float = 3.0,
+                 clip_fps: float = 10.0, clip_width: int = 640, max_buffer_bytes: int = 64 << 20,
+                 workers: int = 1, max_pending: int = 8, jpeg_quality: int = 85, clip_format: str = 'mp4'):
+        """
+        :param directory: Where snapshots and clips are written (created if missing).
+        :param pre_roll: Seconds of clip before the alert.
+        :param post_roll: Seconds of clip after the alert.
+        :param clip_fps: Clip frame rate (frames are sampled from the detection loop at most this often).
+        :param clip_width: Clip frame width; snapshots keep the full resolution.
+        :param max_buffer_bytes: Memory cap of the pre-roll buffer and of each clip.
+        :param workers: Encoder threads.
+        :param max_pending: Alerts collected or encoded at the same time before new ones are dropped.
+        :param jpeg_quality: Snapshot JPEG quality (0-100).
+        :param clip_format: Clip container, 'mp4' (mp4v) or 'avi' (MJPG).
+        """
+        self.directory = directory
+        self.post_roll = post_roll
+        self.clip_fps = clip_fps
+        self.max_buffer_bytes = max_buffer_bytes
+        self.workers = workers
+        self.max_pending = max_pending
+        self.jpeg_quality = jpeg_quality
+        self.clip_format = clip_format
+        self.buffer = PreRollBuffer(pre_roll, max_buffer_bytes, clip_fps, clip_width)
+        os.makedirs(directory, exist_ok=True)
+
+        self._collecting: List[_ClipJob] = []  # Only touched by the detection loop
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._pending = 0  # Alerts whose clip is collecting, queued or encoding
+
+        # Statistics
+        self.captured = 0
+        self.dropped = 0
+        self.snapshots_written = 0
+        self.clips_written = 0
+        self.failed = 0
+
+    def start(self):
+        """
+        Starts the encoder threads.
+        """
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"media-encoder-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def add_frame(self, frame: np.ndarray, timestamp: float):
+        """
+        Feeds a frame of the detection loop to the pre-roll buffer and to the clips collecting their post-roll.
+        """
+        stored = self.buffer.add(frame, timestamp)
+        if stored is None or not self._collecting:
+            return
+        collecting = []
+        for job in self._collecting:
+            full = job.nbytes + stored.nbytes > self.max_buffer_bytes
+            if timestamp <= job.end and not full:
+                job.frames.append((timestamp, stored))
+                job.nbytes += stored.nbytes
+            if timestamp >= job.end or full:
+                self._queue.put(('clip', job.path, job.frames))
+            else:
+                collecting.append(job)
+        self._collecting = collecting
+
+    def capture(self, frame: np.ndarray, timestamp: float, camera_id: str,
+                boxes: Sequence[Sequence[int]] = ()) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Schedules the snapshot and clip of an alert.
+        :param frame: Full-resolution frame of the alert; it is copied.
+        :param boxes: (x1, y1, x2, y2) boxes drawn on the snapshot.
+        :return: (snapshot path, clip path) the files will be written to, or (None, None) if the
+                 alert was dropped because `max_pending` alerts are still in progress.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return None, None
+            self._pending += 1
+            self.captured += 1
+        base = os.path.join(self.directory, f"{camera_id}_{time.strftime('%Y%m%d-%H%M%S', time.localtime(timestamp))}"
+                                            f"-{int(timestamp * 1000) % 1000:03d}")
+        snapshot_path, clip_path = base + '.jpg', f"{base}.{self.clip_format}"
+        self._queue.put(('snapshot', snapshot_path, (frame.copy(), [tuple(box) for box in boxes])))
+        self._collecting.append(_ClipJob(clip_path, [(ts, stored) for ts, stored in self.buffer.frames()
+                                                     if ts <= timestamp], timestamp + self.post_roll))
+        return snapshot_path, clip_path
+
+    def pending(self) -> int:
+        """
+        :return: Alerts whose clip is still being collected or encoded.
+        """
+        with self._lock:
+            return self._pending
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            kind, path, data = job
+            try:
+                if kind == 'snapshot':
+                    self._write_snapshot(path, *data)
+                else:
+                    self._write_clip(path, data)
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                print(f"Error writing {path}: {str(e)}")
+            finally:
+                if kind == 'clip':
+                    with self._lock:
+                        self._pending -= 1
+
+    def _write_snapshot(self, path: str, frame: np.ndarray, boxes):
+        for x1, y1, x2, y2 in boxes:
+            cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 0, 255), 2)
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            raise RuntimeError("JPEG encoding failed")
+        _write_atomic(path, encoded.tobytes())
+        with self._lock:
+            self.snapshots_written += 1
+
+    def _write_clip(self, path: str, frames: List[Tuple[float, np.ndarray]]):
+        if not frames:
+            return
+        # Frames are sampled from the loop, so the clip plays at their measured rate
+        duration = frames[-1][0] - frames[0][0]
+        fps = (len(frames) - 1) / duration if duration > 0 else self.clip_fps
+        root, ext = os.path.splitext(path)
+        temp_path = f"{root}.part{ext}"
+        sink = VideoFileSink(temp_path, fps=fps, verbose=False)
+        try:
+            for _, frame in frames:
+                sink.write(frame)
+        finally:
+            sink.close()
+        os.replace(temp_path, path)
+        with self._lock:
+            self.clips_written += 1
+
+    def stats(self):
+        with self._lock:
+            return {'captured': self.captured, 'dropped': self.dropped, 'pending': self._pending,
+                    'snapshots': self.snapshots_written, 'clips': self.clips_written, 'failed': self.failed,
+                    'buffer_bytes': self.buffer.nbytes}
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Closes the clips still collecting (with the post-roll recorded so far), waits for the
+        encoders to finish (bounded by `timeout`) and stops them.
+        """
+        for job in self._collecting:
+            self._queue.put(('clip', job.path, job.frames))
+        self._collecting = []
+        for _ in self._threads:
+            self._queue.put(None)
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(timeout=max(0.1, deadline - time.monotonic()))
+        self._threads = []
+
+
+def _write_atomic(path: str, data: bytes):
+    temp_path = path + '.part'
+    with open(temp_path, 'wb') as file:
+        file.write(data)
+    os.replace(temp_path, path)
@@ -0,0 +1,352 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond stages up to slow network calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def set_total(self, value: float):
+        """
+        Copies a running total counted elsewhere, for counters refreshed by a collector.
+        """
+        self.value = value
+
+
+class _GaugeChild:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ('upper_bounds', 'counts', 'sum', '_lock')
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)  # Last bucket is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class _Metric(ABC):
+    TYPE = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _new_child(self):
+        """
+        :return: A new time series of this metric type.
+        """
+
+    def labels(self, *values):
+        """
+        Returns the time series for a set of label values. Keep the result around on hot paths
+        instead of looking it up for every observation.
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """
+        :return: The exposition lines of every time series.
+        """
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        lines.extend(self._samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    TYPE = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+                for key, child in list(self._children.items())]
+
+
+class Gauge(_Metric):
+    TYPE = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+                for key, child in list(self._children.items())]
+
+
+class Histogram(_Metric):
+    TYPE = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def _samples(self):
+        samples = []
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.upper_bounds + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                samples.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            samples.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            samples.append(f"{self.name}_count{labels} {cumulative}")
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered in the Prometheus text exposition format.
+
+    Values that already live elsewhere (queue depth, capture counters) are not pushed on the hot
+    path; collectors registered with add_collector() copy them into gauges and counters at
+    scrape time.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        """
+        Registers a function called before every scrape to refresh gauges and counters.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            collectors, metrics = list(self._collectors), list(self._metrics)
+        for collector in collectors:
+            try:
+                collector()
+            except Exception as e:
+                print(f"Error collecting metrics: {str(e)}")
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+class MetricsServer:
+    """
+    Minimal HTTP endpoint serving a registry at /metrics from a daemon thread.
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = '0.0.0.0', port: int = 9108):
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True)
+            self._thread.start()
+            print(f"Serving metrics on port {self.port} (/metrics)")
+
+    def stop(self):
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.httpd.server_close()
+
+
+class PipelineMetrics:
+    """
+    The detector's metrics: stage latencies, frame rates, inference skips, notification delivery
+    and capture-to-notification latency.
+
+    Components take an optional PipelineMetrics and skip all instrumentation when it is None,
+    so disabled metrics cost nothing.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        self.stage_seconds = r.histogram('detector_stage_seconds', "Time spent per pipeline stage",
+                                         ['camera', 'stage'])
+        self.frames_processed = r.counter('detector_frames_processed_total', "Frames run through detection",
+                                          ['camera'])
+        self.inference_skipped = r.counter('detector_inference_skipped_total',
+                                           "Frames for which the model was not run", ['camera', 'reason'])
+        self.frames_captured = r.counter('detector_frames_captured_total', "Frames read from the source",
+                                         ['camera'])
+        self.frames_dropped = r.counter('detector_frames_dropped_total', "Captured frames never processed",
+                                        ['camera'])
+        self.capture_fps = r.gauge('detector_capture_fps', "Capture rate since the previous scrape", ['camera'])
+        self.processed_fps = r.gauge('detector_processed_fps', "Processing rate since the previous scrape",
+                                     ['camera'])
+        self.skip_ratio = r.gauge('detector_inference_skip_ratio', "Fraction of frames skipped by the motion gate",
+                                  ['camera'])
+        self.qos_level = r.gauge('detector_qos_level', "Current QoS quality level (0 is full quality)", ['camera'])
+        self.queue_depth = r.gauge('detector_notification_queue_depth', "Notifications waiting to be sent",
+                                   ['camera'])
+        self.notifications = r.counter('detector_notifications_total', "Notification counts by outcome",
+                                       ['camera', 'outcome'])
+        self.send_seconds = r.histogram('detector_notification_send_seconds', "Duration of notification POSTs",
+                                        ['outcome'])
+        self.send_failures = r.counter('detector_notification_send_failures_total', "Failed notification POSTs",
+                                       ['reason'])
+        self.capture_to_notification_seconds = r.histogram(
+            'detector_capture_to_notification_seconds', "Time from frame capture to notification delivered")
+        self.server: Optional[MetricsServer] = None
+
+    def stage(self, name: str, camera_id: str) -> _HistogramChild:
+        """
+        :return: The latency histogram of a pipeline stage of a camera.
+        """
+        return self.stage_seconds.labels(camera_id, name)
+
+    def watch_detector(self, detector):
+        """
+        Publishes the camera, motion gate and notification counters of a YOLONDetector at scrape time.
+        """
+        camera_id = detector.camera_id
+        captured, dropped = self.frames_captured.labels(camera_id), self.frames_dropped.labels(camera_id)
+        capture_fps, processed_fps = self.capture_fps.labels(camera_id), self.processed_fps.labels(camera_id)
+        processed = self.frames_processed.labels(camera_id)
+        skip_ratio = self.skip_ratio.labels(camera_id)
+        last = {'time': time.monotonic(), 'captured': 0, 'processed': 0.0}
+
+        def collect():
+            now = time.monotonic()
+            stats = detector.camera.capture_stats()
+            elapsed = now - last['time']
+            if elapsed > 0:
+                capture_fps.set((stats['captured'] - last['captured']) / elapsed)
+                processed_fps.set((processed.value - last['processed']) / elapsed)
+            last.update(time=now, captured=stats['captured'], processed=processed.value)
+            captured.set_total(stats['captured'])
+            dropped.set_total(stats['dropped'])
+            if detector.motion_gate is not None:
+                skip_ratio.set(detector.motion_gate.skip_ratio())
+
+        self.registry.add_collector(collect)
+
+    def watch_dispatcher(self, dispatcher, camera_id: str):
+        """
+        Publishes the queue depth and delivery counters of a NotificationDispatcher at scrape time.
+        """
+        queue_depth = self.queue_depth.labels(camera_id)
+        outcomes = ('submitted', 'sent', 'failed', 'dropped', 'retries')
+        counts = {outcome: self.notifications.labels(camera_id, outcome) for outcome in outcomes}
+
+        def collect():
+            stats = dispatcher.stats()
+            queue_depth.set(stats['queue_depth'])
+            for outcome, counter in counts.items():
+                counter.set_total(stats[outcome])
+
+        self.registry.add_collector(collect)
+
+    def serve(self, host: str = '0.0.0.0', port: int = 9108):
+        """
+        Starts the HTTP endpoint.
+        """
+        if self.server is None:
+            self.server = MetricsServer(self.registry, host, port)
+            self.server.start()
+
+    def close(self):
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
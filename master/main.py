@@ -1,7 +1,10 @@
+import argparse
 import cv2
 import logging
+import signal
 from detector.core.obj_detector import YOLONDetector
-from detector.config.settings import Settings
+from detector.core.multi_detector import MultiSourceDetector
+from detector.config.settings import Settings, parse_roi, parse_zones
 import platform
 
 # Set up logging
@@ -13,22 +16,66 @@ logging.basicConfig(
     ]
 )
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Real-time object detection")
+    parser.add_argument('--headless', action='store_true',
+                        help="Run without a window (same as HEADLESS=true)")
+    parser.add_argument('--roi', type=parse_roi, metavar='X,Y,W,H',
+                        help="Region of interest in frame pixels (same as ROI=x,y,w,h)")
+    parser.add_argument('--zones', type=parse_zones, metavar='JSON',
+                        help="Named polygon zones as JSON or a JSON file (same as ZONES)")
+    parser.add_argument('--output', metavar='PATH',
+                        help="Write annotated frames to this video file (same as OUTPUT_VIDEO)")
+    return parser.parse_args()
+
+def install_signal_handlers(detector):
+    """
+    Stops the detection loop cleanly on SIGINT/SIGTERM (e.g. Ctrl+C or `docker stop`).
+    """
+    def handle_signal(signum, frame):
+        logging.info(f"Received {signal.Signals(signum).name}, shutting down...")
+        detector.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
 def main():
+    args = parse_args()
     try:
         # Initialize the settings
         config = Settings()
+        if args.headless:
+            config.headless = True
+        if args.roi:
+            config.roi = args.roi
+        if args.zones:
+            config.zones = args.zones
+        if args.output:
+            config.output_video = args.output
         logging.info("Configuration loaded successfully.")
         
         # Print platform-specific info
         logging.info(f"Running on {platform.system()} system")
         
         # Initialize the detector with settings from the configuration
-        detector = YOLONDetector(
-            model_path=config.model_path,
-            api_url=config.api_url,
-            api_key=config.api_key
-        )
+        if len(config.sources) > 1 or config.inference_workers > 0:
+            # Several cameras share one model and one batched forward pass (or a pool of
+            # inference worker processes)
+            detector = MultiSourceDetector(
+                model_path=config.model_path,
+                api_url=config.api_url,
+                api_key=config.api_key,
+                settings=config
+            )
+        else:
+            detector = YOLONDetector(
+                model_path=config.model_path,
+                api_url=config.api_url,
+                api_key=config.api_key,
+                settings=config
+            )
         
+        install_signal_handlers(detector)
         logging.info("Starting the object detection loop...")
         
         # Run the detector (starts the camera feed and detection loop)
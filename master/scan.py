@@ -0,0 +1,61 @@
+import argparse
+import glob
+import logging
+from detector.config.settings import Settings, parse_roi
+from detector.core.batch_scan import ScanOptions, scan_videos
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler()
+    ]
+)
+
+def parse_args(config: Settings):
+    parser = argparse.ArgumentParser(description="Scan recorded videos for detections (offline, multi-process)")
+    parser.add_argument('videos', nargs='+', help="Video files or glob patterns")
+    parser.add_argument('-o', '--output', default='detections.jsonl',
+                        help="Output file, .jsonl or .csv (default is detections.jsonl)")
+    parser.add_argument('--format', choices=('jsonl', 'csv'), help="Output format (default: from the extension)")
+    parser.add_argument('-w', '--workers', type=int, default=2,
+                        help="Worker processes, each with its own model; 0 runs in-process (default is 2)")
+    parser.add_argument('--shard-frames', type=int, default=3000, help="Frames per shard (default is 3000)")
+    parser.add_argument('--frame-step', type=int, default=1, help="Analyse every Nth frame (default is 1)")
+    parser.add_argument('--batch-size', type=int, default=8, help="Frames per forward pass (default is 8)")
+    parser.add_argument('--roi', type=parse_roi, default=config.roi, metavar='X,Y,W,H',
+                        help="Region of interest (default is ROI from the environment, else the whole frame); "
+                             "zones from ZONES take precedence")
+    parser.add_argument('--model', default=config.model_path, help="Model weights (default is MODEL_PATH)")
+    return parser.parse_args()
+
+def main():
+    config = Settings()
+    args = parse_args(config)
+
+    videos = []
+    for pattern in args.videos:
+        videos.extend(sorted(glob.glob(pattern)) or [pattern])
+
+    options = ScanOptions(
+        model_path=args.model,
+        backend=config.model_backend,
+        int8=config.model_int8,
+        target_classes=tuple(config.target_classes),
+        confidence_threshold=config.confidence_threshold,
+        max_inference_size=config.max_inference_size,
+        roi=args.roi,
+        zones=tuple(config.zones),
+        frame_step=max(1, args.frame_step),
+        batch_size=max(1, args.batch_size)
+    )
+    logging.info(f"Scanning {len(videos)} video(s) with {args.workers} worker(s)...")
+    summary = scan_videos(videos, args.output, options, workers=args.workers,
+                          shard_frames=args.shard_frames, fmt=args.format)
+    logging.info(f"Scanned {summary['frames']} frames in {summary['shards']} shards: "
+                 f"{summary['detections']} detections in {summary['elapsed']:.1f} s "
+                 f"({summary['fps']:.1f} frames/s), written to {args.output}")
+
+if __name__ == "__main__":
+    main()
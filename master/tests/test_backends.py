@@ -0,0 +1,92 @@
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from detector.core.backends import decode_predictions, export_model, letterbox, load_backend, resolve_backend
+from detector.core.detections import result_to_array
+
+HAS_ONNXRUNTIME = all(importlib.util.find_spec(name) for name in ('onnx', 'onnxruntime'))
+
+
+class TestBackendHelpers(unittest.TestCase):
+
+    def test_resolve_backend(self):
+        self.assertEqual(resolve_backend('yolov8n.pt'), 'ultralytics')
+        self.assertEqual(resolve_backend('yolov8n.onnx'), 'onnxruntime')
+        self.assertEqual(resolve_backend('yolov8n_openvino_model/'), 'openvino')
+        self.assertEqual(resolve_backend('yolov8n.pt', 'openvino'), 'openvino')
+        with self.assertRaises(ValueError):
+            resolve_backend('yolov8n.pt', 'tensorrt')
+
+    def test_letterbox_pads_to_stride(self):
+        image = np.zeros((400, 600, 3), dtype=np.uint8)
+        padded, scale, (left, top) = letterbox(image, 608)
+        self.assertEqual(padded.shape, (416, 608, 3))
+        self.assertAlmostEqual(scale, 608 / 600)
+        self.assertEqual((left, top), (0, 5))
+        self.assertEqual(padded[0, 0, 0], 114)
+
+        square, _, _ = letterbox(image, 608, auto=False)
+        self.assertEqual(square.shape, (608, 608, 3))
+
+    def test_decode_predictions(self):
+        # Two overlapping boxes of class 1, one of class 0, and one anchor below the threshold
+        output = np.zeros((4 + 3, 4), dtype=np.float32)
+        output[:4, 0] = (50, 50, 20, 20)
+        output[:4, 1] = (52, 50, 20, 20)
+        output[:4, 2] = (200, 100, 40, 60)
+        output[:4, 3] = (300, 300, 10, 10)
+        output[5, 0], output[5, 1], output[4, 2], output[6, 3] = 0.9, 0.8, 0.7, 0.1
+
+        detections = decode_predictions(output, conf=0.25)
+        self.assertEqual(len(detections), 2)
+        np.testing.assert_allclose(detections[0], (40, 40, 60, 60, 0.9, 1), rtol=1e-6)
+        np.testing.assert_allclose(detections[1], (180, 70, 220, 130, 0.7, 0), rtol=1e-6)
+
+        self.assertEqual(len(decode_predictions(output, conf=0.25, classes=[0])), 1)
+        self.assertEqual(decode_predictions(output, conf=0.95).shape, (0, 6))
+
+
+@unittest.skipUnless(HAS_ONNXRUNTIME, "onnx and onnxruntime are not installed")
+class TestOnnxRuntimeParity(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from ultralytics import YOLO
+        cls.tmpdir = tempfile.mkdtemp()
+        # Random weights, saved once so both backends run the same model
+        cls.model_path = os.path.join(cls.tmpdir, 'model.pt')
+        YOLO('yolov8n.yaml').save(cls.model_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+
+    def test_matches_ultralytics(self):
+        image = np.random.default_rng(0).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+        reference = load_backend(self.model_path, 'ultralytics')
+        exported = load_backend(self.model_path, 'onnxruntime', threads=1)
+        self.assertEqual(exported.names, reference.names)
+
+        # Untrained weights only produce low-confidence boxes
+        expected = result_to_array(reference(image, imgsz=320, conf=1e-4)[0])
+        actual = result_to_array(exported([image], imgsz=320, conf=1e-4)[0])
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(len(actual), len(expected))
+        np.testing.assert_allclose(actual[:, :4], expected[:, :4], atol=1.0)
+        np.testing.assert_allclose(actual[:, 4], expected[:, 4], atol=1e-3)
+
+    def test_int8_quantizes_an_onnx_model(self):
+        onnx_path = export_model(self.model_path)
+        quantized_path = os.path.join(self.tmpdir, 'model-int8.onnx')
+        load_backend(onnx_path, 'onnxruntime', threads=1, int8=True)
+        self.assertTrue(os.path.exists(quantized_path))
+        self.assertLess(os.path.getsize(quantized_path), os.path.getsize(onnx_path))
+        load_backend(quantized_path, 'onnxruntime', threads=1, int8=True)  # Already quantized: loaded as is
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, 'model-int8-int8.onnx')))
+
+
+if __name__ == '__main__':
+    unittest.main()
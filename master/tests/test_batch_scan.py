@@ -0,0 +1,98 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import cv2
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+from detector.core.batch_scan import ScanOptions, plan_shards, scan_videos
+
+
+class FakeModel:
+    """
+    Reports one 'person' box per crop, at the crop's brightness as x offset.
+    """
+    names = {0: 'person', 1: 'car'}
+
+    def __init__(self, model_path):
+        self.imgsz = []
+
+    def __call__(self, crops, imgsz, classes, conf, verbose):
+        self.imgsz.append(imgsz)
+        return [Results(crop, 'fake', self.names,
+                        boxes=torch.tensor([[float(crop.mean()), 2.0, crop.mean() + 10.0, 20.0, 0.9, 0.0]]))
+                for crop in crops]
+
+
+def write_video(path, count):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+    for i in range(count):
+        writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+    writer.release()
+
+
+class TestBatchScan(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.videos = [os.path.join(self.tmpdir.name, name) for name in ('a.avi', 'b.avi')]
+        write_video(self.videos[0], 12)
+        write_video(self.videos[1], 5)
+        patcher = patch('ultralytics.YOLO', FakeModel)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_plan_shards(self):
+        shards = plan_shards(self.videos, shard_frames=5, frame_step=2)
+        self.assertEqual([(s.video_index, s.start, s.end) for s in shards],
+                         [(0, 0, 4), (0, 4, 8), (0, 8, 12), (1, 0, 4), (1, 4, 5)])
+        self.assertEqual(shards[0].fps, 10)
+
+    def test_results_do_not_depend_on_sharding(self):
+        options = ScanOptions(roi=(0, 0, 32, 32), frame_step=2, batch_size=3)
+        outputs = []
+        for shard_frames in (100, 4):
+            output = os.path.join(self.tmpdir.name, f"out_{shard_frames}.jsonl")
+            summary = scan_videos(self.videos, output, options, workers=0, shard_frames=shard_frames)
+            with open(output) as f:
+                outputs.append([json.loads(line) for line in f])
+            self.assertEqual(summary['frames'], 6 + 2)
+            self.assertEqual(summary['detections'], 8)
+
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual([(os.path.basename(r['video']), r['frame']) for r in outputs[0]],
+                         [('a.avi', 1), ('a.avi', 3), ('a.avi', 5), ('a.avi', 7), ('a.avi', 9), ('a.avi', 11),
+                          ('b.avi', 1), ('b.avi', 3)])
+        first = outputs[0][0]
+        self.assertEqual(first['object'], 'person')
+        self.assertEqual(first['time'], 0.1)
+        self.assertAlmostEqual(first['x1'], 8, delta=2)  # Frame 1 has brightness ~8
+
+    def test_csv_output(self):
+        output = os.path.join(self.tmpdir.name, "out.csv")
+        scan_videos(self.videos[1:], output, ScanOptions(roi=(16, 8, 32, 32)), workers=0)
+        with open(output, newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(int(rows[0]['y1']), 2 + 8)  # Moved to frame coordinates
+
+    def test_zones_crop_and_filter_like_the_live_path(self):
+        output = os.path.join(self.tmpdir.name, "out.jsonl")
+        zones = ({'name': 'left', 'points': ((0, 0), (40, 0), (40, 48), (0, 48)), 'min_confidence': None,
+                  'min_overlap': None},)
+        scan_videos(self.videos[:1], output, ScanOptions(roi=(0, 0, 64, 48), zones=zones), workers=0)
+        with open(output) as f:
+            records = [json.loads(line) for line in f]
+        # Boxes start at the frame brightness (8 per frame): only frames 0-4 stand inside the zone
+        self.assertEqual([r['frame'] for r in records], [0, 1, 2, 3, 4])
+        self.assertEqual({r['zone'] for r in records}, {'left'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+from detector.utils.camera import CapturedFrame, FrameRingBuffer
+from detector.utils.frame_pool import FramePool
+
+
+def make_frame(sequence):
+    return CapturedFrame(np.zeros((4, 4, 3), dtype=np.uint8), float(sequence), sequence)
+
+
+class TestFrameRingBuffer(unittest.TestCase):
+
+    def test_keep_latest_returns_newest_and_counts_drops(self):
+        buffer = FrameRingBuffer(capacity=4, policy='keep_latest')
+        self.assertEqual(buffer.capacity, 1)
+        for seq in range(5):
+            buffer.put(make_frame(seq))
+        self.assertEqual(buffer.get_latest().sequence, 4)
+
+        for seq in range(5, 8):
+            buffer.put(make_frame(seq))
+        self.assertEqual(buffer.get_latest().sequence, 7)
+        self.assertEqual(buffer.dropped, 2)  # Frames 5 and 6 were never seen by the consumer
+        self.assertIsNone(buffer.get_latest())  # Non-blocking when empty
+
+    def test_drop_oldest_keeps_fifo_order(self):
+        buffer = FrameRingBuffer(capacity=3, policy='drop_oldest')
+        for seq in range(5):
+            buffer.put(make_frame(seq))
+        self.assertEqual(buffer.lag(), 5)
+        self.assertEqual([buffer.get_next().sequence for _ in range(3)], [2, 3, 4])
+        self.assertEqual(buffer.consumed, 3)
+        self.assertEqual(buffer.lag(), 0)
+
+    def test_discarded_frames_return_to_pool(self):
+        pool = FramePool((4, 4, 3), size=2)
+        buffer = FrameRingBuffer(capacity=2, policy='keep_latest', on_discard=lambda item: pool.release(item.slot))
+        for seq in range(5):
+            slot = pool.acquire()
+            buffer.put(CapturedFrame(pool.buffer(slot), float(seq), seq, pool, slot))
+        self.assertEqual(pool.in_use(), 1)  # Only the frame still in the buffer
+        latest = buffer.get_latest()
+        pool.release(latest.slot)
+        self.assertEqual(pool.in_use(), 0)
+        self.assertEqual(pool.allocations, 2)
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            FrameRingBuffer(policy='drop_newest')
+
+
+class TestFramePool(unittest.TestCase):
+
+    def test_reference_counting_and_growth(self):
+        pool = FramePool((2, 2), size=1)
+        first = pool.acquire()
+        pool.retain(first)
+        second = pool.acquire()  # Pool exhausted: grows by one buffer
+        self.assertNotEqual(first, second)
+        self.assertEqual(pool.allocations, 2)
+
+        pool.release(first)
+        self.assertEqual(pool.in_use(), 2)  # Still retained once
+        pool.release(first)
+        pool.release(second)
+        self.assertEqual(pool.in_use(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+import detector
+from detector.core import backends
+
+HEAVY_MODULES = ('cv2', 'torch', 'ultralytics', 'requests')
+
+
+def modules_loaded_by(statement: str):
+    script = f"import sys\n{statement}\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    return [m for m in output.strip().split(',') if m]
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_light_modules_skip_heavy_dependencies(self):
+        self.assertEqual(modules_loaded_by("import detector"), [])
+        self.assertEqual(modules_loaded_by("from detector.utils.id_generator import IDGenerator"), [])
+        self.assertEqual(modules_loaded_by("from detector.config.settings import Settings"), [])
+        self.assertNotIn('torch', modules_loaded_by("import detector.core.obj_detector"))
+
+    def test_package_attributes_resolve_on_access(self):
+        from detector.utils.id_generator import IDGenerator
+        self.assertIs(detector.IDGenerator, IDGenerator)
+        self.assertIn('YOLONDetector', dir(detector))
+        with self.assertRaises(AttributeError):
+            detector.NotAnExport
+
+
+class FakeBackend(backends.InferenceBackend):
+    name = 'fake'
+    names = {0: 'person'}
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, images, imgsz=640, classes=None, conf=0.25, verbose=False):
+        self.calls.append((images.shape, imgsz))
+        return []
+
+
+class TestModelCache(unittest.TestCase):
+
+    def setUp(self):
+        backends.clear_model_cache()
+        self.addCleanup(backends.clear_model_cache)
+
+    @patch('detector.core.backends.load_backend', side_effect=lambda *args: FakeBackend())
+    def test_model_is_loaded_once_per_configuration(self, load_backend):
+        first = backends.get_model('model.pt', 'ultralytics')
+        self.assertIs(backends.get_model('model.pt', 'auto'), first)
+        self.assertIsNot(backends.get_model('model.pt', 'ultralytics', threads=2), first)
+        self.assertEqual(load_backend.call_count, 2)
+        self.assertEqual(first.names, {0: 'person'})
+
+    @patch('detector.core.backends.load_backend', side_effect=lambda *args: FakeBackend())
+    def test_warmup_runs_once_per_input_shape(self, _):
+        model = backends.get_model('model.pt')
+        model.warmup(320, (320, 180))
+        model.warmup(320, (320, 180))
+        model.warmup(640)
+        self.assertEqual(model.backend.calls, [((180, 320, 3), 320), ((640, 640, 3), 640)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+import numpy as np
+from detector.core.detections import DETECTION_DTYPE, class_ids_for, filter_detections
+
+
+class TestDetections(unittest.TestCase):
+
+    def test_class_ids_for(self):
+        names = {0: 'person', 1: 'bicycle', 2: 'car'}
+        self.assertEqual(class_ids_for(names, ['Person', 'car']).tolist(), [0, 2])
+
+    def test_filter_masks_and_offsets(self):
+        data = np.array([
+            [10.7, 20.2, 30.9, 40.0, 0.9, 0],   # person, kept
+            [11.0, 21.0, 31.0, 41.0, 0.4, 0],   # person below threshold
+            [12.0, 22.0, 32.0, 42.0, 0.95, 2],  # car
+            [5.0, 6.0, 7.0, 8.0, 0.5, 0],       # exactly at threshold, dropped
+        ], dtype=np.float32)
+        detections = filter_detections(data, np.array([0]), 0.5, offset=(100, 200))
+
+        self.assertEqual(detections.dtype, DETECTION_DTYPE)
+        self.assertEqual(len(detections), 1)
+        self.assertEqual(detections[['x1', 'y1', 'x2', 'y2']].tolist(), [(110, 220, 130, 240)])
+        self.assertAlmostEqual(float(detections['confidence'][0]), 0.9, places=5)
+
+    def test_filter_empty(self):
+        detections = filter_detections(np.empty((0, 6), dtype=np.float32), np.array([0]), 0.5)
+        self.assertEqual(len(detections), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
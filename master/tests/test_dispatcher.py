@@ -0,0 +1,90 @@
+import contextlib
+import io
+import threading
+import unittest
+from detector.api.dispatcher import NotificationDispatcher
+
+
+class FakeClient:
+    def __init__(self, failures=0, retryable=True):
+        self.failures = failures
+        self.retryable = retryable
+        self.calls = []
+        self.delivered = threading.Event()
+
+    def deliver(self, notifications):
+        self.calls.append(list(notifications))
+        if self.failures > 0:
+            self.failures -= 1
+            return False, self.retryable
+        self.delivered.set()
+        return True, False
+
+
+class TestNotificationDispatcher(unittest.TestCase):
+
+    def test_batches_notifications(self):
+        client = FakeClient()
+        dispatcher = NotificationDispatcher(client, workers=1, batch_size=3, batch_wait_ms=200)
+        for i in range(3):
+            self.assertTrue(dispatcher.submit({"id": str(i)}))
+        dispatcher.start()
+        dispatcher.stop(timeout=2.0)
+
+        self.assertEqual(client.calls, [[{"id": "0"}, {"id": "1"}, {"id": "2"}]])
+        self.assertEqual(dispatcher.stats()['sent'], 3)
+        self.assertEqual(dispatcher.queue_depth(), 0)
+
+    def test_retries_retryable_failures(self):
+        client = FakeClient(failures=2)
+        dispatcher = NotificationDispatcher(client, workers=1, max_retries=3, backoff_base=0.001)
+        dispatcher.start()
+        dispatcher.submit({"id": "a"})
+        self.assertTrue(client.delivered.wait(2.0))
+        dispatcher.stop()
+
+        stats = dispatcher.stats()
+        self.assertEqual(len(client.calls), 3)
+        self.assertEqual(stats['retries'], 2)
+        self.assertEqual(stats['sent'], 1)
+
+    def test_does_not_retry_client_errors(self):
+        client = FakeClient(failures=1, retryable=False)
+        dispatcher = NotificationDispatcher(client, workers=1, backoff_base=0.001)
+        dispatcher.start()
+        dispatcher.submit({"id": "a"})
+        dispatcher.stop(timeout=1.0)
+
+        self.assertEqual(len(client.calls), 1)
+        self.assertEqual(dispatcher.stats()['failed'], 1)
+
+    def test_drops_when_queue_full(self):
+        dispatcher = NotificationDispatcher(FakeClient(), queue_size=1)
+        self.assertTrue(dispatcher.submit({"id": "a"}))
+        self.assertFalse(dispatcher.submit({"id": "b"}))
+        self.assertEqual(dispatcher.stats()['dropped'], 1)
+
+    def test_worker_survives_a_failing_batch(self):
+        class BrokenClient(FakeClient):
+            def deliver(self, notifications):
+                if notifications[0]['id'] == 'bad':
+                    raise ConnectionResetError("reset")
+                return super().deliver(notifications)
+
+        client = BrokenClient()
+        dispatcher = NotificationDispatcher(client, workers=1)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            dispatcher.start()
+            dispatcher.submit({"id": "bad"})
+            dispatcher.submit({"id": "good"})
+            self.assertTrue(client.delivered.wait(2.0))
+            dispatcher.stop(timeout=1.0)
+
+        self.assertIn("Error delivering 1 notification(s): reset", output.getvalue())
+        stats = dispatcher.stats()
+        self.assertEqual((stats['failed'], stats['sent']), (1, 1))
+        self.assertEqual(dispatcher.queue_depth(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
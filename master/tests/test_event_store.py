@@ -0,0 +1,106 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import numpy as np
+from detector.core.detections import DETECTION_DTYPE
+from detector.core.tracker import TRACK_DTYPE
+from detector.utils.event_store import EventStore
+
+T0 = 1_700_000_000.0  # A minute boundary
+
+
+def make_detections(class_ids, dtype=DETECTION_DTYPE):
+    detections = np.zeros(len(class_ids), dtype=dtype)
+    detections['class_id'] = class_ids
+    detections['confidence'] = 0.9
+    detections['x2'] = detections['y2'] = 10
+    return detections
+
+
+class TestEventStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, 'events')
+
+    def open(self, **kwargs):
+        kwargs.setdefault('segment_records', 100)
+        kwargs.setdefault('index_stride', 8)
+        store = EventStore(self.path, **kwargs)
+        store.set_class_names({0: 'person', 2: 'car'})
+        return store
+
+    def close(self, store):
+        with contextlib.redirect_stdout(io.StringIO()):
+            store.close()
+
+    def fill(self, store, seconds=600, step=2.0):
+        """One person on camera_1 ('door' zone) and one car on camera_2 (no zone) every `step` seconds."""
+        for t in np.arange(0, seconds, step):
+            store.append(T0 + t, 'camera_1', make_detections([0]), np.array([0]), ['door'])
+            store.append(T0 + t, 'camera_2', make_detections([2]))
+
+    def test_count_matches_scan_across_segments(self):
+        store = self.open()
+        self.fill(store)
+        self.assertEqual(len(store), 600)
+        self.assertGreater(len(store.segments), 5)
+        self.assertTrue(all(segment.rollup is not None for segment in store.segments[:-1]))
+        for start, end in [(0, 600), (31, 547), (59.5, 60.5), (100, 100), (-50, 10), (590, 700)]:
+            expected = len([t for t in np.arange(0, 600, 2.0) if start <= t < end])
+            self.assertEqual(store.count(T0 + start, T0 + end, camera='camera_1', class_id='person'), expected)
+            self.assertEqual(store.count(T0 + start, T0 + end, zone='door'), expected)
+            self.assertEqual(store.count(T0 + start, T0 + end), 2 * expected)
+        self.close(store)
+
+    def test_unknown_names_match_nothing(self):
+        store = self.open()
+        self.fill(store, seconds=10)
+        self.assertEqual(store.count(T0, T0 + 10, camera='camera_9'), 0)
+        self.assertEqual(store.count(T0, T0 + 10, class_id='dog'), 0)
+        self.assertEqual(len(store.events(T0, T0 + 10, zone='gate')), 0)
+        self.assertEqual(store.count(T0, T0 + 10, class_id=2), 5)
+        self.close(store)
+
+    def test_reopen_recovers_active_segment(self):
+        store = self.open()
+        self.fill(store, seconds=130)
+        segments = len(store.segments)
+        self.close(store)
+
+        store = self.open()
+        self.assertEqual(len(store), 130)
+        self.assertEqual(len(store.segments), segments)
+        self.assertEqual(store.cameras, ['camera_1', 'camera_2'])
+        store.append(T0 + 200, 'camera_1', make_detections([0]), np.array([-1]), ['door'])
+        self.assertEqual(store.count(T0, T0 + 300, camera='camera_1'), 66)
+        self.assertEqual(store.count(T0, T0 + 300, zone='door'), 65)
+        self.close(store)
+
+    def test_track_ids_and_out_of_order_timestamps(self):
+        store = self.open()
+        tracks = make_detections([0, 0], dtype=TRACK_DTYPE)
+        tracks['track_id'] = [7, 8]
+        store.append(T0 + 10, 'camera_1', tracks)
+        store.append(T0 + 5, 'camera_2', make_detections([2]))  # Older frame from another camera
+        events = store.events(T0, T0 + 60)
+        np.testing.assert_array_equal(events['track_id'], [7, 8, -1])
+        np.testing.assert_array_equal(events['timestamp'], [T0 + 10] * 3)
+        self.close(store)
+
+    def test_segments_rotate_by_time_and_expire(self):
+        store = self.open(segment_records=1000, segment_seconds=60, retention_seconds=120)
+        self.fill(store, seconds=400, step=10.0)
+        self.assertLessEqual(len(store.segments), 4)
+        self.assertEqual(store.count(T0, T0 + 100), 0)
+        self.assertEqual(store.count(T0 + 300, T0 + 400), 20)
+        sealed = store.segments[0]
+        self.assertLess(os.path.getsize(sealed.path), 1000 * sealed.data.itemsize)
+        self.close(store)
+
+
+if __name__ == '__main__':
+    unittest.main()
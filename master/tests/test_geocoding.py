@@ -0,0 +1,41 @@
+import time
+import unittest
+from unittest.mock import patch
+from detector.utils.geocoding import Geocoder
+
+
+class TestGeocoder(unittest.TestCase):
+
+    def test_static_location_skips_lookup(self):
+        geo = Geocoder(static_location=(1.0, 2.0))
+        with patch('geocoder.ip') as mock_ip:
+            self.assertEqual(geo.get_location(), (1.0, 2.0))
+            mock_ip.assert_not_called()
+
+    @patch('geocoder.ip')
+    def test_get_location_refreshes_in_background(self, mock_ip):
+        mock_ip.return_value.ok = True
+        mock_ip.return_value.lat = 40.7128
+        mock_ip.return_value.lng = -74.0060
+        geo = Geocoder(update_interval=60)
+        try:
+            geo.get_location()  # Starts the refresh thread, returns immediately
+            deadline = time.time() + 2.0
+            while geo.last_location is None and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(geo.get_location(), (40.7128, -74.0060))
+            self.assertEqual(mock_ip.call_count, 1)  # Fresh value is served from the cache
+        finally:
+            geo.stop()
+
+    @patch('geocoder.ip')
+    def test_failure_is_negatively_cached(self, mock_ip):
+        mock_ip.return_value.ok = False
+        geo = Geocoder(failure_ttl=30)
+        self.assertIsNone(geo.refresh())
+        self.assertFalse(geo._refresh_due(time.time()))
+        self.assertTrue(geo._refresh_due(time.time() + 31))
+
+
+if __name__ == '__main__':
+    unittest.main()
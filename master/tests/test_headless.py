@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+import cv2
+import numpy as np
+from detector.config.settings import parse_roi
+from detector.core.obj_detector import YOLONDetector
+from detector.core.roi_handler import ROIHandler
+from detector.utils.frame_sink import FrameSlot, VideoFileSink
+
+
+class TestHeadlessConfig(unittest.TestCase):
+
+    def test_parse_roi(self):
+        self.assertEqual(parse_roi("10, 20, 300, 200"), (10, 20, 300, 200))
+        self.assertIsNone(parse_roi(""))
+        self.assertIsNone(parse_roi(None))
+        with self.assertRaises(ValueError):
+            parse_roi("10,20,300")
+        with self.assertRaises(ValueError):
+            parse_roi("10,20,0,200")
+
+    def test_set_roi_is_validated(self):
+        handler = ROIHandler()
+        handler.set_roi(10, 20, 300, 200)
+        self.assertEqual(handler.get_roi(), (10, 20, 300, 200))
+        handler.set_roi(10, 20, 2, 2)
+        self.assertEqual(handler.get_roi(), (10, 20, handler.min_roi_size, handler.min_roi_size))
+
+
+class TestFrameOutput(unittest.TestCase):
+
+    def test_emit_without_consumer_skips_rendering(self):
+        def render(frame):
+            raise AssertionError("render() must not be called without a consumer")
+
+        detector = SimpleNamespace(sink=None, preview=None, render=render)
+        YOLONDetector.emit(detector, np.zeros((48, 64, 3), dtype=np.uint8))
+
+    def test_video_file_sink(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'out.avi')
+            sink = VideoFileSink(path, fps=10)
+            for value in (0, 128, 255):
+                sink.write(np.full((48, 64, 3), value, dtype=np.uint8))
+            sink.close()
+            self.assertEqual(sink.frames_written, 3)
+
+            cap = cv2.VideoCapture(path)
+            self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 3)
+            self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 64)
+            cap.release()
+
+    def test_path_for_camera(self):
+        self.assertEqual(VideoFileSink.path_for('/data/out.mp4', 'camera_2'), '/data/out_camera_2.mp4')
+
+    def test_frame_slot_keeps_newest_frame_scaled_to_fit(self):
+        slot = FrameSlot(640, 480)
+        self.assertIsNone(slot.take())
+        for value in (10, 20, 30):
+            slot.publish(np.full((720, 1280, 3), value, dtype=np.uint8))
+        frame = slot.take()
+        self.assertEqual(frame.shape, (360, 640, 3))
+        self.assertEqual(int(frame[0, 0, 0]), 30)
+        self.assertAlmostEqual(slot.scale, 0.5)
+        self.assertEqual((slot.published, slot.dropped), (3, 2))
+        self.assertIsNone(slot.take())
+
+    def test_frame_slot_does_not_overwrite_taken_frame(self):
+        slot = FrameSlot(64, 48)
+        slot.publish(np.full((48, 64, 3), 1, dtype=np.uint8))
+        shown = slot.take()
+        slot.publish(np.full((48, 64, 3), 2, dtype=np.uint8))
+        slot.publish(np.full((48, 64, 3), 3, dtype=np.uint8))
+        self.assertEqual(int(shown[0, 0, 0]), 1)
+        buffers = set()
+        for value in range(4, 10):
+            slot.publish(np.full((48, 64, 3), value, dtype=np.uint8))
+            buffers.add(id(slot.take()))
+        self.assertLessEqual(len(buffers), 3)  # Buffers are reused, not allocated per frame
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from detector.api.client import APIClient
+from detector.utils.id_generator import ID_LENGTH, IDGenerator
+
+
+class TestIDGenerator(unittest.TestCase):
+
+    def test_ids_sort_by_creation_time(self):
+        start = time.time()
+        ids = [IDGenerator().generate_unique_id() for _ in range(10000)]  # Instances share the sequence
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids, sorted(ids))
+        self.assertTrue(all(len(i) == ID_LENGTH and i.isalnum() and i.isupper() for i in ids))
+        self.assertAlmostEqual(IDGenerator.timestamp_of(ids[0]), start, delta=1.0)
+
+    def test_monotonic_when_clock_steps_back(self):
+        generator = IDGenerator()
+        with patch('time.time_ns', return_value=2_000_000_000_000_000_000):
+            first = generator.generate_unique_id()
+        with patch('time.time_ns', return_value=1_000_000_000_000_000_000):
+            second = generator.generate_unique_id()
+        self.assertLess(first, second)
+        self.assertEqual(IDGenerator.timestamp_of(first), IDGenerator.timestamp_of(second))
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "Requires fork()")
+    def test_forked_processes_do_not_repeat_ids(self):
+        generator = IDGenerator()
+        generator.generate_unique_id()
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.write(write_fd, generator.generate_unique_id().encode())
+            os._exit(0)
+        os.close(write_fd)
+        child = os.read(read_fd, 64).decode()
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+        self.assertNotEqual(child, generator.generate_unique_id())
+
+
+class TestIdempotentDelivery(unittest.TestCase):
+
+    def test_retries_reuse_the_idempotency_key(self):
+        client = APIClient('http://api/notifications', 'key')
+        client.session.post = MagicMock(return_value=MagicMock(status_code=503, text=''))
+        with patch('builtins.print'):
+            for _ in range(2):
+                self.assertEqual(client.deliver([{'id': 'A1'}]), (False, True))
+                client.deliver([{'id': 'A1'}, {'id': 'B2'}])
+                client.deliver([{'id': 'B2'}, {'id': 'A1'}])
+        keys = [call[1]['headers']['Idempotency-Key'] for call in client.session.post.call_args_list]
+        self.assertEqual(keys[0], 'A1')
+        self.assertEqual(keys[:3], keys[3:])
+        self.assertEqual(len(set(keys[:3])), 3)
+        client.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import time
+import unittest
+from unittest.mock import patch
+import numpy as np
+from detector.core.inference_pool import InferencePool
+
+
+class MeanModel:
+    """
+    Worker-side stand-in: one box covering the crop, with the mean pixel value (scaled to
+    [0, 1]) as its confidence, so the tests can check the pixels that crossed shared memory.
+    """
+    names = {0: 'person'}
+
+    def warmup(self, imgsz):
+        pass
+
+    def __call__(self, crop, imgsz=640, classes=None, conf=0.25, verbose=False):
+        if crop.shape[0] == 13:
+            raise RuntimeError("unlucky crop")
+        if crop.shape[1] == 7:
+            time.sleep(60)  # Stuck until the test kills the worker
+        height, width = crop.shape[:2]
+        return [np.array([[0, 0, width, height, crop.mean() / 255.0, imgsz]], dtype=np.float32)]
+
+
+def load_mean_model(model_path, backend, threads, int8):
+    return MeanModel()
+
+
+class TestInferencePool(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = InferencePool('unused.pt', workers=2, frame_shape=(32, 32, 3), slots=3, threads=1,
+                                 warmup_size=64, loader=load_mean_model)
+        cls.pool.start(timeout=60)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_names_come_from_workers(self):
+        self.assertEqual(self.pool.names, {0: 'person'})
+
+    def test_results_match_crops(self):
+        crops = [np.full((16 + i, 24, 3), 10 * i, dtype=np.uint8) for i in range(5)]  # More crops than slots
+        outputs = self.pool(crops, imgsz=64)
+        for i, output in enumerate(outputs):
+            np.testing.assert_allclose(output[0], [0, 0, 24, 16 + i, 10 * i / 255.0, 64], rtol=1e-6)
+
+    def test_submit_and_poll(self):
+        frame = np.arange(40 * 40 * 3, dtype=np.uint8).reshape(40, 40, 3)
+        crop = frame[5:25, 10:30]  # Non-contiguous view
+        job_id = self.pool.submit(crop, 32)
+        results = []
+        while not results:
+            results = self.pool.poll(timeout=5.0)
+        self.assertEqual(results[0][0], job_id)
+        self.assertAlmostEqual(float(results[0][1][0, 4]), crop.mean() / 255.0, places=5)
+        self.assertEqual(self.pool.in_flight(), 0)
+
+    def test_larger_crop_resizes_ring(self):
+        output = self.pool(np.full((64, 64, 3), 255, dtype=np.uint8), imgsz=64)[0]
+        self.assertAlmostEqual(float(output[0, 4]), 1.0)
+        self.assertGreaterEqual(self.pool.slot_bytes, 64 * 64 * 3)
+
+    def test_worker_errors_yield_empty_results(self):
+        output = self.pool(np.zeros((13, 8, 3), dtype=np.uint8), imgsz=32)[0]
+        self.assertEqual(output.shape, (0, 6))
+        self.assertGreaterEqual(self.pool.errors, 1)
+
+
+class TestWorkerFailure(unittest.TestCase):
+
+    def test_dead_worker_fails_its_jobs_and_is_restarted(self):
+        pool = InferencePool('unused.pt', workers=1, frame_shape=(32, 32, 3), threads=1, loader=load_mean_model)
+        pool.start(timeout=60)
+        self.addCleanup(pool.close)
+        job_id = pool.submit(np.zeros((8, 7, 3), dtype=np.uint8), 32)
+        self.assertEqual(pool.poll(timeout=0.2), [])
+        pool._processes[0].kill()
+
+        with patch('builtins.print'):
+            deadline = time.monotonic() + 10
+            results = []
+            while not results and time.monotonic() < deadline:
+                results = pool.poll(timeout=0.5)
+        self.assertEqual(results, [(job_id, None, 0.0)])
+        self.assertEqual((pool.in_flight(), pool.restarts), (0, 1))
+        self.assertTrue(pool.has_free_slot())
+
+        output = pool(np.full((8, 8, 3), 255, dtype=np.uint8), imgsz=32)[0]  # Served by the new worker
+        self.assertAlmostEqual(float(output[0, 4]), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from detector.api.records import NotificationRecord, validate_notification
+from detector.utils.media_recorder import MediaRecorder, PreRollBuffer
+
+
+def make_frame(value, shape=(96, 128, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+class TestPreRollBuffer(unittest.TestCase):
+
+    def test_bounded_by_time_rate_and_memory(self):
+        buffer = PreRollBuffer(seconds=1.0, max_bytes=10 ** 9, fps=10, width=64)
+        for i in range(100):
+            buffer.add(make_frame(i), i * 0.05)  # 20 fps in, 10 fps stored
+        frames = buffer.frames()
+        self.assertEqual(len(frames), 11)  # 1 s span at 10 fps
+        self.assertEqual(frames[0][1].shape, (48, 64, 3))
+        self.assertAlmostEqual(frames[-1][0] - frames[0][0], 1.0)
+
+        capped = PreRollBuffer(seconds=60, max_bytes=5 * 48 * 64 * 3, fps=0, width=64)
+        for i in range(20):
+            capped.add(make_frame(i), float(i))
+        self.assertEqual(len(capped), 5)
+        self.assertLessEqual(capped.nbytes, capped.max_bytes)
+
+
+class TestMediaRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.output = contextlib.redirect_stdout(io.StringIO())
+        self.output.__enter__()
+        self.addCleanup(self.output.__exit__, None, None, None)
+
+    def make_recorder(self, **kwargs):
+        kwargs.setdefault('clip_format', 'avi')
+        return MediaRecorder(self.tmpdir.name, pre_roll=1.0, post_roll=1.0, clip_fps=10, clip_width=64, **kwargs)
+
+    def test_snapshot_and_clip_around_alert(self):
+        recorder = self.make_recorder()
+        recorder.start()
+        for i in range(30):  # 3 s at 10 fps, alert at 1.5 s
+            t = 1000.0 + i * 0.1
+            frame = make_frame(i)
+            recorder.add_frame(frame, t)
+            if i == 15:
+                snapshot, clip = recorder.capture(frame, t, 'camera_1', [(10, 10, 50, 50)])
+        recorder.stop()
+
+        self.assertTrue(os.path.exists(snapshot) and os.path.exists(clip))
+        self.assertEqual(cv2.imread(snapshot).shape, (96, 128, 3))
+        cap = cv2.VideoCapture(clip)
+        self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 21)  # 1 s pre-roll, alert frame, 1 s post-roll
+        self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 64)
+        cap.release()
+        self.assertEqual(recorder.stats()['pending'], 0)
+        self.assertEqual([name for name in os.listdir(self.tmpdir.name) if '.part' in name], [])
+
+    def test_bursts_are_dropped_not_queued(self):
+        recorder = self.make_recorder(max_pending=2)  # Encoders not started: nothing completes
+        results = [recorder.capture(make_frame(0), 1000.0 + i, 'camera_1') for i in range(5)]
+        self.assertEqual(sum(path is not None for path, _ in results), 2)
+        self.assertEqual(recorder.stats()['dropped'], 3)
+
+    def test_paths_in_notification(self):
+        record = NotificationRecord('n1', 'now', 'person', 0.9, [1, 2, 3, 4], (0, 0, 10, 10), 'camera_1',
+                                    snapshot='media/a.jpg', clip='media/a.mp4')
+        self.assertEqual(json.loads(record.to_json())['media'], {'snapshot': 'media/a.jpg', 'clip': 'media/a.mp4'})
+        self.assertEqual(validate_notification(record).media.clip, 'media/a.mp4')
+        plain = NotificationRecord('n2', 'now', 'person', 0.9, [1, 2, 3, 4], (0, 0, 10, 10), 'camera_1')
+        self.assertNotIn('media', json.loads(plain.to_json()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import time
+import unittest
+import urllib.request
+from detector.api.client import APIClient
+from detector.api.dispatcher import NotificationDispatcher
+from detector.utils.metrics import MetricsRegistry, MetricsServer, PipelineMetrics
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_text_exposition(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('frames_total', "Frames", ['camera'])
+        histogram = registry.histogram('stage_seconds', "Stage time", ['stage'], buckets=(0.01, 0.1))
+        counter.labels('camera_1').inc()
+        counter.labels('camera_1').inc(2)
+        for value in (0.005, 0.05, 0.5):
+            histogram.labels('inference').observe(value)
+
+        text = registry.render()
+        self.assertIn('# TYPE frames_total counter', text)
+        self.assertIn('frames_total{camera="camera_1"} 3.0', text)
+        self.assertIn('stage_seconds_bucket{stage="inference",le="0.01"} 1', text)
+        self.assertIn('stage_seconds_bucket{stage="inference",le="0.1"} 2', text)
+        self.assertIn('stage_seconds_bucket{stage="inference",le="+Inf"} 3', text)
+        self.assertIn('stage_seconds_count{stage="inference"} 3', text)
+        self.assertIn('stage_seconds_sum{stage="inference"} 0.555', text)
+
+    def test_collectors_run_at_scrape_time(self):
+        registry = MetricsRegistry()
+        gauge = registry.gauge('queue_depth', "Queue depth")
+        depth = [0]
+        registry.add_collector(lambda: gauge.labels().set(depth[0]))
+        depth[0] = 7
+        self.assertIn('queue_depth 7', registry.render())
+
+    def test_label_count_is_checked(self):
+        counter = MetricsRegistry().counter('x_total', "X", ['a', 'b'])
+        with self.assertRaises(ValueError):
+            counter.labels('only-one')
+
+    def test_server(self):
+        registry = MetricsRegistry()
+        registry.counter('up_total', "Up").labels().inc()
+        server = MetricsServer(registry, host='127.0.0.1', port=0)
+        server.start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+                self.assertIn('text/plain', response.headers['Content-Type'])
+                self.assertIn('up_total 1.0', response.read().decode())
+        finally:
+            server.stop()
+
+
+class TestPipelineInstrumentation(unittest.TestCase):
+
+    def test_api_client_records_failures(self):
+        metrics = PipelineMetrics()
+        client = APIClient('http://127.0.0.1:9/notifications', 'key', timeout=(0.5, 0.5), metrics=metrics)
+        self.assertEqual(client.deliver([{"id": "a"}]), (False, True))
+        client.close()
+        text = metrics.registry.render()
+        self.assertIn('detector_notification_send_seconds_count{outcome="error"} 1', text)
+        self.assertIn('detector_notification_send_failures_total{reason="ConnectionError"} 1.0', text)
+
+    def test_dispatcher_records_capture_to_delivery(self):
+        class Client:
+            def deliver(self, notifications):
+                return True, False
+
+        metrics = PipelineMetrics()
+        dispatcher = NotificationDispatcher(Client(), workers=1, metrics=metrics)
+        metrics.watch_dispatcher(dispatcher, 'camera_1')
+        dispatcher.start()
+        dispatcher.submit({"id": "a"}, captured_at=time.time() - 0.2)
+        dispatcher.submit({"id": "b"})  # No capture time: not observed
+        dispatcher.stop(timeout=2.0)
+
+        child = metrics.capture_to_notification_seconds.labels()
+        self.assertEqual(sum(child.counts), 1)
+        self.assertGreaterEqual(child.sum, 0.2)
+        text = metrics.registry.render()
+        self.assertIn('# TYPE detector_notifications_total counter', text)
+        self.assertIn('detector_notifications_total{camera="camera_1",outcome="sent"} 2', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+import numpy as np
+from detector.core.motion_gate import MotionGate
+
+
+class TestMotionGate(unittest.TestCase):
+
+    def setUp(self):
+        self.gate = MotionGate(refresh_interval=5.0, cooldown=1.0)
+        self.static = np.full((120, 160, 3), 80, dtype=np.uint8)
+
+    def test_skips_static_roi_and_forces_refresh(self):
+        self.assertTrue(self.gate.should_infer(self.static, now=0.0))  # First frame
+        self.assertFalse(self.gate.should_infer(self.static, now=2.0))
+        self.assertFalse(self.gate.should_infer(self.static, now=4.0))
+        self.assertTrue(self.gate.should_infer(self.static, now=5.5))  # Forced refresh
+        self.assertEqual(self.gate.skipped, 2)
+        self.assertAlmostEqual(self.gate.skip_ratio(), 0.5)
+
+    def test_motion_triggers_inference_with_cooldown(self):
+        self.gate.should_infer(self.static, now=0.0)
+        self.assertFalse(self.gate.should_infer(self.static, now=2.0))
+
+        moving = self.static.copy()
+        moving[40:80, 60:100] = 255
+        self.assertTrue(self.gate.should_infer(moving, now=2.1))
+        self.assertTrue(self.gate.should_infer(self.static, now=2.6))  # Still in cool-down
+        self.assertFalse(self.gate.should_infer(self.static, now=3.5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import contextlib
+import io
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+import numpy as np
+from detector.core.multi_detector import MultiSourceDetector
+
+
+class FakeCamera:
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def is_finished(self):
+        return not self.frames
+
+
+class FakeModel:
+    """
+    Model whose result for a crop is the crop's first pixel value, i.e. the camera number.
+    """
+
+    def __init__(self):
+        self.calls = []  # (crops, imgsz, conf) of every forward pass
+
+    def __call__(self, crops, imgsz=640, classes=None, conf=0.25, verbose=False):
+        self.calls.append((len(crops), imgsz, conf))
+        return [int(crop[0, 0, 0]) for crop in crops]
+
+
+class FakeDetector:
+    """
+    Stand-in for a camera's YOLONDetector: frames are filled with the camera's number, so
+    results can be traced back to their camera.
+    """
+
+    def __init__(self, number, frames=1, roi=True, tracking=False, static=False, zone_confidence=None):
+        self.camera_id = f"camera_{number}"
+        self.camera = FakeCamera(np.full((40, 60, 3), number, dtype=np.uint8) for _ in range(frames))
+        self.roi, self.tracking, self.static = roi, tracking, static
+        self.results = []
+        self.inference_seconds = []
+        self.confidence_threshold = 0.5
+        self.target_class_ids = np.array([0])
+        self.roi_handler = SimpleNamespace(
+            min_confidence=lambda default: default if zone_confidence is None else min(default, zone_confidence))
+        self.metrics = None
+        self.motion_gate = None
+
+    def read_captured(self, timeout=0.0):
+        return SimpleNamespace(frame=self.camera.frames.pop(0)) if self.camera.frames else None
+
+    def crop_roi(self, frame):
+        return frame[10:30, 10:50] if self.roi else None
+
+    def is_tracking_frame(self):
+        return self.tracking
+
+    def predict_tracks(self):
+        self.results.append('tracks')
+
+    def should_infer(self, roi_frame):
+        return not self.static
+
+    def inference_size(self, roi_frame):
+        return 32 * (1 + int(roi_frame[0, 0, 0]))
+
+    def record_inference(self, seconds):
+        self.inference_seconds.append(seconds)
+
+    def process_results(self, results):
+        self.results.append(results)
+
+    def emit(self, frame, window=None):
+        pass
+
+    def close(self):
+        pass
+
+
+def make_multi(detectors, max_batch_size=8, max_wait_ms=50.0):
+    multi = MultiSourceDetector.__new__(MultiSourceDetector)
+    multi.settings = SimpleNamespace(headless=True)
+    multi.detectors = detectors
+    multi.max_batch_size = max_batch_size
+    multi.max_wait = max_wait_ms / 1000.0
+    multi.pool = None
+    multi.model = FakeModel()
+    multi.metrics = multi.outbox = multi.replayer = multi.event_store = None
+    multi.frames_processed = 0
+    multi.batches_run = 0
+    multi.stop_event = threading.Event()
+    multi._in_flight = {}
+    return multi
+
+
+class TestMultiSourceDetector(unittest.TestCase):
+
+    def test_batch_is_cut_at_max_size(self):
+        detectors = [FakeDetector(i) for i in range(1, 4)]
+        batch, done = make_multi(detectors, max_batch_size=2).collect_batch()
+        self.assertEqual([detector.camera_id for detector, _, _ in batch], ['camera_1', 'camera_2'])
+        self.assertEqual(done, [])
+        self.assertEqual(len(detectors[2].camera.frames), 1)  # Left for the next batch
+
+    def test_incomplete_batch_runs_after_max_wait(self):
+        detectors = [FakeDetector(1), FakeDetector(2, frames=0)]  # The second camera never delivers
+        start = time.monotonic()
+        batch, _ = make_multi(detectors, max_wait_ms=50).collect_batch()
+        elapsed = time.monotonic() - start
+        self.assertEqual([detector.camera_id for detector, _, _ in batch], ['camera_1'])
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertLess(elapsed, 0.5)
+
+    def test_frames_without_inference_are_finished_right_away(self):
+        detectors = [FakeDetector(1, roi=False), FakeDetector(2, tracking=True), FakeDetector(3, static=True),
+                     FakeDetector(4)]
+        batch, done = make_multi(detectors).collect_batch()
+        self.assertEqual([detector.camera_id for detector, _, _ in batch], ['camera_4'])
+        self.assertEqual([detector.camera_id for detector, _ in done], ['camera_1', 'camera_2', 'camera_3'])
+        self.assertEqual(detectors[0].results, [[]])  # No ROI: cleared detections
+        self.assertEqual(detectors[1].results, ['tracks'])
+        self.assertEqual(detectors[2].results, [])  # Static ROI: previous result kept
+
+    def test_results_are_scattered_to_their_cameras(self):
+        detectors = [FakeDetector(i) for i in range(1, 4)]
+        multi = make_multi(detectors)
+        outputs = multi.process_batch(*multi.collect_batch())
+        self.assertEqual(multi.model.calls, [(3, 128, 0.5)])  # One forward pass, sized for the largest ROI
+        self.assertEqual([detector.results for detector in detectors], [[[1]], [[2]], [[3]]])
+        self.assertEqual([detector.camera_id for detector, _ in outputs], ['camera_1', 'camera_2', 'camera_3'])
+        self.assertEqual((multi.batches_run, multi.frames_processed), (1, 3))
+        self.assertEqual([len(detector.inference_seconds) for detector in detectors], [1, 1, 1])
+
+    def test_batch_runs_at_the_lowest_threshold_of_its_cameras(self):
+        detectors = [FakeDetector(1), FakeDetector(2, zone_confidence=0.3)]  # Camera 2 has a permissive zone
+        multi = make_multi(detectors)
+        multi.process_batch(*multi.collect_batch())
+        self.assertEqual(multi.model.calls[0][2], 0.3)
+
+    def test_run_stops_when_every_source_has_ended(self):
+        detectors = [FakeDetector(1, frames=3), FakeDetector(2, frames=2)]
+        multi = make_multi(detectors, max_wait_ms=1)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            multi.run()
+        self.assertIn("All sources ended", output.getvalue())
+        self.assertEqual(multi.frames_processed, 5)
+        self.assertEqual([len(detector.results) for detector in detectors], [3, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
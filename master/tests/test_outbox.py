@@ -0,0 +1,126 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from detector.api.dispatcher import NotificationDispatcher
+from detector.api.outbox import NotificationOutbox, OutboxReplayer
+
+
+class FakeClient:
+    def __init__(self, healthy=True, invalid=()):
+        self.healthy = healthy
+        self.invalid = set(invalid)  # IDs the API rejects with a 4xx
+        self.delivered = []
+
+    def deliver(self, notifications):
+        if not self.healthy:
+            return False, True
+        if any(n['id'] in self.invalid for n in notifications):
+            return False, False
+        self.delivered.extend(n['id'] for n in notifications)
+        return True, False
+
+
+class TestNotificationOutbox(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'outbox.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_ack_removes_entries_and_order_is_kept(self):
+        outbox = NotificationOutbox(self.path, flush_interval_ms=10000)
+        for i in range(5):
+            outbox.append({"id": f"n{i}"})
+        outbox.ack(["n1"])  # Acked before the group commit, never written
+        outbox.flush()
+        outbox.ack(["n3"])
+        self.assertEqual([nid for nid, _ in outbox.pending()], ["n0", "n2", "n4"])
+        outbox.close()
+
+        # Entries survive a restart
+        reopened = NotificationOutbox(self.path)
+        self.assertEqual(len(reopened), 3)
+        reopened.close()
+
+    def test_evicts_oldest_beyond_limit(self):
+        outbox = NotificationOutbox(self.path, max_entries=3, flush_interval_ms=10000)
+        for i in range(5):
+            outbox.append({"id": f"n{i}"})
+        self.assertEqual([nid for nid, _ in outbox.pending()], ["n2", "n3", "n4"])
+        self.assertEqual(outbox.evicted, 2)
+        outbox.close()
+
+    def test_replayer_drains_in_order_once_healthy(self):
+        outbox = NotificationOutbox(self.path)
+        for i in range(3):
+            outbox.append({"id": f"n{i}"})
+        client = FakeClient(healthy=False)
+        replayer = OutboxReplayer(outbox, client, min_age=0, batch_size=2)
+
+        time.sleep(0.01)
+        self.assertFalse(replayer.replay_once())
+        self.assertEqual(len(outbox), 3)
+
+        client.healthy = True
+        self.assertTrue(replayer.replay_once())
+        self.assertEqual(client.delivered, ["n0", "n1", "n2"])
+        self.assertEqual(len(outbox), 0)
+        outbox.close()
+
+    def test_rejected_entry_does_not_block_newer_ones(self):
+        outbox = NotificationOutbox(self.path)
+        for nid in ('bad', 'n1', 'n2', 'n3'):
+            outbox.append({"id": nid})
+        client = FakeClient(invalid=['bad'])
+        replayer = OutboxReplayer(outbox, client, min_age=0, batch_size=2)
+
+        time.sleep(0.01)
+        with patch('builtins.print'):
+            self.assertTrue(replayer.replay_once())
+        self.assertEqual(client.delivered, ["n1", "n2", "n3"])
+        self.assertEqual((replayer.replayed, replayer.rejected), (3, 1))
+        self.assertEqual(len(outbox), 0)
+        self.assertEqual(outbox.dead_letters(), [("bad", {"id": "bad"})])
+        outbox.close()
+
+        reopened = NotificationOutbox(self.path)
+        self.assertEqual([nid for nid, _ in reopened.dead_letters()], ["bad"])
+        reopened.close()
+
+    def test_dead_letter_table_is_capped(self):
+        outbox = NotificationOutbox(self.path, max_dead_letters=3, flush_interval_ms=10000)
+        with patch('builtins.print'):
+            for i in range(5):
+                outbox.append({"id": f"n{i}"})
+                outbox.flush()
+                outbox.reject([f"n{i}"])
+            outbox.reject(["n4"])  # Rejected again: replaces its row
+            outbox.flush()
+        self.assertEqual([nid for nid, _ in outbox.dead_letters()], ["n2", "n3", "n4"])
+        self.assertEqual((outbox.dead_letters_evicted, len(outbox)), (2, 0))
+        outbox.close()
+
+    def test_dispatcher_moves_rejected_entries_aside(self):
+        outbox = NotificationOutbox(self.path, flush_interval_ms=10000)
+        client = FakeClient(invalid=['bad'])
+        dispatcher = NotificationDispatcher(client, workers=1, batch_size=3, batch_wait_ms=200, outbox=outbox)
+        for nid in ('bad', 'n1', 'n2'):
+            dispatcher.submit({"id": nid})
+        with patch('builtins.print'):
+            dispatcher.start()
+            dispatcher.stop(timeout=2.0)
+
+        self.assertEqual(client.delivered, ["n1", "n2"])
+        stats = dispatcher.stats()
+        self.assertEqual((stats['sent'], stats['failed'], stats['rejected']), (2, 1, 1))
+        self.assertEqual(len(outbox), 0)
+        self.assertEqual([nid for nid, _ in outbox.dead_letters()], ["bad"])
+        outbox.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import contextlib
+import io
+import unittest
+from detector.core.obj_detector import inference_size_for
+from detector.core.qos import OVERLAY_FAST, OVERLAY_FULL, QualityController, QualityLevel, build_levels
+
+
+def make_controller(**kwargs):
+    levels = [QualityLevel(640, 1, OVERLAY_FULL), QualityLevel(640, 1, OVERLAY_FAST),
+              QualityLevel(320, 1, OVERLAY_FAST), QualityLevel(320, 2, OVERLAY_FAST)]
+    return QualityController(target_fps=10, levels=levels, **kwargs)  # 100 ms budget
+
+
+class TestQualityController(unittest.TestCase):
+
+    def setUp(self):
+        self.output = contextlib.redirect_stdout(io.StringIO())
+        self.log = self.output.__enter__()
+        self.addCleanup(self.output.__exit__, None, None, None)
+
+    def test_build_levels(self):
+        levels = build_levels(640, 256, 3)
+        self.assertEqual(levels[0], QualityLevel(640, 1, OVERLAY_FULL))
+        self.assertEqual(levels[1], QualityLevel(640, 1, OVERLAY_FAST))
+        sizes = [level.inference_size for level in levels]
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+        self.assertTrue(all(size % 32 == 0 for size in sizes))
+        self.assertEqual(levels[-1], QualityLevel(256, 3, OVERLAY_FAST))
+
+    def test_sizes_are_rounded_to_the_stride(self):
+        self.assertEqual(inference_size_for(1280, 720, 600), 576)
+        self.assertEqual(inference_size_for(300, 200, 600), 288)
+        levels = build_levels(600, 250, 2)
+        self.assertEqual(levels[0].inference_size, 576)
+        self.assertEqual(levels[-1].inference_size, 224)
+        self.assertTrue(all(level.inference_size % 32 == 0 for level in levels))
+
+    def test_over_budget_lowers_quality_right_away(self):
+        qos = make_controller()
+        self.assertEqual(qos.evaluate(0.15), QualityLevel(640, 1, OVERLAY_FAST))
+        self.assertEqual(qos.evaluate(0.15).inference_size, 320)
+        self.assertIn("lowering quality to level 2/3", self.log.getvalue())
+
+    def test_upgrade_needs_calm_windows(self):
+        qos = make_controller(hold_windows=3)
+        qos.evaluate(0.15)
+        self.assertIsNone(qos.evaluate(0.05))
+        self.assertIsNone(qos.evaluate(0.09))  # Under budget but above the margin: not calm
+        self.assertIsNone(qos.evaluate(0.05))
+        self.assertIsNone(qos.evaluate(0.05))
+        self.assertEqual(qos.evaluate(0.05), QualityLevel(640, 1, OVERLAY_FULL))
+
+    def test_failed_upgrade_doubles_hold(self):
+        qos = make_controller(hold_windows=2)
+        qos.evaluate(0.15)
+        qos.evaluate(0.05)
+        qos.evaluate(0.05)  # Back to level 0
+        self.assertEqual(qos.index, 0)
+        qos.evaluate(0.15)  # Level 0 still too slow
+        self.assertEqual((qos.index, qos.hold), (1, 4))
+        for _ in range(3):
+            self.assertIsNone(qos.evaluate(0.05))
+        self.assertIsNotNone(qos.evaluate(0.05))
+
+    def test_cpu_budget(self):
+        qos = make_controller(cpu_budget=0.5)
+        self.assertIsNone(qos.evaluate(0.01, cpu=0.4))
+        self.assertEqual(qos.evaluate(0.01, cpu=0.8).overlay, OVERLAY_FAST)
+
+    def test_lowest_level_is_kept(self):
+        qos = make_controller()
+        for _ in range(6):
+            qos.evaluate(0.5)
+        self.assertEqual(qos.index, 3)
+        self.assertEqual(self.log.getvalue().count("lowest quality level"), 1)
+
+    def test_frame_stride(self):
+        qos = make_controller()
+        qos.index = 3
+        self.assertEqual([qos.should_detect() for _ in range(4)], [False, True, False, True])
+
+    def test_record_evaluates_per_window(self):
+        qos = make_controller(window=3)
+        self.assertIsNone(qos.record(0.2))
+        self.assertIsNone(qos.record(0.2))
+        self.assertIsNotNone(qos.record(0.2))
+        self.assertEqual(qos.index, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+import pydantic
+from detector.api.client import APIClient
+from detector.api.records import NotificationRecord, to_json_array, to_ndjson, validate_notification
+
+
+def make_record(**kwargs):
+    fields = dict(id='n1', timestamp='2026-01-02 03:04:05.678', object='person', confidence=0.8999999761581421,
+                  bbox=[10, 20, 110, 220], roi=(0, 0, 640, 480), camera_id='camera_1',
+                  coordinates=(52.52, 13.405), zone='doorway')
+    fields.update(kwargs)
+    return NotificationRecord(**fields)
+
+
+class TestNotificationRecord(unittest.TestCase):
+
+    def test_json_matches_wire_schema(self):
+        record = make_record()
+        self.assertEqual(json.loads(record.to_json()), record.to_dict())
+        self.assertEqual(record.to_dict()['detection'], {'object': 'person', 'confidence': 0.8999999761581421,
+                                                         'bbox': [10, 20, 110, 220]})
+        self.assertEqual(record.to_dict()['location']['coordinates'], [52.52, 13.405])
+
+    def test_optional_fields_and_escaping(self):
+        record = make_record(coordinates=None, zone=None, track_id=7, camera_id='cam "north"\n')
+        data = json.loads(record.to_json())
+        self.assertEqual(data, record.to_dict())
+        self.assertIsNone(data['location']['zone'])
+        self.assertEqual(data['detection']['track_id'], 7)
+        self.assertEqual(data['location']['camera_id'], 'cam "north"\n')
+
+    def test_bulk_bodies(self):
+        records = [make_record(id='a'), {'id': 'b'}]  # Replayed outbox entries are dictionaries
+        self.assertEqual([item['id'] for item in json.loads(to_json_array(records))], ['a', 'b'])
+        lines = to_ndjson(records).splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], ['a', 'b'])
+
+    def test_validation(self):
+        validated = validate_notification(make_record(track_id=3))
+        self.assertEqual(validated.detection.track_id, 3)
+        with self.assertRaises(pydantic.ValidationError):
+            validate_notification(make_record(roi=None))
+
+    def test_client_bulk_format(self):
+        client = APIClient('http://api/notifications', 'key', bulk_format='ndjson')
+        client.session.post = MagicMock(return_value=MagicMock(status_code=200))
+        self.assertEqual(client.deliver([make_record(id='a'), make_record(id='b')]), (True, False))
+        url, = client.session.post.call_args[0]
+        kwargs = client.session.post.call_args[1]
+        self.assertEqual(url, 'http://api/notifications/bulk')
+        self.assertEqual(kwargs['headers']['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(kwargs['headers']['Idempotency-Key']), 32)
+        self.assertEqual(len(kwargs['data'].splitlines()), 2)
+        client.close()
+        with self.assertRaises(ValueError):
+            APIClient('http://api', 'key', bulk_format='xml')
+
+
+if __name__ == '__main__':
+    unittest.main()
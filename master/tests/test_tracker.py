@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+from detector.core.detections import DETECTION_DTYPE
+from detector.core.tracker import Tracker, iou_matrix
+
+
+def detections(*boxes, class_id=0):
+    result = np.zeros(len(boxes), dtype=DETECTION_DTYPE)
+    for i, (x1, y1, x2, y2) in enumerate(boxes):
+        result[i] = (x1, y1, x2, y2, 0.9, class_id)
+    return result
+
+
+class TestTracker(unittest.TestCase):
+
+    def test_iou_matrix(self):
+        a = np.array([[0, 0, 10, 10]], dtype=float)
+        b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]], dtype=float)
+        np.testing.assert_allclose(iou_matrix(a, b), [[1.0, 1 / 3, 0.0]])
+
+    def test_stable_ids_and_single_notification_per_track(self):
+        tracker = Tracker(min_hits=2)
+        tracker.update(detections((100, 100, 150, 200)))
+        self.assertEqual(len(tracker.pop_new_tracks()), 0)  # Not confirmed yet
+
+        tracks = tracker.update(detections((104, 100, 154, 200)))
+        new = tracker.pop_new_tracks()
+        self.assertEqual(new['track_id'].tolist(), [1])
+
+        # A second person walks in: only the new track is reported
+        tracker.update(detections((108, 100, 158, 200), (400, 100, 450, 200)))
+        tracks = tracker.update(detections((112, 100, 162, 200), (404, 100, 454, 200)))
+        self.assertEqual(sorted(tracks['track_id'].tolist()), [1, 2])
+        self.assertEqual(tracker.pop_new_tracks()['track_id'].tolist(), [2])
+        self.assertEqual(len(tracker.pop_new_tracks()), 0)
+
+    def test_predict_coasts_and_expires_tracks(self):
+        tracker = Tracker(min_hits=1, max_age=2)
+        for step in range(3):
+            tracker.update(detections((100 + 10 * step, 100, 150 + 10 * step, 200)))
+        predicted = tracker.predict()
+        self.assertEqual(len(predicted), 1)
+        self.assertGreater(predicted['x1'][0], 120)  # Keeps moving right
+        tracker.predict()
+        self.assertEqual(len(tracker.predict()), 0)
+        self.assertEqual(len(tracker), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
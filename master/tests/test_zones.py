@@ -0,0 +1,112 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import numpy as np
+from detector.config.settings import parse_zones
+from detector.core.detections import DETECTION_DTYPE
+from detector.core.obj_detector import YOLONDetector
+from detector.core.roi_handler import ROIHandler, Zone
+from detector.core.tracker import Tracker
+
+
+def make_detections(rows):
+    detections = np.empty(len(rows), dtype=DETECTION_DTYPE)
+    for i, (x1, y1, x2, y2, conf) in enumerate(rows):
+        detections[i] = (x1, y1, x2, y2, conf, 0)
+    return detections
+
+
+class TestZones(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = ROIHandler()
+        self.handler.set_zones([
+            Zone('doorway', ((100, 100), (300, 100), (300, 400), (100, 400))),
+            # Triangle with its own threshold and an overlap test
+            Zone('bay', ((400, 100), (700, 400), (400, 400)), min_confidence=0.8, min_overlap=0.5)
+        ], verbose=False)
+
+    def test_roi_is_union_bounding_box(self):
+        self.assertEqual(self.handler.get_roi(), (100, 100, 600, 300))
+        self.assertEqual(self.handler.min_confidence(0.5), 0.5)
+        self.assertEqual(self.handler.min_confidence(0.9), 0.8)
+
+    def test_assign_by_anchor_point(self):
+        detections = make_detections([
+            (150, 150, 250, 390, 0.9),  # Feet inside the doorway
+            (150, 50, 250, 90, 0.9),  # Above every zone
+            (320, 150, 380, 390, 0.9)  # Between the zones
+        ])
+        np.testing.assert_array_equal(self.handler.assign_zones(detections), [0, -1, -1])
+
+    def test_assign_by_overlap_and_threshold(self):
+        detections = make_detections([
+            (420, 300, 480, 390, 0.9),  # Mostly inside the triangle
+            (560, 120, 690, 250, 0.9),  # Mostly outside it, above the hypotenuse
+            (420, 300, 480, 390, 0.7)  # Inside, below the zone's threshold
+        ])
+        np.testing.assert_array_equal(self.handler.assign_zones(detections), [1, -1, 1])
+        np.testing.assert_array_equal(self.handler.assign_zones(detections, 0.5), [1, -1, -1])
+
+    def test_first_zone_wins(self):
+        self.handler.set_zones([Zone('outer', ((0, 0), (500, 0), (500, 500), (0, 500))),
+                                Zone('inner', ((100, 100), (200, 100), (200, 200), (100, 200)))], verbose=False)
+        detections = make_detections([(120, 120, 180, 180, 0.9)])
+        np.testing.assert_array_equal(self.handler.assign_zones(detections), [0])
+
+    def test_rectangle_roi_keeps_every_detection(self):
+        handler = ROIHandler()
+        handler.set_roi(10, 20, 100, 50)
+        self.assertEqual(handler.get_roi(), (10, 20, 100, 50))
+        detections = make_detections([(10, 20, 110, 70, 0.6), (50, 30, 60, 40, 0.6)])
+        np.testing.assert_array_equal(handler.assign_zones(detections, 0.5), [0, 0])
+
+    def test_invalid_zones(self):
+        with self.assertRaises(ValueError):
+            self.handler.set_zones([Zone('line', ((0, 0), (10, 10)))])
+        self.assertEqual(len(self.handler.get_zones()), 2)
+
+    def test_parse_zones(self):
+        zones = parse_zones('[{"name": "gate", "points": [[0, 0], [10, 0], [10, 10]], "min_confidence": 0.7}]')
+        self.assertEqual(zones, [{'name': 'gate', 'points': ((0, 0), (10, 0), (10, 10)), 'min_confidence': 0.7,
+                                  'min_overlap': None}])
+        self.assertEqual(parse_zones(''), [])
+        with self.assertRaises(ValueError):
+            parse_zones('[{"name": "gate", "points": [[0, 0]]}]')
+
+    def test_notifications_carry_zone_name(self):
+        notifier = MagicMock()
+        detector = SimpleNamespace(
+            settings=SimpleNamespace(notify_validate=False), media=None,
+            roi_handler=self.handler, notifier=notifier, camera_id='camera_1', frame_timestamp=0.0,
+            geocoder=SimpleNamespace(get_location=lambda: None), model=SimpleNamespace(names={0: 'person'}),
+            id_generator=SimpleNamespace(generate_unique_id=lambda: 'id'), get_timestamp=lambda: 'now')
+        YOLONDetector.send_notifications(detector, make_detections([(150, 150, 250, 390, 0.9)]),
+                                         self.handler.get_roi(), np.array([0]))
+        data = notifier.submit.call_args[0][0]
+        self.assertEqual(data.to_dict()['location']['zone'], 'doorway')
+
+    def test_overlapping_zones_tag_the_zone_that_kept_the_detection(self):
+        self.handler.set_zones([Zone('strict', ((0, 0), (500, 0), (500, 500), (0, 500)), min_confidence=0.8),
+                                Zone('loose', ((100, 100), (300, 100), (300, 300), (100, 300)), min_confidence=0.3)],
+                               verbose=False)
+        for tracker in (None, Tracker(min_hits=1)):
+            detector = YOLONDetector.__new__(YOLONDetector)
+            detector.__dict__.update(
+                settings=SimpleNamespace(notify_validate=False), media=None, metrics=None,
+                roi_handler=self.handler, notifier=MagicMock(), event_store=MagicMock(), tracker=tracker,
+                camera_id='camera_1', frame_timestamp=0.0, confidence_threshold=0.25, target_class_ids=None,
+                last_detections=set(), geocoder=SimpleNamespace(get_location=lambda: None),
+                model=SimpleNamespace(names={0: 'person'}),
+                id_generator=SimpleNamespace(generate_unique_id=lambda: 'id'))
+            detections = make_detections([(150, 150, 250, 290, 0.5)])  # Inside both, only above loose's threshold
+            with patch('detector.core.obj_detector.results_to_detections', return_value=detections):
+                self.assertEqual(len(detector.process_results([])), 1)
+
+            data = detector.notifier.submit.call_args[0][0]
+            self.assertEqual(data.zone, 'loose')
+            np.testing.assert_array_equal(detector.event_store.append.call_args[0][3], [1])
+
+
+if __name__ == '__main__':
+    unittest.main()